@@ -5,7 +5,7 @@ from html import escape
 
 from PySide6.QtCore import Qt, QSettings
 from PySide6.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QWidget, QHBoxLayout, QVBoxLayout, QLabel,
     QMessageBox
 )
 import shiboken6
@@ -13,9 +13,10 @@ from core.i18n import _, i18n
 from ui.components import PrimaryButton, FlatButton
 
 from core.snapshot_manager import SnapshotManager
+from app.snapshot_list_widget import SnapshotListWidget
 from app.widgets.snapshot_panels import SnapshotDisplayPanel           # 新增
 from app.diff_viewer_widget import DiffViewerWidget
-from core.snapshot_loaders.loader_registry import LoaderRegistry
+from core.snapshot_loaders.base_loader import open_source
 from core.diff_strategies.paragraph_strategy import ParagraphDiffStrategy
 from app.widgets.parallel_diff_view import _tokens_to_html, MONO_STYLE
 
@@ -33,9 +34,8 @@ class HistoryPage(QWidget):
         mid_widget = QWidget()
         mid_layout = QVBoxLayout(mid_widget)
         self.label = QLabel(_("📜 {name} 的快照历史").format(name=self.doc_name))
-        self.list_widget = QListWidget()
+        self.list_widget = SnapshotListWidget(file_path, snapshot_manager=self.sm)
         self.list_widget.setProperty("class", "snapshot-list")
-        self.list_widget.setSelectionMode(QListWidget.SingleSelection)
 
         self.btn_restore = FlatButton(_("恢复所选快照"))
         self.btn_restore.setFixedHeight(28)
@@ -48,6 +48,10 @@ class HistoryPage(QWidget):
         self.btn_delete.setFixedHeight(28)
         self.btn_delete.clicked.connect(self.delete_selected)
         mid_layout.addWidget(self.btn_delete)
+        self.btn_thin = FlatButton(_("整理历史"))
+        self.btn_thin.setFixedHeight(28)
+        self.btn_thin.clicked.connect(self.thin_history)
+        mid_layout.addWidget(self.btn_thin)
         mid_layout.addStretch()
 
         # ---------- 右侧显示面板 ----------
@@ -60,10 +64,11 @@ class HistoryPage(QWidget):
         self.setLayout(hbox)
 
         # ---------- 连接信号 ----------
-        self.list_widget.itemSelectionChanged.connect(self.handle_selection_changed)
-        self.list_widget.itemClicked.connect(self.preview_selected)
+        self.list_widget.selectionModel().selectionChanged.connect(self.handle_selection_changed)
+        self.list_widget.clicked.connect(self.preview_selected)
         self.sm.snapshot_created.connect(self.load_snapshots)
         self.sm.snapshot_deleted.connect(self.load_snapshots)
+        self.sm.history_thinned.connect(self._on_history_thinned)
 
         # 初始加载
         self.load_snapshots()
@@ -75,20 +80,7 @@ class HistoryPage(QWidget):
 
     # ---------------------------------------------------------------- list
     def load_snapshots(self):
-        self.list_widget.clear()
-        versions = self.sm.list_snapshots(self.doc_name)
-        if not versions:
-            self.list_widget.addItem(_("暂无快照记录"))
-            return
-
-        versions.sort(key=lambda v: v.get("timestamp", ""), reverse=True)
-        for v in versions:
-            title = v.get("remark", "") or os.path.basename(v.get("snapshot_path", ""))
-            ts = v.get("timestamp", "")
-            text = f"{title}\n{ts}"
-            list_item = QListWidgetItem(text)
-            list_item.setData(Qt.UserRole, v)
-            self.list_widget.addItem(list_item)
+        self.list_widget.load_snapshots()
 
     def handle_selection_changed(self):
         # no custom widget highlighting needed
@@ -97,25 +89,24 @@ class HistoryPage(QWidget):
 
 
     def restore_selected(self):
-        items = self.list_widget.selectedItems()
-        if not items:
+        keys = self.list_widget.selected_keys()
+        if not keys:
             QMessageBox.information(self, _("提示"), _("请先选择要恢复的快照"))
             return
-        meta = items[0].data(Qt.UserRole)
-        if not isinstance(meta, dict):
+        meta = self.sm.get_snapshot(keys[0])
+        if meta is None:
             QMessageBox.warning(self, _("提示"), _("无法获取快照信息"))
             return
         self.sm.restore_snapshot(meta)
 
     def delete_selected(self):
-        row = self.list_widget.currentRow()          # 先拿行号
-        if row < 0:
+        index = self.list_widget.currentIndex()
+        if not index.isValid():
             QMessageBox.information(self, _("提示"), _("请先选择要删除的快照"))
             return
 
-        meta_item = self.list_widget.item(row)
-        meta = meta_item.data(Qt.UserRole)
-        if not isinstance(meta, dict):
+        key = index.data(Qt.UserRole)
+        if not key:
             QMessageBox.warning(self, _("提示"), _("无法获取快照信息"))
             return
 
@@ -126,25 +117,53 @@ class HistoryPage(QWidget):
             return
 
         # 删除数据文件 / 元数据
-        self.sm.delete_snapshot(self.doc_name, meta)
+        self.sm.delete_snapshot(self.doc_name, key)
 
         # 解除预览 & 从列表移除
         del_lbl = QLabel(_("✂️ 已删除快照"))
         del_lbl.setAlignment(Qt.AlignCenter)
         self.display_panel.set_widget(del_lbl)
-        # self.list_widget.takeItem(row)               # 直接按行删除，避免引用 item
+
+    def thin_history(self):
+        """先在后台预演保留策略，确认后再真正删除"""
+        self.btn_thin.setEnabled(False)
+        self.sm.thin_history_async(self.doc_name, dry_run=True)
+
+    def _on_history_thinned(self, doc_name: str, report: dict):
+        if doc_name != self.doc_name:
+            return
+        self.btn_thin.setEnabled(True)
+        if report.get("error"):
+            QMessageBox.warning(self, _("整理历史"), report["error"])
+            return
+        count = len(report.get("removed", []))
+        freed = report.get("freed_bytes", 0) / 1024 / 1024
+        if not report.get("dry_run"):
+            self.load_snapshots()
+            QMessageBox.information(self, _("整理历史"),
+                                    _("已删除 {n} 个快照，释放 {mb:.1f} MB").format(n=count, mb=freed))
+            return
+        if count == 0:
+            QMessageBox.information(self, _("整理历史"), _("没有需要清理的快照"))
+            return
+        if QMessageBox.question(self, _("整理历史"),
+                                _("将删除 {n} 个快照，释放约 {mb:.1f} MB。带备注的快照和恢复点会被保留。继续？").format(n=count, mb=freed),
+                                QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
+            return
+        self.btn_thin.setEnabled(False)
+        self.sm.thin_history_async(self.doc_name)
     # ---------------------------------------------------------------- view / delete
     def _build_preview_widget(self, path: str):
         """根据文件类型构建预览控件"""
         try:
-            ext = os.path.splitext(path)[1]
-            loader = LoaderRegistry.get_loader(ext)
+            # 同一快照只解析一次（与对比、统计共享）
+            document = self.sm.parse_snapshot(path)
 
             from PySide6.QtWidgets import QTextBrowser
 
-            if loader and hasattr(loader, "load_structured"):
+            if document is not None:
                 compact = QSettings().value("diff/compact_style", False, type=bool)
-                paragraphs = ParagraphDiffStrategy._paragraph_texts(loader, path)
+                paragraphs = ParagraphDiffStrategy.paragraph_texts(document)
                 width = len(str(len(paragraphs)))
                 numbered = [
                     f'<span class="ln">{str(i).rjust(width)}</span> '
@@ -161,11 +180,8 @@ class HistoryPage(QWidget):
                 return browser
 
             else:
-                if loader:
-                    text = loader.get_text(path)
-                else:
-                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                        text = f.read()
+                with open_source(self.sm.snapshot_source(path)) as f:
+                    text = f.read().decode("utf-8", errors="ignore")
 
                 lines = text.splitlines()
                 width = len(str(len(lines)))
@@ -188,9 +204,9 @@ class HistoryPage(QWidget):
             return err
 
     # ----------- new direct preview ------------
-    def preview_selected(self, item):
-        meta = item.data(Qt.UserRole)
-        if not isinstance(meta, dict):
+    def preview_selected(self, index):
+        meta = self.sm.get_snapshot(index.data(Qt.UserRole) or "")
+        if meta is None:
             return
 
         # ---- 构建正文预览组件 ----
@@ -217,6 +233,7 @@ class HistoryPage(QWidget):
         self.label.setText(_("📜 {name} 的快照历史").format(name=self.doc_name))
         self.btn_restore.setText(_("恢复所选快照"))
         self.btn_delete.setText(_("删除所选快照"))
+        self.btn_thin.setText(_("整理历史"))
         if self.hint is not None and shiboken6.isValid(self.hint):
             self.hint.setText(_("👉 选择快照查看内容或恢复"))
         self.load_snapshots()
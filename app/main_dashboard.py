@@ -1,17 +1,18 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QListWidget, QFileDialog, QMessageBox, QLabel,
-    QListWidgetItem, QMenu, QSizePolicy, QCheckBox
+    QListWidgetItem, QMenu, QSizePolicy, QCheckBox, QApplication
 )
 from ui.components import PrimaryButton
-from PySide6.QtCore import Qt, QSize, QEvent
+from PySide6.QtCore import Qt, QSize, QEvent, QThreadPool, QTimer, Signal
 from core.i18n import _, i18n
 import os
-from app.snapshot_history import SnapshotHistoryWindow
 from core.recent_db import RecentDocDB
-from app.project_delegate import ProjectItemDelegate
+from app.project_delegate import ProjectItemDelegate, STATUS_ROLE
 from core.snapshot_manager import SnapshotManager
 
 class MainDashboard(QWidget):
+    _status_ready = Signal(list)        # paths whose cached status changed (worker thread)
+
     def __init__(self, snapshot_manager: SnapshotManager, parent=None):
         super().__init__(parent)
         self.manager = snapshot_manager
@@ -33,6 +34,7 @@ class MainDashboard(QWidget):
         self.doc_list.setFrameShape(QListWidget.NoFrame)
         self.doc_list.setMouseTracking(True)
         self.doc_list.setItemDelegate(ProjectItemDelegate())
+        self.doc_list.setSelectionMode(QListWidget.ExtendedSelection)
         self.doc_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.doc_list.customContextMenuRequested.connect(self.show_context_menu)
         
@@ -53,7 +55,23 @@ class MainDashboard(QWidget):
         self.add_button.clicked.connect(self.add_document)
         # self.doc_list.itemClicked.connect(self.open_snapshot_window)
         self.doc_list.itemClicked.connect(self.open_project_page)
+        self.manager.bulk_finished.connect(self._on_bulk_finished)
+
+        # 文档状态在后台刷新：快照变化后（合并短时间内的多次变化）及定期刷新
+        self._status_running = False
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(300)
+        self._status_timer.timeout.connect(self.refresh_status)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(30_000)
+        self._poll_timer.timeout.connect(self.refresh_status)
+        self._poll_timer.start()
+        self._status_ready.connect(self._apply_status)
+        self.manager.snapshot_created.connect(lambda meta: self._status_timer.start())
+        self.manager.snapshot_deleted.connect(lambda meta: self._status_timer.start())
         self.refresh_list()
+        self.refresh_status()
 
         i18n.language_changed.connect(self.retranslate_ui)
 
@@ -75,6 +93,7 @@ class MainDashboard(QWidget):
             for doc_path in docs:
                 item = QListWidgetItem()
                 item.setData(1000, doc_path)
+                item.setData(STATUS_ROLE, self.db.status(doc_path))
                 item.setToolTip(doc_path)
                 # Height hint only – width adapts to list widget
                 item.setSizeHint(QSize(0, 50))
@@ -88,6 +107,30 @@ class MainDashboard(QWidget):
         if file_path:
             self.db.add(file_path)
             self.refresh_list()
+            self.refresh_status()
+
+    def refresh_status(self):
+        """在后台重新读取各文档的状态（是否存在、快照数量等）"""
+        if self._status_running:
+            self._status_timer.start()      # try again once the running pass ends
+            return
+        self._status_running = True
+
+        def work():
+            try:
+                changed = self.db.refresh_status(self.manager.snapshot_summary)
+            except Exception:
+                changed = []
+            self._status_ready.emit(changed)
+        QThreadPool.globalInstance().start(work)
+
+    def _apply_status(self, changed: list):
+        self._status_running = False
+        changed = set(changed)
+        for row in range(self.doc_list.count()):
+            item = self.doc_list.item(row)
+            if item.data(1000) in changed:
+                item.setData(STATUS_ROLE, self.db.status(item.data(1000)))
 
     def open_snapshot_window(self, item):
         file_path = item.data(1000)
@@ -115,9 +158,19 @@ class MainDashboard(QWidget):
         if not item or not item.data(1000):
             return
         menu = QMenu(self)
+        selected = [i.data(1000) for i in self.doc_list.selectedItems() if i.data(1000)]
+        if item.data(1000) not in selected:
+            selected = [item.data(1000)]
+        snap_sel_act = menu.addAction(_("为所选项目创建快照（{n}）").format(n=len(selected)))
+        snap_all_act = menu.addAction(_("为全部项目创建快照"))
+        menu.addSeparator()
         remove_act = menu.addAction(_("移除项目"))
         action = menu.exec(self.doc_list.viewport().mapToGlobal(pos))
-        if action == remove_act:
+        if action == snap_sel_act:
+            self.snapshot_documents(selected)
+        elif action == snap_all_act:
+            self.snapshot_documents(self.db.get_all())
+        elif action == remove_act:
             file_path = item.data(1000)
             box = QMessageBox(self)
             box.setIcon(QMessageBox.Question)
@@ -135,7 +188,30 @@ class MainDashboard(QWidget):
                     self.manager.delete_all_snapshots(doc_name)
                 self.refresh_list()
 
+    def snapshot_documents(self, paths):
+        """后台批量创建快照，完成后汇总结果"""
+        if not paths:
+            return
+        self.setCursor(Qt.BusyCursor)
+        self.manager.create_snapshots_async(paths)
+
+    def _on_bulk_finished(self, results: list):
+        self.unsetCursor()
+        self.refresh_status()
+        created = sum(r["status"] == "created" for r in results)
+        unchanged = sum(r["status"] == "unchanged" for r in results)
+        failed = [r for r in results if r["status"] == "failed"]
+        text = _("已创建 {created} 个，未变化 {unchanged} 个，失败 {failed} 个").format(
+            created=created, unchanged=unchanged, failed=len(failed))
+        if failed:
+            text += "\n\n" + "\n".join(
+                f"{os.path.basename(r['file_path'])}: {r.get('error', '')}" for r in failed)
+        QMessageBox.information(self, _("批量快照"), text)
+
     def open_project_page(self, item):
+        # Ctrl / Shift 点击仅用于多选
+        if QApplication.keyboardModifiers() & (Qt.ControlModifier | Qt.ShiftModifier):
+            return
         file_path = item.data(1000)
         if os.path.exists(file_path):
             # move project to top as most recently used
@@ -1,16 +1,16 @@
 from PySide6.QtWidgets import (
     QMainWindow, QStackedWidget, QMenu
 )
-from PySide6.QtGui import QAction, QActionGroup
+from PySide6.QtGui import QAction, QActionGroup, QKeySequence
 from PySide6.QtCore import QSettings, QSize
 from core.i18n import _, i18n
 from core.themes import apply_theme, load_theme_pref, save_theme_pref
 
 from app.main_dashboard import MainDashboard
-from app.snapshot_history import SnapshotHistoryWindow
-from app.project_page import ProjectPage
 from core.snapshot_manager import SnapshotManager
 
+# 页面模块（及其 diff / 预览依赖）在首次打开时才导入，加快启动
+
 class MainWindow(QMainWindow):
     def __init__(self, snapshot_manager: SnapshotManager):
         super().__init__()
@@ -36,6 +36,7 @@ class MainWindow(QMainWindow):
 
         # ---------------- 主题菜单 ----------------
         self._create_theme_menu()
+        self._create_search_menu()
 
         i18n.language_changed.connect(self.retranslate_ui)
 
@@ -50,11 +51,15 @@ class MainWindow(QMainWindow):
         self.act_auto.setText(_("跟随系统"))
         self.act_light.setText(_("浅色"))
         self.act_dark.setText(_("深色"))
+        self.search_menu.setTitle(_("搜索(&S)"))
+        self.act_search.setText(_("全文搜索…"))
         if hasattr(self, 'dashboard'):
             self.dashboard.retranslate_ui()
 
     def open_snapshot_history(self, file_path):
         # Store dashboard size before switching
+        from app.snapshot_history import SnapshotHistoryWindow
+
         self._store_current_size()
         self.snapshot_page = SnapshotHistoryWindow(file_path, parent=self, snapshot_manager=self.manager)
         if self.stack.count() == 2:
@@ -71,6 +76,8 @@ class MainWindow(QMainWindow):
 
     def open_project_page(self, file_path):
         """从主页打开项目页面"""
+        from app.project_page import ProjectPage
+
         # 如果之前已经打开过，先移除旧的
         if hasattr(self, 'project_page'):
             self.stack.removeWidget(self.project_page)
@@ -113,6 +120,25 @@ class MainWindow(QMainWindow):
             apply_theme(pref=pref)
         group.triggered.connect(_on_triggered)
 
+    # ---------------------------------------------------------------- search
+    def _create_search_menu(self):
+        self.search_menu = QMenu(_("搜索(&S)"), self)
+        self.act_search = QAction(_("全文搜索…"), self)
+        self.act_search.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        self.act_search.triggered.connect(self.open_search)
+        self.search_menu.addAction(self.act_search)
+        self.menuBar().addMenu(self.search_menu)
+        self.search_window = None
+
+    def open_search(self):
+        if self.search_window is None:
+            from app.search_window import SearchWindow
+            self.search_window = SearchWindow(self.manager)
+        self.search_window.show()
+        self.search_window.raise_()
+        self.search_window.activateWindow()
+        self.search_window.query_edit.setFocus()
+
     def _store_current_size(self):
         """Save current window size depending on active page."""
         if self.stack.currentIndex() == 0:
@@ -3,12 +3,18 @@ from PySide6.QtGui import QFont
 from PySide6.QtCore import QSettings
 from core.i18n import _, i18n
 import os
-from core.snapshot_loaders.loader_registry import LoaderRegistry
+from core.snapshot_loaders.base_loader import open_source
+from core.snapshot_loaders.document_cache import parse_document, parse_file
 from core.diff_strategies.paragraph_strategy import ParagraphDiffStrategy
 from app.widgets.parallel_diff_view import _tokens_to_html, MONO_STYLE
 
 class PreviewWindow(QWidget):
-    def __init__(self, file_path):
+    def __init__(self, file_path, source=None, document=None):
+        """
+        *source* is what the loader reads (defaults to *file_path*);
+        *document* an already parsed document to show instead (see
+        ``SnapshotManager.parse_snapshot``).
+        """
         super().__init__()
         self.setWindowTitle(_("快照内容预览"))
         self.setMinimumSize(400, 300)
@@ -19,28 +25,28 @@ class PreviewWindow(QWidget):
         self.text_edit.setStyleSheet(MONO_STYLE)
         layout.addWidget(self.text_edit)
         self.setLayout(layout)
-        self.load_content(file_path)
+        self.load_content(file_path, source, document)
 
         i18n.language_changed.connect(self.retranslate_ui)
 
-    def load_content(self, path: str):
-        """Load snapshot content using LoaderRegistry."""
+    def load_content(self, path: str, source=None, document=None):
+        """Load snapshot content through its parsed document."""
         try:
             _, ext = os.path.splitext(path)
-            loader = LoaderRegistry.get_loader(ext)
+            if source is None:
+                source = path
+            if document is None:
+                document = parse_file(source, ext) if isinstance(source, str) else parse_document(source, ext)
             html = ""
-            if loader and hasattr(loader, "load_structured"):
+            if document is not None:
                 compact = QSettings().value("diff/compact_style", False, type=bool)
-                paras = ParagraphDiffStrategy._paragraph_texts(loader, path)
+                paras = ParagraphDiffStrategy.paragraph_texts(document)
                 html_parts = [_tokens_to_html(p, show_tokens=not compact) for p in paras]
                 html = "<br>".join(html_parts)
                 self.text_edit.setHtml(f"<div style='{MONO_STYLE}'>{html}</div>")
             else:
-                if loader:
-                    text = loader.get_text(path)
-                else:
-                    with open(path, "r", encoding="utf-8", errors="ignore") as fp:
-                        text = fp.read()
+                with open_source(source) as fp:
+                    text = fp.read().decode("utf-8", errors="ignore")
                 self.text_edit.setFont(QFont("Courier", 10))
                 self.text_edit.setStyleSheet(MONO_STYLE)
                 self.text_edit.setPlainText(text)
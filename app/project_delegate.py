@@ -2,6 +2,9 @@ from PySide6.QtWidgets import QStyledItemDelegate, QStyle
 from PySide6.QtGui import QFont, QColor, QPainter
 from PySide6.QtCore import QRectF, QSize, Qt
 from PySide6.QtGui import QPalette
+from core.i18n import _
+
+STATUS_ROLE = 1001      # cached RecentDocDB.status() dict
 
 class ProjectItemDelegate(QStyledItemDelegate):
     RADIUS = 6
@@ -54,6 +57,17 @@ class ProjectItemDelegate(QStyledItemDelegate):
         painter.setPen(text_color)
         painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignVCenter, file_name)
 
+        # 状态（来自缓存，不访问磁盘）
+        status = index.data(STATUS_ROLE)
+        status_text = _status_text(status) if status else ""
+        if status_text:
+            status_font = QFont()
+            status_font.setPointSize(9)
+            painter.setFont(status_font)
+            if not status["exists"]:
+                painter.setPen(QColor(220, 80, 80))
+            painter.drawText(name_rect, Qt.AlignRight | Qt.AlignVCenter, status_text)
+
         path_font = QFont()
         path_font.setPointSize(9)
         painter.setFont(path_font)
@@ -72,3 +86,19 @@ class ProjectItemDelegate(QStyledItemDelegate):
         # Width adapts to view; height is fixed
         width = option.widget.width() - 2 * self.MARGIN if option.widget else option.rect.width()
         return QSize(width, 60)
+
+
+def _status_text(status: dict) -> str:
+    """“12 个快照 · 2026-10-17 09:30” or a warning for missing files."""
+    if not status["exists"]:
+        return _("文件不存在")
+    count = status.get("snapshot_count")
+    if not count:
+        return ""
+    text = _("{n} 个快照").format(n=count)
+    last = status.get("last_snapshot")
+    if last:
+        # 2026-10-17_09-30-15 → 2026-10-17 09:30
+        day, _sep, clock = last.partition("_")
+        text += f" · {day} {clock[:5].replace('-', ':')}"
+    return text
@@ -55,7 +55,7 @@ class ProjectPage(QWidget):
         self.page_add_snapshot = SnapshotPage(self.file_path, self.manager)
         self.page_history = HistoryPage(self.file_path, self.manager)
         self.page_compare = SnapshotComparePage(self.file_path, self.manager)
-        self.page_settings = SettingsPage()
+        self.page_settings = SettingsPage(snapshot_manager=self.manager)
 
         self.stack.addWidget(self.page_add_snapshot)  # index 0
         self.stack.addWidget(self.page_history)       # index 1
@@ -0,0 +1,101 @@
+# app/search_window.py
+import time
+from html import escape
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QLabel, QTextBrowser
+
+from core.i18n import _, i18n
+from core.search_index import REMARK_PARAGRAPH
+from core.snapshot_manager import SnapshotManager
+from app.preview_window import PreviewWindow
+
+RESULT_LIMIT = 200
+
+
+class SearchWindow(QWidget):
+    """全文搜索：在所有文档的全部快照中查找段落和备注"""
+
+    def __init__(self, snapshot_manager: SnapshotManager):
+        super().__init__()
+        self.sm = snapshot_manager
+        self.setWindowTitle(_("全文搜索"))
+        self.setMinimumSize(500, 400)
+        self._hits = []
+        self._previews = []          # keep preview windows alive
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText(_("搜索所有快照的正文和备注…"))
+        self.query_edit.setClearButtonEnabled(True)
+        self.status_lbl = QLabel()
+        self.results = QTextBrowser()
+        self.results.setProperty("class", "diff-pane")
+        self.results.setOpenLinks(False)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.status_lbl)
+        layout.addWidget(self.results, 1)
+
+        # 输入停顿后再搜索
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(250)
+        self._timer.timeout.connect(self.run_search)
+        self.query_edit.textChanged.connect(self._timer.start)
+        self.query_edit.returnPressed.connect(self.run_search)
+        self.results.anchorClicked.connect(self.open_hit)
+        self.sm.search_indexing.connect(self._on_indexing)
+        i18n.language_changed.connect(self.retranslate_ui)
+
+        # 为建立索引之前的旧快照补建索引
+        self.sm.index_snapshots_async()
+
+    def run_search(self):
+        self._timer.stop()
+        query = self.query_edit.text().strip()
+        if not query:
+            self._hits = []
+            self.results.clear()
+            self.status_lbl.clear()
+            return
+        start = time.perf_counter()
+        self._hits = self.sm.search_snapshots(query, limit=RESULT_LIMIT)
+        ms = (time.perf_counter() - start) * 1000
+        if len(self._hits) >= RESULT_LIMIT:
+            self.status_lbl.setText(_("显示最新的 {n} 条结果（{ms:.0f} ms）").format(n=len(self._hits), ms=ms))
+        else:
+            self.status_lbl.setText(_("{n} 条结果（{ms:.0f} ms）").format(n=len(self._hits), ms=ms))
+        blocks = []
+        for i, hit in enumerate(self._hits):
+            if hit["paragraph"] == REMARK_PARAGRAPH:
+                where = _("备注")
+            else:
+                where = _("第 {n} 段").format(n=hit["paragraph"] + 1)
+            remark = hit["meta"].get("remark", "")
+            title = escape(hit["doc_name"]) + (f" – {escape(remark)}" if remark else "")
+            blocks.append(f'<p><a href="hit:{i}">{title}</a>&nbsp;&nbsp;'
+                          f'{escape(hit["timestamp"])} · {where}<br>{hit["snippet"]}</p>')
+        self.results.setHtml("".join(blocks))
+
+    def open_hit(self, url):
+        """在预览窗口中打开命中的快照"""
+        index = int(url.toString().split(":", 1)[1])
+        meta = self._hits[index]["meta"]
+        path = meta["snapshot_path"]
+        preview = PreviewWindow(path, document=self.sm.parse_snapshot(path))
+        preview.setWindowTitle(f'{meta.get("file", "")} – {meta.get("timestamp", "")}')
+        self._previews = [w for w in self._previews if w.isVisible()] + [preview]
+        preview.show()
+
+    def _on_indexing(self, indexed: int, total: int):
+        if indexed < total:
+            self.status_lbl.setText(_("正在为旧快照建立索引… {indexed}/{total}").format(
+                indexed=indexed, total=total))
+        elif total:
+            self.run_search()        # include the snapshots just indexed
+
+    def retranslate_ui(self):
+        self.setWindowTitle(_("全文搜索"))
+        self.query_edit.setPlaceholderText(_("搜索所有快照的正文和备注…"))
+        self.run_search()
@@ -6,14 +6,21 @@ from PySide6.QtWidgets import (
     QRadioButton,
     QButtonGroup,
     QTabWidget,
+    QHBoxLayout,
+    QSpinBox,
+    QComboBox,
+    QMessageBox,
 )
 from PySide6.QtCore import QSettings
 from core.i18n import _, get_language, set_language, i18n
 from core.themes import apply_theme, load_theme_pref, save_theme_pref
+from core.blob_codecs import available_codecs
+from ui.components import FlatButton
 
 class SettingsPage(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, snapshot_manager=None):
         super().__init__(parent)
+        self.manager = snapshot_manager
 
         layout = QVBoxLayout(self)
 
@@ -23,6 +30,15 @@ class SettingsPage(QWidget):
 
         self.settings = QSettings()
 
+        # 管理器信号只连接一次：retranslate_ui 会重建各个标签页
+        self._packing = False
+        # storage_stats 会遍历全部版本和包，只在后台线程计算；结果保留到下次刷新
+        self._storage_stats = None
+        self._stats_running = False
+        if self.manager is not None:
+            self.manager.storage_packed.connect(self._on_storage_packed)
+            self.manager.storage_stats_ready.connect(self._on_storage_stats)
+
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
@@ -133,9 +149,147 @@ class SettingsPage(QWidget):
         chk_compact.toggled.connect(lambda v: self.settings.setValue("diff/compact_style", v))
         box.addWidget(chk_compact)
 
+        chk_semantic = QCheckBox(_("内容未变化时不创建快照（忽略格式噪声）"))
+        chk_semantic.setChecked(self.settings.value("snapshot/semantic_check", False, type=bool))
+        chk_semantic.toggled.connect(lambda v: self.settings.setValue("snapshot/semantic_check", v))
+        box.addWidget(chk_semantic)
+
+        chk_parts = QCheckBox(_("按部件去重存储 Word 文档"))
+        chk_parts.setChecked(self.settings.value("storage/docx_parts", True, type=bool))
+        chk_parts.toggled.connect(lambda v: self.settings.setValue("storage/docx_parts", v))
+        box.addWidget(chk_parts)
+
+        chk_delta = QCheckBox(_("增量存储（仅保存与上一版本的差异）"))
+        chk_delta.setChecked(self.settings.value("storage/delta_mode", False, type=bool))
+        chk_delta.toggled.connect(lambda v: self.settings.setValue("storage/delta_mode", v))
+        box.addWidget(chk_delta)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel(_("关键帧间隔：")))
+        spin_keyframe = QSpinBox()
+        spin_keyframe.setRange(1, 100)
+        spin_keyframe.setValue(self.settings.value("storage/keyframe_interval", 10, type=int))
+        spin_keyframe.valueChanged.connect(lambda v: self.settings.setValue("storage/keyframe_interval", v))
+        spin_keyframe.setEnabled(chk_delta.isChecked())
+        chk_delta.toggled.connect(spin_keyframe.setEnabled)
+        row.addWidget(spin_keyframe)
+        row.addStretch(1)
+        box.addLayout(row)
+
+        comp_row = QHBoxLayout()
+        comp_row.addWidget(QLabel(_("压缩方式：")))
+        combo_codec = QComboBox()
+        combo_codec.addItem(_("不压缩"), "none")
+        for name in available_codecs():
+            combo_codec.addItem(name, name)
+        idx = combo_codec.findData(self.settings.value("storage/compression", "none"))
+        combo_codec.setCurrentIndex(max(idx, 0))
+        combo_codec.currentIndexChanged.connect(
+            lambda i: self.settings.setValue("storage/compression", combo_codec.itemData(i)))
+        comp_row.addWidget(combo_codec)
+        comp_row.addWidget(QLabel(_("压缩级别：")))
+        spin_level = QSpinBox()
+        spin_level.setRange(0, 22)
+        spin_level.setValue(self.settings.value("storage/compression_level", 6, type=int))
+        spin_level.valueChanged.connect(lambda v: self.settings.setValue("storage/compression_level", v))
+        comp_row.addWidget(spin_level)
+        comp_row.addStretch(1)
+        box.addLayout(comp_row)
+
+        cache_row = QHBoxLayout()
+        cache_row.addWidget(QLabel(_("解析缓存上限（MB，0 为关闭）：")))
+        spin_cache = QSpinBox()
+        spin_cache.setRange(0, 100000)
+        spin_cache.setValue(self.settings.value("storage/parse_cache_mb", 256, type=int))
+        spin_cache.valueChanged.connect(self._set_parse_cache_mb)
+        cache_row.addWidget(spin_cache)
+        cache_row.addWidget(QLabel(_("文档内存缓存上限（MB）：")))
+        spin_documents = QSpinBox()
+        spin_documents.setRange(16, 100000)
+        spin_documents.setValue(self.settings.value("cache/document_mb", 128, type=int))
+        spin_documents.valueChanged.connect(self._set_document_cache_mb)
+        cache_row.addWidget(spin_documents)
+        cache_row.addStretch(1)
+        box.addLayout(cache_row)
+
+        if self.manager is not None:
+            self.lbl_storage = QLabel()
+            self.lbl_documents = QLabel()
+            if self._storage_stats is None:
+                self._refresh_storage_stats()
+            else:       # rebuilt after a language change: no new walk
+                self._show_storage_stats()
+                self._refresh_cache_stats()
+            box.addWidget(self.lbl_storage)
+            box.addWidget(self.lbl_documents)
+            self.btn_pack = FlatButton(_("打包旧快照"))
+            self.btn_pack.setEnabled(not self._packing)
+            self.btn_pack.clicked.connect(self._pack_snapshots)
+            box.addWidget(self.btn_pack)
+
         box.addStretch(1)
         self.tabs.addTab(widget, _("快照"))
 
+    def _refresh_storage_stats(self):
+        self.lbl_storage.setText(_("快照占用：统计中…"))
+        if not self._stats_running:
+            self._stats_running = True
+            self.manager.storage_stats_async()
+        self._refresh_cache_stats()
+
+    def _on_storage_stats(self, stats: dict):
+        self._stats_running = False
+        self._storage_stats = stats
+        self._show_storage_stats()
+
+    def _show_storage_stats(self):
+        stats = self._storage_stats
+        if self._stats_running:
+            self.lbl_storage.setText(_("快照占用：统计中…"))
+        elif stats.get("error"):
+            self.lbl_storage.setText(_("快照占用：统计失败（{error}）").format(error=stats["error"]))
+        else:
+            self.lbl_storage.setText(_("快照占用：{stored:.1f} MB（原始 {logical:.1f} MB）").format(
+                stored=stats["stored_bytes"] / 1048576, logical=stats["logical_bytes"] / 1048576))
+
+    def _refresh_cache_stats(self):
+        cache = self.manager.documents.stats()
+        self.lbl_documents.setText(
+            _("文档缓存：{n} 个文档，{mb:.1f} MB，命中率 {rate:.0%}").format(
+                n=cache["documents"], mb=cache["bytes"] / 1048576, rate=cache["hit_rate"]))
+
+    def _set_parse_cache_mb(self, mb: int):
+        self.settings.setValue("storage/parse_cache_mb", mb)
+        if self.manager is not None:
+            self.manager.parse_cache.max_bytes = mb * 1024 * 1024
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.manager is not None:
+            self._refresh_cache_stats()
+
+    def _set_document_cache_mb(self, mb: int):
+        self.settings.setValue("cache/document_mb", mb)
+        if self.manager is not None:
+            self.manager.documents.max_bytes = mb * 1024 * 1024
+
+    def _pack_snapshots(self):
+        self._packing = True
+        self.btn_pack.setEnabled(False)
+        self.manager.pack_snapshots_async()
+
+    def _on_storage_packed(self, report: dict):
+        if not self._packing:
+            return              # started elsewhere
+        self._packing = False
+        self.btn_pack.setEnabled(True)
+        if report.get("error"):
+            QMessageBox.warning(self, _("打包旧快照"), report["error"])
+            return
+        self._refresh_storage_stats()
+        QMessageBox.information(self, _("打包旧快照"),
+                                _("已打包 {n} 个对象").format(n=report.get("packed", 0)))
+
     def _init_diff_tab(self):
         widget = QWidget()
         box = QVBoxLayout(widget)
@@ -1,12 +1,12 @@
 # app/snapshot_compare_page.py
 import os
 from functools import partial
-from PySide6.QtCore import Qt, QSettings
+from PySide6.QtCore import Qt, QSettings, QItemSelectionModel
 from core.i18n import _, i18n
 import shiboken6
 from PySide6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QLabel,
-    QListWidgetItem, QMessageBox
+    QMessageBox
 )
 from ui.components import PrimaryButton
 
@@ -40,7 +40,8 @@ class SnapshotComparePage(QWidget):
         mid_widget = QWidget()
         mid_layout = QVBoxLayout(mid_widget)
         self.label = QLabel(_("🔍 {name} 快照对比").format(name=self.doc_name))
-        self.list_widget = SnapshotListWidget(file_path, single_selection=False)
+        self.list_widget = SnapshotListWidget(file_path, single_selection=False,
+                                              snapshot_manager=self.manager)
         self.list_widget.setProperty("class", "snapshot-list")
         self.compare_button = PrimaryButton(_("对比选中的两个快照"))
         self.compare_button.setFixedHeight(28)
@@ -65,7 +66,7 @@ class SnapshotComparePage(QWidget):
         self.manager.snapshot_created.connect(self.load_snapshots)
         self.manager.snapshot_deleted.connect(self.load_snapshots)
         self.compare_button.clicked.connect(self.compare_snapshots)
-        self.list_widget.itemSelectionChanged.connect(self.on_selection_changed)
+        self.list_widget.selectionModel().selectionChanged.connect(self.on_selection_changed)
 
         # 初始化按钮可见性
         self.update_button_visibility()
@@ -77,25 +78,14 @@ class SnapshotComparePage(QWidget):
     # ---------------------------------------------------------------- list
     def load_snapshots(self):
         """重新加载快照数据"""
-        self.list_widget.clear()
-        versions = self.manager.list_snapshots(self.doc_name)
-        if not versions:
-            self.list_widget.addItem(_("暂无快照记录"))
+        self.list_widget.load_snapshots()
+        if self.list_widget.model().is_empty():
             empty_lbl = QLabel(_("📭 没有快照可用"))
             empty_lbl.setAlignment(Qt.AlignCenter)
             self.display_panel.set_widget(empty_lbl)
             self.hint_lbl = empty_lbl
             return
 
-        for v in sorted(versions, key=lambda x: x.get("timestamp", ""), reverse=True):
-            path = v.get("snapshot_path")
-            title = v.get("remark", "") or os.path.basename(path)
-            ts = v.get("timestamp", "")
-            display = f"{title}\n{ts}"
-            item = QListWidgetItem(display)
-            item.setData(Qt.UserRole, path)
-            self.list_widget.addItem(item)
-
         # 清空右侧旧内容
         reset_lbl = QLabel(_("👉 请选择两个快照后点击“对比”"))
         reset_lbl.setAlignment(Qt.AlignCenter)
@@ -104,29 +94,19 @@ class SnapshotComparePage(QWidget):
 
     # ---------------------------------------------------------------- compare
     def compare_snapshots(self):
-        items = self.list_widget.selectedItems()
-        if len(items) != 2:
+        keys = self.list_widget.selected_keys()
+        if len(keys) != 2:
             QMessageBox.warning(self, _("提示"), _("请选择两个快照进行对比"))
             return
 
-        paths = [it.data(Qt.UserRole) for it in items]
-        versions = self.manager.list_snapshots(self.doc_name)
-
-        meta_map = {v["snapshot_path"]: v for v in versions}
-        try:
-            v1, v2 = (meta_map[p] for p in paths)
-        except KeyError:
+        v1, v2 = (self.manager.get_snapshot(k) for k in keys)
+        if v1 is None or v2 is None:
             QMessageBox.warning(self, _("错误"), _("读取快照信息失败"))
             return
 
         # 按时间排序：旧 -> 新
-        if v1["timestamp"] > v2["timestamp"]:
-            base_path, latest_path = v2["snapshot_path"], v1["snapshot_path"]
-        else:
-            base_path, latest_path = v1["snapshot_path"], v2["snapshot_path"]
-
-        base_meta   = meta_map.get(base_path, {})
-        latest_meta = meta_map.get(latest_path, {})
+        base_meta, latest_meta = (v2, v1) if v1["timestamp"] > v2["timestamp"] else (v1, v2)
+        base_path, latest_path = base_meta["snapshot_path"], latest_meta["snapshot_path"]
 
         def _title(meta: dict) -> str:
             ts     = meta.get("timestamp", "")
@@ -161,10 +141,10 @@ class SnapshotComparePage(QWidget):
     # ---------------------------------------------------------------- utils
     def check_selection_limit(self):
         """只保留最新的两条选中"""
-        items = self.list_widget.selectedItems()
-        while len(items) > 2:
-            items[0].setSelected(False)
-            items = self.list_widget.selectedItems()
+        rows = self.list_widget.selected_rows()
+        while len(rows) > 2:
+            self.list_widget.selectionModel().select(rows[0], QItemSelectionModel.Deselect)
+            rows = self.list_widget.selected_rows()
 
     def update_button_visibility(self) -> bool:
         """根据设置显示或隐藏对比按钮，返回开关状态"""
@@ -175,7 +155,7 @@ class SnapshotComparePage(QWidget):
     def on_selection_changed(self):
         auto = self.update_button_visibility()
         self.check_selection_limit()
-        if auto and len(self.list_widget.selectedItems()) == 2:
+        if auto and len(self.list_widget.selected_rows()) == 2:
             self.compare_snapshots()
 
     # ------------------------------------------------------- i18n
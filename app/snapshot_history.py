@@ -82,7 +82,7 @@ class SnapshotHistoryWindow(QWidget):
         for item in items:
             file_path = item.data(Qt.UserRole)
             if file_path:
-                preview = PreviewWindow(file_path)
+                preview = PreviewWindow(file_path, document=self.manager.parse_snapshot(file_path))
                 self.preview_windows.append(preview)  # Prevent GC
                 preview.show()
 
@@ -0,0 +1,139 @@
+# app/snapshot_list_model.py
+import os
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from core.i18n import _
+from core.snapshot_manager import SnapshotManager
+
+
+class SnapshotListModel(QAbstractListModel):
+    """
+    快照历史列表模型（从新到旧，按需分页加载）
+
+    Only the first page is queried when the model is (re)loaded; views ask
+    for more through ``canFetchMore`` / ``fetchMore`` as the user scrolls,
+    so a history of 20 000 snapshots opens as fast as one of 20.
+
+    ``Qt.UserRole`` holds the snapshot key (see
+    ``SnapshotManager.snapshot_key``), ``MetaRole`` the metadata dict.
+    An empty history shows a single, non‑selectable placeholder row.
+    Size, word count and paragraph changes come from the statistics stored
+    in the metadata – no document is opened to display them.
+    """
+
+    MetaRole = Qt.UserRole + 1
+
+    def __init__(self, manager: SnapshotManager, doc_name: str,
+                 page_size: int = 200, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.doc_name = doc_name
+        self.page_size = page_size
+        self._filters = {}
+        self._rows = []
+        self._cursor = None
+        self._exhausted = True
+        self.manager.snapshot_updated.connect(self.update_meta)
+        self.reload()
+
+    # ---------------------------------------------------------------- loading
+    def set_filter(self, since=None, until=None, remark=None):
+        """按时间范围 / 备注过滤，并从第一页重新加载"""
+        self._filters = {"since": since, "until": until, "remark": remark or None}
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self._rows, self._cursor = self.manager.query_snapshots(
+            self.doc_name, self.page_size, None, **self._filters)
+        self._exhausted = self._cursor is None
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        rows, self._cursor = self.manager.query_snapshots(
+            self.doc_name, self.page_size, self._cursor, **self._filters)
+        self._exhausted = self._cursor is None
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def update_meta(self, meta: dict):
+        """Replace a loaded row's metadata (e.g. statistics computed later)."""
+        key = self.manager.snapshot_key(meta)
+        for row, old in enumerate(self._rows):
+            if self.manager.snapshot_key(old) == key:
+                self._rows[row] = meta
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                return
+
+    # ---------------------------------------------------------------- model API
+    def is_empty(self) -> bool:
+        return not self._rows
+
+    def meta(self, row: int):
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows) or 1      # placeholder row when empty
+
+    def flags(self, index):
+        if not self._rows:
+            return Qt.NoItemFlags
+        return super().flags(index)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if not self._rows:
+            return _("暂无快照记录") if role == Qt.DisplayRole else None
+        meta = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            title = meta.get("remark", "") or os.path.basename(meta.get("snapshot_path", ""))
+            summary = _summary(meta)
+            ts = meta.get("timestamp", "")
+            return f"{title}\n{ts}    {summary}" if summary else f"{title}\n{ts}"
+        if role == Qt.ToolTipRole:
+            return _details(meta) or None
+        if role == Qt.UserRole:
+            return self.manager.snapshot_key(meta)
+        if role == self.MetaRole:
+            return meta
+        return None
+
+
+def _summary(meta: dict) -> str:
+    """Short second‑line summary: size · words · +inserted −deleted ~modified."""
+    parts = []
+    size = meta.get("size")
+    if size is not None:
+        parts.append(f"{size / 1048576:.1f} MB" if size >= 1048576 else f"{-(-size // 1024)} KB")
+    stats = meta.get("stats") or {}
+    if "words" in stats:
+        parts.append(_("{n} 字").format(n=stats["words"]))
+    changes = stats.get("changes")
+    if changes:
+        parts.append(f"+{changes['inserted']} −{changes['deleted']} ~{changes['modified']}")
+    return " · ".join(parts)
+
+
+def _details(meta: dict) -> str:
+    lines = [meta["remark"]] if meta.get("remark") else []
+    stats = meta.get("stats")
+    if stats:
+        lines.append(_("{paragraphs} 段，{words} 字，{characters} 字符，{tables} 个表格，{images} 张图片")
+                     .format(**stats))
+        if stats.get("changes"):
+            lines.append(_("较上一快照：新增 {inserted} 段，删除 {deleted} 段，修改 {modified} 段")
+                         .format(**stats["changes"]))
+    return "\n".join(lines)
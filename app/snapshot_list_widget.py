@@ -1,47 +1,37 @@
-from PySide6.QtWidgets import QListWidget, QListWidgetItem
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtCore import Qt
 import os
-from core.snapshot import SnapshotManager
-from core.i18n import _, i18n
+from core.snapshot_manager import SnapshotManager
+from core.i18n import i18n
+from app.snapshot_list_model import SnapshotListModel
 
-class SnapshotListWidget(QListWidget):
-    def __init__(self, file_path, single_selection=True, parent=None):
+class SnapshotListWidget(QListView):
+    """快照列表：基于 SnapshotListModel，滚动到底部时才加载下一页"""
+
+    def __init__(self, file_path, single_selection=True, parent=None,
+                 snapshot_manager: SnapshotManager = None):
         super().__init__(parent)
         self.file_path = file_path
-        self.sm = SnapshotManager()
+        self.sm = snapshot_manager or SnapshotManager()
 
         # 设置单选 or 多选模式
         if single_selection:
-            self.setSelectionMode(QListWidget.SingleSelection)
+            self.setSelectionMode(QAbstractItemView.SingleSelection)
         else:
-            self.setSelectionMode(QListWidget.MultiSelection)
+            self.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.setUniformItemSizes(True)
 
-        self.load_snapshots()
+        self.setModel(SnapshotListModel(self.sm, os.path.basename(file_path), parent=self))
 
         i18n.language_changed.connect(self.load_snapshots)
 
     def load_snapshots(self):
-        """加载快照数据到列表"""
-        self.clear()
-        doc_name = os.path.basename(self.file_path)
-        versions = self.sm.version_db.get_versions(doc_name)
-
-        if not versions:
-            self.addItem(_("暂无快照记录"))
-            return
-
-        versions.sort(key=lambda v: v.get("timestamp", ""), reverse=True)
-
-        for v in versions:
-            timestamp = v.get("timestamp", _("未知时间"))
-            path = v.get("snapshot_path", _("未知路径"))
-            remark = v.get("remark", "")
-
-            title = remark.strip() if remark.strip() else os.path.basename(path)
-            time_part = timestamp
+        """重新加载快照数据（仅第一页）"""
+        self.model().reload()
 
-            # 用两行文字分开显示
-            display = f"{title}\n{time_part}"
+    def selected_rows(self):
+        """选中的行（QModelIndex），按选择顺序"""
+        return self.selectionModel().selectedRows()
 
-            item = QListWidgetItem(display)
-            item.setData(1000, path)  # 保存快照路径，供后续对比用
-            self.addItem(item)
\ No newline at end of file
+    def selected_keys(self):
+        return [i.data(Qt.UserRole) for i in self.selected_rows() if i.data(Qt.UserRole)]
@@ -35,8 +35,13 @@ class SnapshotPage(QWidget):
         # ---------- 连接信号 ----------
         self.middle_panel.snapshotCreated.connect(self.on_create_snapshot)
         self.middle_panel.compareRequested.connect(self.compare_with_latest)
+        self.manager.snapshot_progress.connect(self._on_snapshot_progress)
+        self.manager.snapshot_finished.connect(self._on_snapshot_finished)
+        self.manager.snapshot_failed.connect(self._on_snapshot_failed)
 
         # 初始右侧提示
+        self._progress_lbl = None
+        self._pending = False               # 本页发起的后台创建尚未完成
         self.hint_lbl = QLabel(_("👉 在左侧填写备注并点击“创建快照”"))
         self.hint_lbl.setAlignment(Qt.AlignCenter)
         self.display_panel.set_widget(self.hint_lbl)
@@ -45,18 +50,49 @@ class SnapshotPage(QWidget):
 
     # ----------------------------------------------------------------- 槽函数
     def on_create_snapshot(self, remark: str):
-        try:
-            info = self.manager.create_snapshot(self.file_path, remark=remark)
-            QMessageBox.information(self, _("成功"), _("快照已创建！\n时间：{timestamp}").format(timestamp=info['timestamp']))
-            # 清空备注输入框
-            self.middle_panel.clear()
-            # 更新右侧提示
-            lbl = QLabel(_("✅ 快照已创建！"))
-            lbl.setAlignment(Qt.AlignCenter)
-            self.display_panel.set_widget(lbl)
-            self.hint_lbl = lbl
-        except Exception as e:
-            QMessageBox.critical(self, _("错误"), _("创建快照失败：{e}").format(e=e))
+        # 后台创建，避免大文件 / 网络盘卡住界面
+        self.middle_panel.create_btn.setEnabled(False)
+        self._show_status(_("正在创建快照… {pct}%").format(pct=0))
+        self._progress_lbl = self.hint_lbl
+        self._pending = True
+        self.manager.create_snapshot_async(self.file_path, remark=remark)
+
+    def _on_snapshot_progress(self, file_path: str, pct: int):
+        if file_path == self.file_path and self._progress_lbl is not None \
+                and shiboken6.isValid(self._progress_lbl):
+            self._progress_lbl.setText(_("正在创建快照… {pct}%").format(pct=pct))
+
+    def _on_snapshot_finished(self, file_path: str, info: dict):
+        # 按请求的路径匹配：未变化时返回的元信息可能属于另一目录下的同名文件
+        if not self._pending or file_path != self.file_path:
+            return
+        self._pending = False
+        self.middle_panel._update_create_state()
+        if info.get("unchanged"):
+            since = info.get("remark") or info.get("timestamp", "")
+            QMessageBox.information(self, _("提示"), _("自快照“{name}”以来没有变化").format(name=since))
+            self._show_status(_("自快照“{name}”以来没有变化").format(name=since))
+            return
+        QMessageBox.information(self, _("成功"), _("快照已创建！\n时间：{timestamp}").format(timestamp=info['timestamp']))
+        # 清空备注输入框
+        self.middle_panel.clear()
+        # 更新右侧提示
+        self._show_status(_("✅ 快照已创建！"))
+
+    def _on_snapshot_failed(self, file_path: str, error: str):
+        if not self._pending or file_path != self.file_path:
+            return
+        self._pending = False
+        self.middle_panel._update_create_state()
+        self._show_status(_("创建快照失败：{e}").format(e=error))
+        QMessageBox.critical(self, _("错误"), _("创建快照失败：{e}").format(e=error))
+
+    def _show_status(self, text: str):
+        lbl = QLabel(text)
+        lbl.setAlignment(Qt.AlignCenter)
+        self.display_panel.set_widget(lbl)
+        self.hint_lbl = lbl
+        self._progress_lbl = None
 
     def compare_with_latest(self):
         try:
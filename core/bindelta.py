@@ -0,0 +1,108 @@
+"""
+bindelta
+========
+
+Minimal copy / insert binary delta codec used by the blob store's delta
+storage mode.
+
+The base is indexed in fixed, non‑overlapping blocks; the target is then
+scanned for block matches, each match is extended in both directions and
+emitted as a COPY op, everything in between becomes an INSERT op.  Matches
+are found at any target offset, so content shifted by inserted bytes (new
+paragraphs, a grown zip member) is still recognised.
+
+Delta layout (all integers big‑endian)::
+
+    'C' <offset:u64> <length:u32>      copy bytes from base
+    'I' <length:u32> <data>            insert literal bytes
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Optional
+
+BLOCK_SIZE = 64
+
+_COPY = struct.Struct(">cQI")
+_INSERT = struct.Struct(">cI")
+_CMP_CHUNK = 4096
+
+
+def make_delta(base: bytes, target: bytes, max_size: Optional[int] = None) -> Optional[bytes]:
+    """
+    Return a delta that turns *base* into *target*.
+
+    If *max_size* is given and the delta would grow beyond it, give up early
+    and return None – the caller should store a full copy instead.
+    """
+    index: dict = {}
+    for off in range(0, len(base) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        index.setdefault(base[off:off + BLOCK_SIZE], off)
+
+    out = bytearray()
+    n = len(target)
+    i = 0
+    lit_start = 0
+
+    def _emit_insert(start: int, end: int) -> None:
+        if end > start:
+            out.extend(_INSERT.pack(b"I", end - start))
+            out.extend(target[start:end])
+
+    while i <= n - BLOCK_SIZE:
+        off = index.get(target[i:i + BLOCK_SIZE])
+        if off is None:
+            i += 1
+            if max_size is not None and len(out) + (i - lit_start) > max_size:
+                return None
+            continue
+
+        # extend backwards into the pending literal run
+        t_start, b_start = i, off
+        while t_start > lit_start and b_start > 0 and target[t_start - 1] == base[b_start - 1]:
+            t_start -= 1
+            b_start -= 1
+
+        # extend forwards, a chunk at a time then byte by byte
+        t_end, b_end = i + BLOCK_SIZE, off + BLOCK_SIZE
+        while (t_end + _CMP_CHUNK <= n and b_end + _CMP_CHUNK <= len(base)
+               and target[t_end:t_end + _CMP_CHUNK] == base[b_end:b_end + _CMP_CHUNK]):
+            t_end += _CMP_CHUNK
+            b_end += _CMP_CHUNK
+        while t_end < n and b_end < len(base) and target[t_end] == base[b_end]:
+            t_end += 1
+            b_end += 1
+
+        _emit_insert(lit_start, t_start)
+        out.extend(_COPY.pack(b"C", b_start, b_end - b_start))
+        i = lit_start = t_end
+        if max_size is not None and len(out) > max_size:
+            return None
+
+    _emit_insert(lit_start, n)
+    if max_size is not None and len(out) > max_size:
+        return None
+    return bytes(out)
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Reconstruct the target bytes from *base* and *delta*."""
+    out = bytearray()
+    pos = 0
+    end = len(delta)
+    view = memoryview(base)
+    while pos < end:
+        op = delta[pos:pos + 1]
+        if op == b"C":
+            _, off, length = _COPY.unpack_from(delta, pos)
+            out.extend(view[off:off + length])
+            pos += _COPY.size
+        elif op == b"I":
+            _, length = _INSERT.unpack_from(delta, pos)
+            pos += _INSERT.size
+            out.extend(delta[pos:pos + length])
+            pos += length
+        else:
+            raise ValueError(f"Corrupt delta: unknown op {op!r} at {pos}")
+    return bytes(out)
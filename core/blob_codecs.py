@@ -0,0 +1,158 @@
+"""
+blob_codecs
+===========
+
+Optional compression codecs for the blob store.
+
+``zlib`` and ``lzma`` come from the standard library; ``zstd`` is used when
+either the stdlib ``compression.zstd`` module (Python 3.14+) or the
+third‑party ``zstandard`` package is installed.  Every codec is exposed
+through the same incremental ``compress`` / ``flush`` and ``decompress``
+objects so the store can stream files in and out of blobs.
+
+``DecompressingReader`` turns a compressed byte range of an open file into
+a seekable, read‑only binary stream – loaders read snapshots through it
+without any temporary file being written.
+"""
+
+from __future__ import annotations
+
+import io
+import lzma
+import zlib
+from typing import Callable, Dict, List
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd_std  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    _zstd_std = None
+
+try:
+    import zstandard as _zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    _zstandard = None
+
+# Codec ids stored in the blob header – never renumber.
+CODEC_IDS: Dict[str, int] = {"zlib": 1, "lzma": 2, "zstd": 3}
+CODEC_NAMES: Dict[int, str] = {v: k for k, v in CODEC_IDS.items()}
+
+DEFAULT_LEVEL = 6
+_LEVEL_RANGES = {"zlib": (1, 9), "lzma": (0, 9), "zstd": (1, 22)}
+_READ_CHUNK = 256 * 1024
+
+
+def available_codecs() -> List[str]:
+    """Return the names of codecs usable in this interpreter."""
+    names = ["zlib", "lzma"]
+    if _zstd_std is not None or _zstandard is not None:
+        names.append("zstd")
+    return names
+
+
+def clamp_level(name: str, level: int) -> int:
+    low, high = _LEVEL_RANGES[name]
+    return max(low, min(high, level))
+
+
+def compressor(name: str, level: int = DEFAULT_LEVEL):
+    """Return an incremental compressor (``compress`` / ``flush``)."""
+    level = clamp_level(name, level)
+    if name == "zlib":
+        return zlib.compressobj(level)
+    if name == "lzma":
+        return lzma.LZMACompressor(preset=level)
+    if name == "zstd":
+        if _zstd_std is not None:
+            return _zstd_std.ZstdCompressor(level=level)
+        if _zstandard is not None:
+            return _zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Compression codec not available: {name}")
+
+
+def decompressor_factory(codec_id: int) -> Callable[[], object]:
+    """Return a factory of incremental decompressors for *codec_id*."""
+    name = CODEC_NAMES.get(codec_id)
+    if name == "zlib":
+        return zlib.decompressobj
+    if name == "lzma":
+        return lzma.LZMADecompressor
+    if name == "zstd":
+        if _zstd_std is not None:
+            return _zstd_std.ZstdDecompressor
+        if _zstandard is not None:
+            return lambda: _zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Cannot decompress blob with codec id {codec_id}")
+
+
+def decompress(codec_id: int, data) -> bytes:
+    """One‑shot decompression of *data*."""
+    return decompressor_factory(codec_id)().decompress(data)
+
+
+class DecompressingReader(io.RawIOBase):
+    """
+    Read‑only stream over the decompressed form of ``fp[offset:]``.
+
+    *size* is the decompressed length (from the blob header).  Seeking
+    forwards decompresses and discards; seeking backwards restarts from the
+    beginning of the compressed range – cheap for the sequential readers
+    (text loaders, restore) this is meant for.
+    """
+
+    def __init__(self, fp, offset: int, size: int, factory: Callable[[], object]):
+        super().__init__()
+        self._fp = fp
+        self._offset = offset
+        self._size = size
+        self._factory = factory
+        self._rewind()
+
+    def _rewind(self) -> None:
+        self._fp.seek(self._offset)
+        self._decomp = self._factory()
+        self._pos = 0
+        self._buf = memoryview(b"")
+
+    # ------------------------------------------------------------ RawIOBase
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            if self._pos >= self._size:
+                return 0
+            chunk = self._fp.read(_READ_CHUNK)
+            if not chunk:
+                raise EOFError("Compressed blob ended before the expected size")
+            self._buf = memoryview(self._decomp.decompress(chunk))
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        target = max(0, min(offset, self._size))
+        if target < self._pos:
+            self._rewind()
+        scratch = bytearray(min(_READ_CHUNK, max(1, target - self._pos)))
+        while self._pos < target:
+            view = memoryview(scratch)[:target - self._pos]
+            if not self.readinto(view):
+                break
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            self._fp.close()
+        super().close()
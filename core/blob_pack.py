@@ -0,0 +1,172 @@
+"""
+blob_pack
+=========
+
+Append‑only pack files for the blob store.
+
+Thousands of small object files make directory listings, backups and
+antivirus scans slow, so older objects are merged into a few packs::
+
+    objects/pack/pack-<id>.pack   "OMPACK01" <object bytes>…
+    objects/pack/pack-<id>.idx    "OMIDX001" <count:u32> {<digest:32> <offset:u64> <length:u64>}…
+
+Objects are copied verbatim (headers included), so a packed delta or
+compressed blob decodes exactly like its loose counterpart.  Index entries
+have a fixed width and are sorted by digest; lookups bisect the mmap'd
+index and return a ``memoryview`` slice of the mmap'd pack – no bytes are
+copied until a reader consumes them.
+
+A pack is never modified after it has been written.  Objects that lose
+their last reference stay in the pack as dead entries until
+``BlobStore.repack`` rewrites the live ones into a fresh pack.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import struct
+import uuid
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from core.ingest import fast_copy_into
+
+_PACK_MAGIC = b"OMPACK01"
+_IDX_HEADER = struct.Struct(">8sI")
+_IDX_MAGIC = b"OMIDX001"
+_IDX_ENTRY = struct.Struct(">32sQQ")
+
+
+class PackFile:
+    """Read access to one pack and its index through ``mmap``."""
+
+    def __init__(self, idx_path: Path):
+        self.idx_path = Path(idx_path)
+        self.pack_path = self.idx_path.with_suffix(".pack")
+        with self.idx_path.open("rb") as f:
+            self._idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mtime = os.fstat(f.fileno()).st_mtime
+        magic, self.count = _IDX_HEADER.unpack_from(self._idx)
+        if magic != _IDX_MAGIC:
+            self._idx.close()
+            raise ValueError(f"Not a pack index: {self.idx_path}")
+        with self.pack_path.open("rb") as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._pack)
+
+    # bisect over the fixed‑width index without materialising the keys
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        pos = _IDX_HEADER.size + i * _IDX_ENTRY.size
+        return self._idx[pos:pos + 32]
+
+    def find(self, digest: str) -> Optional[memoryview]:
+        """Return the stored bytes of *digest* as a zero‑copy view, or None."""
+        key = bytes.fromhex(digest)
+        i = bisect_left(self, key)
+        if i == self.count or self[i] != key:
+            return None
+        _, offset, length = _IDX_ENTRY.unpack_from(self._idx, _IDX_HEADER.size + i * _IDX_ENTRY.size)
+        return self._view[offset:offset + length]
+
+    def entries(self) -> Iterator[Tuple[str, int]]:
+        """Yield ``(digest, stored length)`` for every object in the pack."""
+        for i in range(self.count):
+            digest, _, length = _IDX_ENTRY.unpack_from(self._idx, _IDX_HEADER.size + i * _IDX_ENTRY.size)
+            yield digest.hex(), length
+
+    @property
+    def size(self) -> int:
+        return len(self._pack) + len(self._idx)
+
+    def close(self) -> None:
+        """Unmap the files; views still held by readers keep the pack mapped."""
+        self._idx.close()
+        self._view.release()
+        try:
+            self._pack.close()
+        except BufferError:
+            pass  # an open reader still exports a slice – unmapped when it is collected
+
+
+def write_pack(pack_dir: Path,
+               objects: Iterable[Tuple[str, Union[Path, bytes, memoryview]]]) -> Path:
+    """
+    Write *objects* (``(digest, file path or bytes)``) into a new pack.
+
+    The pack is written first and the index last, each via a temporary
+    file and ``os.replace`` – a pack only becomes visible once its index
+    exists.  Returns the index path.
+    """
+    pack_dir.mkdir(parents=True, exist_ok=True)
+    name = f"pack-{uuid.uuid4().hex}"
+    pack_path = pack_dir / f"{name}.pack"
+    idx_path = pack_dir / f"{name}.idx"
+
+    entries = []
+    tmp = pack_path.with_name(f".{pack_path.name}.tmp")
+    with tmp.open("wb") as out:
+        out.write(_PACK_MAGIC)
+        for digest, src in sorted(objects, key=lambda item: item[0]):
+            offset = out.tell()
+            if isinstance(src, (bytes, memoryview)):
+                out.write(src)
+            else:
+                with open(src, "rb") as f:
+                    fast_copy_into(f, out)
+            entries.append((bytes.fromhex(digest), offset, out.tell() - offset))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, pack_path)
+
+    tmp = idx_path.with_name(f".{idx_path.name}.tmp")
+    with tmp.open("wb") as out:
+        out.write(_IDX_HEADER.pack(_IDX_MAGIC, len(entries)))
+        for entry in entries:
+            out.write(_IDX_ENTRY.pack(*entry))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, idx_path)
+    return idx_path
+
+
+class ViewReader(io.RawIOBase):
+    """Seekable binary stream over a ``memoryview`` (e.g. a packed object)."""
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
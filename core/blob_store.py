@@ -0,0 +1,916 @@
+"""
+BlobStore
+=========
+
+Content‑addressed storage for snapshot file bytes.
+
+Every snapshot is stored exactly once per SHA‑256 digest in a sharded
+object directory::
+
+    <app data>/objects/ab/cdef0123...      (first two hex chars = shard)
+
+Snapshot metadata entries only record the digest (``meta["blob"]``), so
+identical content across versions, documents and restore / undo copies
+shares a single blob on disk.  Blobs are reference counted – the counts
+live in ``objects/refs.sqlite3`` – and a blob file is removed once the last
+snapshot pointing at it has been deleted.
+
+Reference counts
+----------------
+Several processes (two app windows, the ``snapshot-all`` CLI) may share
+one store.  Every refcount read‑modify‑write – together with the object
+file writes and deletions it decides – runs under an exclusive advisory
+lock on ``objects/refs.lock`` and reads the counts from the database
+inside that lock, so no process acts on stale counts.  Only the changed
+rows are written.  A legacy ``refs.json`` is imported once and left in
+place as a backup.
+
+Delta mode
+----------
+With ``delta_mode`` enabled a new blob is stored as a binary delta against
+the previous snapshot of the same document (see ``core.bindelta``).  A full
+keyframe is written instead every ``keyframe_interval`` versions or when
+the delta exceeds ``max_delta_ratio`` of the full size, so reading any
+version applies at most ``keyframe_interval - 1`` deltas.  A delta object
+holds a reference on its base.
+
+Part mode
+---------
+With ``docx_parts`` enabled (the default) zip based documents are split
+into their member records (see ``core.docx_parts``) and each member is
+stored under its own hash.  The snapshot blob itself is then only a
+manifest listing the parts; the archive is rebuilt on demand and is byte
+for byte identical to the original.  Unchanged images, styles and headers
+are therefore shared by every version of a document.
+
+Compression
+-----------
+Plain blobs and parts can optionally be compressed (``compression`` =
+"zlib", "lzma" or "zstd" – see ``core.blob_codecs``).  A compressed blob
+records its codec in the header; it is kept only when it actually saves
+space, so already deflated zip members and images stay raw.
+
+Packs
+-----
+``pack_objects`` moves older loose objects into append‑only pack files
+(see ``core.blob_pack``); every read goes through the same lookup, which
+checks the loose file first and then the mmap'd pack indexes.  Releasing a
+packed object only drops its reference – ``repack`` later rewrites the
+live objects and drops the dead ones.  Packs written or repacked by
+another process are picked up when a lookup misses: the pack directory
+is rescanned, and packs mapped before a repack stay readable until then.
+
+Object files are either raw bytes (no header) or start with ``_MAGIC``
+followed by a one byte kind::
+
+    _MAGIC 'D' <depth:u16> <base digest:32 bytes> <size:u64> <delta…>
+    _MAGIC 'M' <size:u64> <count:u32> {<digest:32> <len:u16> <name>}…
+    _MAGIC 'Z' <codec:u8> <size:u64> <compressed bytes…>
+
+Content that itself starts with ``_MAGIC`` is always stored with a ``Z``
+header, so a raw object never reads as an encoded one.
+
+Callers never see the encoding: ``read_bytes`` / ``source`` always return
+the materialised content, served from a small in‑memory LRU.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.platform_utils import get_app_data_dir
+from core.file_lock import FileLock
+from core.bindelta import make_delta, apply_delta
+from core.docx_parts import split_archive
+from core.blob_pack import PackFile, ViewReader, write_pack
+from core.ingest import IngestResult, fast_copy, stream_copy
+from core.blob_codecs import (
+    CODEC_IDS, DEFAULT_LEVEL, DecompressingReader, compressor, decompress,
+    decompressor_factory,
+)
+
+# Central object directory (cross‑platform)
+OBJECTS_ROOT = Path(get_app_data_dir()) / "objects"
+
+_CHUNK_SIZE = 1024 * 1024
+
+_MAGIC = b"\x89OMB"
+_DELTA_HEADER = struct.Struct(">4scH32sQ")
+_MANIFEST_HEADER = struct.Struct(">4scQI")
+_MANIFEST_ENTRY = struct.Struct(">32sH")
+_COMPRESSED_HEADER = struct.Struct(">4scBQ")
+
+# Parsed object header; *parts* is only set for manifests, *codec* for
+# compressed blobs, *offset* is where the payload starts.
+_Header = namedtuple("_Header", "kind depth base size parts offset codec", defaults=(0,))
+
+# keep a compressed blob only if it is at most this fraction of the original
+_MIN_COMPRESSION_GAIN = 0.9
+
+DEFAULT_KEYFRAME_INTERVAL = 10
+DEFAULT_MAX_DELTA_RATIO = 0.5
+_CACHE_BUDGET = 64 * 1024 * 1024       # bytes of reconstructed content
+
+DEFAULT_PACK_MIN_AGE = 7 * 24 * 3600   # seconds before a loose object is packed
+_MAX_PACKS = 8                         # repack when more packs than this exist
+_STAGE_PREFIX = ".stage-"
+
+
+class StagedFile:
+    """A source document streamed once into the store (see ``BlobStore.stage``)."""
+
+    def __init__(self, path: Path, result: IngestResult):
+        self.path = path
+        self.digest = result.sha256
+        self.size = result.size
+        self.zip_summary = result.zip_summary
+
+    def discard(self) -> None:
+        """Remove the staged copy unless it was moved into the store."""
+        self.path.unlink(missing_ok=True)
+
+
+def hash_file(file_path: str,
+              progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """
+    Return the hex SHA‑256 digest of a file, read in 1 MiB chunks.
+
+    *progress* is called with ``(bytes_done, total_bytes)`` after each chunk.
+    """
+    h = hashlib.sha256()
+    total = os.path.getsize(file_path)
+    done = 0
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            h.update(chunk)
+            if progress is not None:
+                done += len(chunk)
+                progress(done, total)
+    return h.hexdigest()
+
+
+class BlobStore:
+    """Sharded, reference‑counted store of immutable snapshot blobs."""
+
+    def __init__(self, root: str | Path | None = None,
+                 delta_mode: bool = False,
+                 keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 max_delta_ratio: float = DEFAULT_MAX_DELTA_RATIO,
+                 docx_parts: bool = True,
+                 compression: str = "none",
+                 compression_level: int = DEFAULT_LEVEL):
+        self.root = Path(root) if root is not None else OBJECTS_ROOT
+        self.delta_mode = delta_mode
+        self.docx_parts = docx_parts
+        self.compression = compression
+        self.compression_level = compression_level
+        self.keyframe_interval = keyframe_interval
+        self.max_delta_ratio = max_delta_ratio
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        # the LRU is read and filled by worker threads outside self._lock
+        self._cache_lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._refs = _RefCounts(self.root / "refs.sqlite3", self.root / "refs.json")
+        # guards refcounts and the pack list; object files are written
+        # outside it (tmp file + os.replace)
+        self._lock = threading.RLock()
+        # refcount changes of all processes sharing the store (see _mutation)
+        self._refs_lock = FileLock(self.root / "refs.lock")
+        self._mutation_depth = 0
+        self.pack_dir = self.root / "pack"
+        # other processes pack and repack too: the list is rescanned when
+        # the pack directory changed (see _refresh_packs)
+        self._packs_mtime: Optional[int] = None
+        self._packs: List[PackFile] = []
+        self._refresh_packs()
+        self._clean_staging()
+
+    # ------------------------------------------------------------------ paths
+    def object_path(self, digest: str) -> Path:
+        """Return on‑disk location of the blob identified by *digest*."""
+        return self.root / digest[:2] / digest[2:]
+
+    def contains(self, digest: str) -> bool:
+        return self.object_path(digest).exists() or self._find_packed(digest) is not None
+
+    # -------------------------------------------------------------------- API
+    def put_file(self, file_path: str, base: Optional[str] = None) -> str:
+        """
+        Add the bytes of *file_path* to the store and take a reference.
+
+        Returns the SHA‑256 digest.  When a blob with the same digest already
+        exists the file is not copied again – only the refcount grows.
+        *base* is the digest of the previous version; in delta mode the new
+        blob is stored as a delta against it when that is worthwhile.  Zip
+        based documents are stored as a manifest of parts in part mode.
+        """
+        return self.put_staged(self.stage(file_path), base)
+
+    def stage(self, file_path: str,
+              progress: Optional[Callable[[int, int], None]] = None) -> "StagedFile":
+        """
+        Stream *file_path* once into the staging area, hashing it on the way.
+
+        The returned ``StagedFile`` knows the digest, size and zip summary;
+        pass it to ``put_staged`` or call ``discard``.
+        """
+        tmp = self.root / f"{_STAGE_PREFIX}{uuid.uuid4().hex}.tmp"
+        try:
+            result = stream_copy(file_path, str(tmp), progress)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return StagedFile(tmp, result)
+
+    def put_staged(self, staged: "StagedFile", base: Optional[str] = None) -> str:
+        """Store a staged file (see ``put_file``) and take a reference."""
+        digest = staged.digest
+        obj = self.object_path(digest)
+        try:
+            tmp = None
+            if not self.contains(digest):
+                # encode outside the lock so several files can be stored at once
+                tmp = self._encode_staged(staged.path, base, obj)
+            with self._mutation():
+                if self.contains(digest):
+                    if tmp is not None:
+                        # another thread or process stored the same content
+                        # first: drop our copy and the references it took
+                        self._discard_encoded(tmp)
+                else:
+                    if tmp is None:
+                        # released by another process since the check above
+                        tmp = self._encode_staged(staged.path, base, obj)
+                    os.replace(tmp, obj)
+                self._take_ref(digest)
+        finally:
+            staged.discard()
+        return digest
+
+    def _encode_staged(self, staged: Path, base: Optional[str], obj: Path) -> Path:
+        """Write the stored form of *staged* to a temporary file next to *obj*."""
+        tmp = self._tmp_path(obj)
+        if not (self._write_manifest(staged, tmp) or self._write_delta(staged, base, tmp)):
+            self._write_plain(staged, tmp)
+        return tmp
+
+    def _discard_encoded(self, tmp: Path) -> None:
+        """Delete an unused encoded object and drop the part / base references it took."""
+        header = _read_file_header(tmp)
+        tmp.unlink()
+        if header is not None:
+            for dep in ([header.base] if header.base else []) + [p for _, p in header.parts]:
+                self._release(dep, self._refs)
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store *data* verbatim (deduplicated) and take a reference."""
+        with self._mutation():
+            return self._put_bytes(data)
+
+    def incref(self, digest: str) -> None:
+        with self._mutation():
+            self._take_ref(digest)
+
+    def release(self, digest: str) -> bool:
+        """
+        Drop one reference to *digest*.
+
+        Returns True when this was the last reference and the blob file has
+        been removed from disk.
+        """
+        with self._mutation():
+            freed = self._release(digest, self._refs)
+        return freed is not None
+
+    def release_many(self, digests: List[str], dry_run: bool = False) -> int:
+        """
+        Drop one reference per entry of *digests* in a single transaction.
+
+        Returns the number of bytes freed on disk, including delta bases and
+        manifest parts that lose their last reference.  With *dry_run* the
+        refcounts are simulated on an overlay and nothing is touched.
+        """
+        with self._mutation():
+            refs = _RefOverlay(self._refs) if dry_run else self._refs
+            freed = 0
+            for digest in digests:
+                freed += self._release(digest, refs, dry_run) or 0
+        return freed
+
+    def transaction(self):
+        """
+        Context manager holding the refcount lock across several calls, so
+        metadata changes made inside stay consistent with the refcounts of
+        every process sharing the store (e.g. a snapshot delete).
+        """
+        return self._mutation()
+
+    def _put_bytes(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        obj = self.object_path(digest)
+        # compress outside the lock; write and reference inside it so another
+        # process cannot delete the object in between
+        encoded = self._encode_plain(data) if not self.contains(digest) else None
+        with self._mutation():
+            if not self.contains(digest):
+                tmp = self._tmp_path(obj)
+                tmp.write_bytes(encoded if encoded is not None else self._encode_plain(data))
+                os.replace(tmp, obj)
+            self._take_ref(digest)
+        return digest
+
+    def _take_ref(self, digest: str) -> None:
+        if digest not in self._refs and not self.object_path(digest).exists():
+            # a dead object still sitting in a pack comes back to life: it
+            # needs its delta base and parts again
+            header = self._read_header(digest) if self.contains(digest) else None
+            if header is not None:
+                for dep in ([header.base] if header.base else []) + [p for _, p in header.parts]:
+                    self._take_ref(dep)
+        self._refs[digest] = self._refs.get(digest, 0) + 1
+
+    def _release(self, digest: str, refs: "_RefCounts | _RefOverlay",
+                 dry_run: bool = False) -> Optional[int]:
+        """
+        Drop one reference in *refs*; returns the bytes freed or None when
+        the blob is still referenced.
+        """
+        count = refs.get(digest, 0) - 1
+        if count > 0:
+            refs[digest] = count
+            return None
+        refs.pop(digest, None)
+        obj = self.object_path(digest)
+        dependencies: List[str] = []
+        freed = 0
+        if self.contains(digest):
+            header = self._read_header(digest)
+            if header is not None:
+                if header.base:
+                    dependencies.append(header.base)
+                dependencies.extend(part for _, part in header.parts)
+            freed = self._stored_size(digest)     # packed: reclaimed by repack
+            if not dry_run and obj.exists():
+                obj.unlink()
+        if not dry_run:
+            self._cache_drop(digest)
+        for dep in dependencies:
+            freed += self._release(dep, refs, dry_run) or 0
+        return freed
+
+    def refcount(self, digest: str) -> int:
+        with self._lock:
+            return self._refs.get(digest, 0)
+
+    def copy_to(self, digest: str, dest_path: str) -> None:
+        """Write the blob's bytes to *dest_path* (e.g. restore a snapshot)."""
+        header = self._read_header(digest)
+        if header is None:
+            try:
+                fast_copy(str(self.object_path(digest)), dest_path)
+            except FileNotFoundError:
+                with open(dest_path, "wb") as f:
+                    f.write(self._packed(digest))
+            return
+        if header.kind == b"Z":
+            with self.source(digest) as src, open(dest_path, "wb") as f:
+                shutil.copyfileobj(src, f, _CHUNK_SIZE)
+            return
+        with open(dest_path, "wb") as f:
+            f.write(self.read_bytes(digest))
+
+    def open_path(self, digest: str) -> Optional[str]:
+        """
+        Return a readable file path for *digest*, or None if the blob is
+        missing or not stored as plain bytes (e.g. a delta).
+        """
+        obj = self.object_path(digest)
+        if not obj.exists() or self._read_header(digest) is not None:
+            return None
+        return str(obj)
+
+    def source(self, digest: str) -> Any:
+        """
+        Return something a loader can read for *digest*: the object path for
+        plain blobs, otherwise a binary stream over the materialised bytes.
+        Packed objects are streamed straight out of the mmap'd pack.
+        """
+        obj = self.object_path(digest)
+        header = self._read_header(digest)
+        if header is None:
+            if obj.exists():
+                return str(obj)
+            return io.BufferedReader(ViewReader(self._packed(digest)), _CHUNK_SIZE)
+        if header.kind == b"Z":
+            try:
+                fp = obj.open("rb")
+            except FileNotFoundError:
+                fp = ViewReader(self._packed(digest))
+            reader = DecompressingReader(fp, header.offset, header.size,
+                                         decompressor_factory(header.codec))
+            return io.BufferedReader(reader, _CHUNK_SIZE)
+        return io.BytesIO(self.read_bytes(digest))
+
+    def logical_size(self, digest: str) -> int:
+        """Size of the content of *digest* once materialised."""
+        header = self._read_header(digest)
+        return header.size if header else self._stored_size(digest)
+
+    def stored_bytes(self) -> int:
+        """Bytes actually occupied by object and pack files on disk."""
+        loose = sum(
+            f.stat().st_size for f in self.root.glob("??/*")
+            if f.is_file() and not f.name.startswith(".")
+        )
+        with self._lock:
+            self._refresh_packs()
+            return loose + sum(pack.size for pack in self._packs)
+
+    # ------------------------------------------------------------------ packs
+    def pack_objects(self, min_age: float = DEFAULT_PACK_MIN_AGE,
+                     digests: Iterable[str] = ()) -> int:
+        """
+        Move referenced loose objects older than *min_age* seconds into a
+        new pack.  *digests* (and the deltas bases / parts they need) are
+        packed regardless of age.  Returns the number of objects packed.
+        """
+        with self._mutation():
+            return self._pack_objects(min_age, digests)
+
+    def _pack_objects(self, min_age: float, digests: Iterable[str]) -> int:
+        self._refresh_packs()
+        cutoff = time.time() - min_age
+        chosen: Dict[str, Path] = {}
+        for f in self.root.glob("??/*"):
+            if f.name.startswith(".") or not f.is_file():
+                continue
+            digest = f.parent.name + f.name
+            if digest in self._refs and f.stat().st_mtime <= cutoff:
+                chosen[digest] = f
+        pending = list(digests)
+        while pending:
+            digest = pending.pop()
+            obj = self.object_path(digest)
+            if digest in chosen or digest not in self._refs or not obj.exists():
+                continue
+            chosen[digest] = obj
+            header = self._read_header(digest)
+            if header is not None:
+                pending.extend(([header.base] if header.base else []) + [p for _, p in header.parts])
+        if not chosen:
+            return 0
+        self._packs.insert(0, PackFile(write_pack(self.pack_dir, chosen.items())))
+        for f in chosen.values():
+            f.unlink()
+        return len(chosen)
+
+    def repack(self, force: bool = False) -> int:
+        """
+        Rewrite all packs into one, dropping objects nobody references.
+
+        Unless *force* is set this only happens when there are more than
+        ``_MAX_PACKS`` packs or at least half of the packed bytes are dead.
+        Returns the number of bytes reclaimed.
+        """
+        with self._mutation():
+            return self._repack(force)
+
+    def _repack(self, force: bool) -> int:
+        self._refresh_packs()
+        if not self._packs:
+            return 0
+        live: Dict[str, memoryview] = {}
+        dead_bytes = total_bytes = 0
+        for pack in self._packs:
+            total_bytes += pack.size
+            for digest, length in pack.entries():
+                if digest in live:
+                    continue
+                if digest in self._refs and not self.object_path(digest).exists():
+                    live[digest] = pack.find(digest)
+                else:
+                    dead_bytes += length
+        if not force and len(self._packs) <= _MAX_PACKS and dead_bytes * 2 < total_bytes:
+            return 0
+        old = self._packs
+        self._packs = [PackFile(write_pack(self.pack_dir, live.items()))] if live else []
+        live.clear()
+        # other processes may still read the old packs: on POSIX their
+        # mappings outlive the unlink, and a reader that misses rescans the
+        # directory and finds the objects in the new pack
+        for pack in old:
+            pack.close()
+            for path in (pack.idx_path, pack.pack_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # still mapped (Windows); dropped by the next repack
+        self._packs_mtime = None
+        return max(0, total_bytes - sum(pack.size for pack in self._packs))
+
+    def _refresh_packs(self, force: bool = False) -> bool:
+        """
+        Bring the pack list in line with the pack directory: map packs
+        written by other processes, drop those repacked away.  Cheap unless
+        the directory's mtime changed.  Returns True if the list changed.
+        """
+        with self._lock:
+            try:
+                mtime = self.pack_dir.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime == self._packs_mtime and not force:
+                return False
+            self._packs_mtime = mtime
+            known = {pack.idx_path: pack for pack in self._packs}
+            on_disk = set(self.pack_dir.glob("pack-*.idx")) if mtime is not None else set()
+            packs: List[PackFile] = []
+            for idx_path in on_disk:
+                pack = known.get(idx_path)
+                if pack is None:
+                    try:
+                        pack = PackFile(idx_path)
+                    except (OSError, ValueError):
+                        continue    # removed meanwhile
+                packs.append(pack)
+            for idx_path, pack in known.items():
+                if idx_path not in on_disk:
+                    pack.close()
+            if mtime is not None:
+                self._remove_orphan_packs(on_disk)
+            # newest first: recently packed objects are the likeliest reads
+            packs.sort(key=lambda p: p.mtime, reverse=True)
+            changed = [p.idx_path for p in packs] != [p.idx_path for p in self._packs]
+            self._packs = packs
+            return changed
+
+    def _remove_orphan_packs(self, indexes: Set[Path]) -> None:
+        """Delete pack files without index: interrupted writes or repacked away."""
+        cutoff = time.time() - 3600     # younger ones may be mid‑write in another process
+        for pack_path in self.pack_dir.glob("pack-*.pack"):
+            if pack_path.with_suffix(".idx") in indexes:
+                continue
+            try:
+                if pack_path.stat().st_mtime < cutoff:
+                    pack_path.unlink()
+            except OSError:
+                pass
+
+    def _clean_staging(self) -> None:
+        """Remove staging files left behind by a crash (older than a day)."""
+        cutoff = time.time() - 24 * 3600
+        for f in self.root.glob(f"{_STAGE_PREFIX}*.tmp"):
+            try:
+                if f.stat().st_mtime < cutoff:
+                    f.unlink()
+            except OSError:
+                pass
+
+    def _find_packed(self, digest: str, rescan: bool = False) -> Optional[memoryview]:
+        """
+        Packed bytes of *digest* or None.  A miss rescans the pack directory
+        if it changed – always with *rescan*, for objects that must exist.
+        """
+        with self._lock:      # repack swaps and unmaps packs
+            for attempt in range(2):
+                for pack in self._packs:
+                    view = pack.find(digest)
+                    if view is not None:
+                        return view
+                if attempt or not self._refresh_packs(force=rescan):
+                    break
+        return None
+
+    def _object_bytes(self, digest: str):
+        """Stored bytes of *digest*: the loose file's content or a pack view."""
+        try:
+            return self.object_path(digest).read_bytes()
+        except FileNotFoundError:
+            # never stored loose, or packed by another process meanwhile
+            return self._packed(digest)
+
+    def _packed(self, digest: str) -> memoryview:
+        view = self._find_packed(digest, rescan=True)
+        if view is None:
+            raise FileNotFoundError(f"Missing blob: {digest}")
+        return view
+
+    def _stored_size(self, digest: str) -> int:
+        try:
+            return self.object_path(digest).stat().st_size
+        except FileNotFoundError:
+            pass
+        view = self._find_packed(digest, rescan=True)
+        return len(view) if view is not None else 0
+
+    def read_bytes(self, digest: str) -> bytes:
+        """
+        Return the full content of *digest*, reconstructing delta chains
+        and part manifests.
+
+        This is the single cached reconstruction API – loaders and diff
+        strategies go through it (via ``source``) and never see deltas.
+        """
+        cached = self._cache_get(digest)
+        if cached is not None:
+            return cached
+        data = self._materialize(digest)
+        self._cache_put(digest, data)
+        return data
+
+    def _materialize(self, digest: str) -> bytes:
+        raw = self._object_bytes(digest)
+        header = _parse_header(raw)
+        if header is None:
+            return bytes(raw)
+        if header.kind == b"Z":
+            return decompress(header.codec, memoryview(raw)[header.offset:])
+        if header.kind == b"D":
+            # bases go through the cache: neighbouring versions share them
+            return apply_delta(self.read_bytes(header.base), raw[header.offset:])
+        # parts are not cached individually – the rebuilt archive is
+        return b"".join(self._materialize(part) for _, part in header.parts)
+
+    # ----------------------------------------------------------- encodings
+    def _delta_depth(self, digest: str) -> int:
+        header = self._read_header(digest)
+        return header.depth if header else 0
+
+    def _read_header(self, digest: str) -> Optional[_Header]:
+        """Return the parsed header of an encoded object, None for raw blobs."""
+        try:
+            return _read_file_header(self.object_path(digest))
+        except FileNotFoundError:
+            return _parse_header(self._packed(digest))
+
+    def _write_plain(self, staging: Path, dest: Path) -> None:
+        """
+        Move the staged copy to *dest*, compressed when that saves space.
+        Uncompressed blobs are renamed into place – no second copy.
+        """
+        with open(staging, "rb") as f:
+            ambiguous = f.read(len(_MAGIC)) == _MAGIC
+        codec = self._plain_codec(ambiguous)
+        if codec is None:
+            os.replace(staging, dest)
+            return
+        size = staging.stat().st_size
+        comp = compressor(codec, self.compression_level)
+        with open(staging, "rb") as src, open(dest, "wb") as out:
+            out.write(_COMPRESSED_HEADER.pack(_MAGIC, b"Z", CODEC_IDS[codec], size))
+            for chunk in iter(lambda: src.read(_CHUNK_SIZE), b""):
+                out.write(comp.compress(chunk))
+            out.write(comp.flush())
+        if not ambiguous and dest.stat().st_size > size * _MIN_COMPRESSION_GAIN:
+            os.replace(staging, dest)
+
+    def _encode_plain(self, data: bytes) -> bytes:
+        """Return the on‑disk form of a plain blob (compressed if worthwhile)."""
+        ambiguous = data.startswith(_MAGIC)
+        codec = self._plain_codec(ambiguous)
+        if codec is None or not data:
+            return data
+        comp = compressor(codec, self.compression_level)
+        packed = comp.compress(data) + comp.flush()
+        if not ambiguous and _COMPRESSED_HEADER.size + len(packed) > len(data) * _MIN_COMPRESSION_GAIN:
+            return data
+        return _COMPRESSED_HEADER.pack(_MAGIC, b"Z", CODEC_IDS[codec], len(data)) + packed
+
+    def _plain_codec(self, ambiguous: bool) -> Optional[str]:
+        """
+        Codec for a plain blob, None to store it raw.  Content starting with
+        ``_MAGIC`` is *ambiguous* – stored raw it would read as an encoded
+        object – and always gets a header, zlib if compression is off.
+        """
+        if self.compression in CODEC_IDS:
+            return self.compression
+        return "zlib" if ambiguous else None
+
+    def _write_manifest(self, file_path: str, dest: Path) -> bool:
+        """
+        Try to write *file_path* to *dest* as a manifest of zip parts.
+
+        Returns False when part mode is off or the file is not a zip archive.
+        """
+        if not self.docx_parts:
+            return False
+        with open(file_path, "rb") as f:
+            data = f.read()
+        parts = split_archive(data)
+        if parts is None:
+            return False
+        entries = [(name, self._put_bytes(data[start:end])) for name, start, end in parts]
+        with open(dest, "wb") as f:
+            f.write(_MANIFEST_HEADER.pack(_MAGIC, b"M", len(data), len(entries)))
+            for name, part in entries:
+                encoded = name.encode("utf-8")
+                f.write(_MANIFEST_ENTRY.pack(bytes.fromhex(part), len(encoded)))
+                f.write(encoded)
+        return True
+
+    def _write_delta(self, file_path: str, base: Optional[str], dest: Path) -> bool:
+        """
+        Try to write *file_path* to *dest* as a delta against *base*.
+
+        Returns False when a full keyframe should be written instead.
+        """
+        if not self.delta_mode or not base:
+            return False
+        with self._mutation():
+            if not self.contains(base):
+                return False
+            self._take_ref(base)                          # the delta keeps its base alive
+        written = False
+        try:
+            depth = self._delta_depth(base) + 1
+            if depth >= self.keyframe_interval:
+                return False
+            with open(file_path, "rb") as f:
+                target = f.read()
+            delta = make_delta(self.read_bytes(base), target,
+                               max_size=int(len(target) * self.max_delta_ratio))
+            if delta is None:
+                return False
+            with open(dest, "wb") as f:
+                f.write(_DELTA_HEADER.pack(_MAGIC, b"D", depth, bytes.fromhex(base), len(target)))
+                f.write(delta)
+            written = True
+            return True
+        finally:
+            if not written:
+                self.release(base)
+
+    # ------------------------------------------------------------------ cache
+    def _cache_get(self, digest: str) -> Optional[bytes]:
+        with self._cache_lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+            return data
+
+    def _cache_put(self, digest: str, data: bytes) -> None:
+        if len(data) > _CACHE_BUDGET:
+            return
+        with self._cache_lock:
+            if digest in self._cache:
+                return
+            self._cache[digest] = data
+            self._cache_bytes += len(data)
+            while self._cache_bytes > _CACHE_BUDGET:
+                _, old = self._cache.popitem(last=False)
+                self._cache_bytes -= len(old)
+
+    def _cache_drop(self, digest: str) -> None:
+        with self._cache_lock:
+            data = self._cache.pop(digest, None)
+            if data is not None:
+                self._cache_bytes -= len(data)
+
+    # ---------------------------------------------------------------- helpers
+    @staticmethod
+    def _tmp_path(obj: Path) -> Path:
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        return obj.with_name(f".{obj.name}.{uuid.uuid4().hex[:6]}.tmp")
+
+    @contextmanager
+    def _mutation(self):
+        """
+        Refcount read‑modify‑write: excludes other threads and processes
+        and commits the changed counts as one transaction on exit.
+        Re‑entrant; object files written or removed inside stay consistent
+        with the counts.
+        """
+        with self._lock, self._refs_lock.exclusive():
+            self._mutation_depth += 1
+            if self._mutation_depth == 1:
+                self._refs.begin()
+            try:
+                yield
+            finally:
+                self._mutation_depth -= 1
+                if self._mutation_depth == 0:
+                    # committed even after an error: the counts must match
+                    # the object files already written or removed
+                    self._refs.commit()
+
+
+class _RefCounts:
+    """
+    Blob reference counts in SQLite (``refs(digest, count)``).
+
+    The connection is shared by the store's threads; callers hold
+    ``BlobStore._lock`` and write only inside ``BlobStore._mutation``.
+    """
+
+    def __init__(self, db_path: Path, legacy_json: Path):
+        self._conn = sqlite3.connect(str(db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.begin()
+        try:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS refs ("
+                               "digest TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                if legacy_json.exists():
+                    with legacy_json.open("r", encoding="utf-8") as f:
+                        legacy = json.load(f)
+                    self._conn.executemany("INSERT OR REPLACE INTO refs VALUES (?, ?)",
+                                           [(d, c) for d, c in legacy.items() if c > 0])
+                self._conn.execute("PRAGMA user_version = 1")
+        finally:
+            self.commit()
+
+    def begin(self) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self) -> None:
+        self._conn.execute("COMMIT")
+
+    def get(self, digest: str, default: int = 0) -> int:
+        row = self._conn.execute("SELECT count FROM refs WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else default
+
+    def __contains__(self, digest: str) -> bool:
+        return self.get(digest) > 0
+
+    def __setitem__(self, digest: str, count: int) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO refs VALUES (?, ?)", (digest, count))
+
+    def pop(self, digest: str, default: Optional[int] = None) -> Optional[int]:
+        count = self.get(digest, default)
+        self._conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+        return count
+
+
+class _RefOverlay:
+    """Changes to ``_RefCounts`` kept in memory – ``release_many(dry_run=True)``."""
+
+    def __init__(self, base: _RefCounts):
+        self._base = base
+        self._changes: Dict[str, int] = {}
+
+    def get(self, digest: str, default: int = 0) -> int:
+        if digest in self._changes:
+            return self._changes[digest]
+        return self._base.get(digest, default)
+
+    def __contains__(self, digest: str) -> bool:
+        return self.get(digest) > 0
+
+    def __setitem__(self, digest: str, count: int) -> None:
+        self._changes[digest] = count
+
+    def pop(self, digest: str, default: Optional[int] = None) -> Optional[int]:
+        count = self.get(digest, default)
+        self._changes[digest] = 0
+        return count
+
+
+def _read_file_header(path: Path) -> Optional[_Header]:
+    """Parse the header of an object file without reading its payload."""
+    with path.open("rb") as f:
+        head = f.read(_DELTA_HEADER.size)
+        if head[4:5] == b"M" and head.startswith(_MAGIC):
+            head += f.read()
+    return _parse_header(head)
+
+
+def _parse_header(raw) -> Optional[_Header]:
+    """Parse the header of an encoded object (bytes or memoryview); None for raw blobs."""
+    if bytes(raw[:4]) != _MAGIC:
+        return None
+    kind = bytes(raw[4:5])
+    if kind == b"D":
+        _, _, depth, base_raw, size = _DELTA_HEADER.unpack_from(raw)
+        return _Header(kind, depth, base_raw.hex(), size, (), _DELTA_HEADER.size)
+    if kind == b"M":
+        _, _, size, count = _MANIFEST_HEADER.unpack_from(raw)
+        pos = _MANIFEST_HEADER.size
+        parts: List[Tuple[str, str]] = []
+        for _ in range(count):
+            part_raw, name_len = _MANIFEST_ENTRY.unpack_from(raw, pos)
+            pos += _MANIFEST_ENTRY.size
+            parts.append((bytes(raw[pos:pos + name_len]).decode("utf-8"), part_raw.hex()))
+            pos += name_len
+        return _Header(kind, 0, None, size, tuple(parts), pos)
+    if kind == b"Z":
+        _, _, codec, size = _COMPRESSED_HEADER.unpack_from(raw)
+        return _Header(kind, 0, None, size, (), _COMPRESSED_HEADER.size, codec)
+    # raw content that happens to start with the magic (stored before such
+    # content always got a header)
+    return None
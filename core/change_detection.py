@@ -0,0 +1,78 @@
+"""
+change_detection
+================
+
+Decide whether a document changed since its latest snapshot.
+
+Two levels are used by ``SnapshotManager.create_snapshot``:
+
+1. **Bytes** – size + mtime recorded at snapshot time; when either differs
+   the SHA‑256 of the file is compared with the latest blob digest.
+2. **Semantics** (optional) – a hash of the loader's ``load_structured``
+   token stream.  Word re‑saves rewrite rsid attributes, zip timestamps and
+   often split runs differently without changing text or formatting; runs
+   with identical formatting are therefore merged before hashing, so such
+   saves hash the same.  Image runs carry no picture identity, so the CRCs
+   of the archive's media members (``zip_summary["media_digest"]``) are
+   folded in: replacing a picture is a change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def file_signature(file_path: str) -> Tuple[int, int]:
+    """Return ``(size, mtime_ns)`` of *file_path*."""
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def signature_matches(meta: Dict, file_path: str, signature: Tuple[int, int]) -> bool:
+    """True if *meta* was taken from *file_path* with the same size and mtime."""
+    return (meta.get("file_path") == file_path
+            and meta.get("size") == signature[0]
+            and meta.get("mtime_ns") == signature[1])
+
+
+def semantic_hash(structured: Any, zip_summary: Optional[Dict] = None) -> Optional[str]:
+    """
+    Hash a ``load_structured`` result, ignoring run boundaries, together
+    with the media digest of *zip_summary* (embedded pictures / objects).
+
+    Returns None when *structured* is not a paragraph list (e.g. a loader
+    that returns plain text).
+    """
+    if not isinstance(structured, list):
+        return None
+    h = hashlib.sha256()
+    media = (zip_summary or {}).get("media_digest")
+    if media:
+        h.update(f"media:{media}\n".encode("ascii"))
+    for block in structured:
+        if isinstance(block, dict):
+            block = dict(block, runs=_merge_runs(block.get("runs") or []))
+            block.pop("index", None)
+        h.update(json.dumps(block, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _merge_runs(runs: List[Any]) -> List[Any]:
+    """Join adjacent text runs whose formatting is identical."""
+    merged: List[Any] = []
+    for run in runs:
+        if (merged and isinstance(run, dict) and run.get("type") == "text"
+                and isinstance(merged[-1], dict) and merged[-1].get("type") == "text"
+                and _format_of(merged[-1]) == _format_of(run)):
+            merged[-1] = dict(merged[-1], text=(merged[-1].get("text") or "") + (run.get("text") or ""))
+        else:
+            merged.append(run)
+    return [r for r in merged if not (isinstance(r, dict) and r.get("type") == "text" and not r.get("text"))]
+
+
+def _format_of(run: Dict) -> Dict:
+    return {k: v for k, v in run.items() if k != "text"}
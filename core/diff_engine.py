@@ -4,7 +4,9 @@ DiffEngine
 
 Central coordinator that selects an appropriate DiffStrategy to compare
 two snapshot files.  The concrete strategies live in
-`core.diff_strategies` and are registered here in order of priority.
+`core.diff_strategies` and are registered here in order of priority, by
+``"module:Class"`` so that they are imported on the first comparison
+rather than at start‑up.
 
 Currently available strategies
 ------------------------------
@@ -15,19 +17,18 @@ Currently available strategies
 Design principles
 -----------------
 * Open/Closed – add new strategies without modifying core logic; just
-  create a new strategy class and insert it into `self.strategies`.
+  create a new strategy class and insert it into `STRATEGIES` (or into
+  `self.strategies` of one engine).
 * Single Responsibility – DiffEngine only handles strategy selection /
   orchestration, not the diff algorithm itself.
 * Dependency Inversion – DiffEngine depends on abstract `DiffStrategy`,
   not concrete algorithms.
 """
 
+import importlib
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, List, Optional
 
-# strategy imports
-from .diff_strategies.paragraph_strategy import ParagraphDiffStrategy
-from .diff_strategies.text_strategy import TextDiffStrategy
 from .diff_strategies.base_strategy import DiffResult, DiffStrategy
 from .snapshot_loaders.loader_registry import LoaderRegistry
 
@@ -35,12 +36,39 @@ from .snapshot_loaders.loader_registry import LoaderRegistry
 class DiffEngine:
     """Selects and executes an appropriate diff strategy."""
 
-    def __init__(self) -> None:
-        # Priority‑ordered list of strategies (first to support wins)
-        self.strategies: List[DiffStrategy] = [
-            ParagraphDiffStrategy(),  # structure‑aware diff
-            TextDiffStrategy(),       # fallback
-        ]
+    # Priority‑ordered strategies (first to support wins), imported on first use
+    STRATEGIES = (
+        "core.diff_strategies.paragraph_strategy:ParagraphDiffStrategy",  # structure‑aware diff
+        "core.diff_strategies.text_strategy:TextDiffStrategy",            # fallback
+    )
+
+    def __init__(self, resolver: Optional[Callable[[str], Any]] = None,
+                 parser: Optional[Callable[[str], Any]] = None) -> None:
+        """
+        *resolver* maps a (possibly logical) snapshot path to the source a
+        loader should read – see ``SnapshotManager.snapshot_source``;
+        *parser* maps it to a shared parsed document – see
+        ``SnapshotManager.parse_snapshot``.
+        """
+        self._resolver = resolver
+        self._parser = parser
+        self._strategies: Optional[List[DiffStrategy]] = None
+
+    @property
+    def strategies(self) -> List[DiffStrategy]:
+        """Strategy instances in priority order, created on first access."""
+        if self._strategies is None:
+            strategies = []
+            for spec in self.STRATEGIES:
+                module, _, name = spec.partition(":")
+                cls = getattr(importlib.import_module(module), name)
+                strategies.append(cls(self._resolver, self._parser))
+            self._strategies = strategies
+        return self._strategies
+
+    @strategies.setter
+    def strategies(self, strategies: List[DiffStrategy]) -> None:
+        self._strategies = strategies
 
     # --------------------------------------------------------------------- API
     def compare_files(self, file_a: str, file_b: str) -> DiffResult:
@@ -11,7 +11,11 @@ DiffResult.structured: optional rich diff object for advanced UI.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from ..snapshot_loaders.document_cache import parse_document, parse_file
+from ..snapshot_loaders.parsed_document import ParsedDocument
 
 
 class DiffResult:
@@ -24,6 +28,26 @@ class DiffResult:
 class DiffStrategy(ABC):
     """Strategy interface for comparing two snapshot files."""
 
+    def __init__(self, resolver: Optional[Callable[[str], Any]] = None,
+                 parser: Optional[Callable[[str], Optional[ParsedDocument]]] = None):
+        # maps logical snapshot paths to what loaders actually read
+        self._resolver = resolver
+        # maps paths to shared parsed documents (SnapshotManager.parse_snapshot)
+        self._parser = parser
+
+    def source(self, path: str) -> Any:
+        """Return the loader input for *path* (resolved if a resolver is set)."""
+        return self._resolver(path) if self._resolver else path
+
+    def document(self, path: str) -> Optional[ParsedDocument]:
+        """Parsed document for *path*; None if no loader handles it."""
+        if self._parser:
+            return self._parser(path)
+        source = self.source(path)
+        if isinstance(source, str):
+            return parse_file(source, Path(path).suffix)
+        return parse_document(source, Path(path).suffix)
+
     @abstractmethod
     def supports(self, loader_a, loader_b) -> bool:
         """Return True if this strategy can handle the two loaders."""
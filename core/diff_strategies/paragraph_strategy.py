@@ -6,13 +6,12 @@ ParagraphDiffStrategy 2.0
 • 连续 equal 段落 > CONTEXT_LINES*2 折叠为 "skip" 块
 """
 
-from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, FrozenSet, Optional
 from PySide6.QtCore import QSettings
 import difflib
 
 from .base_strategy import DiffStrategy, DiffResult
-from ..snapshot_loaders.loader_registry import LoaderRegistry
+from ..snapshot_loaders.parsed_document import ParsedDocument
 
 
 CONTEXT_LINES = 3           # 保留前后上下文段落数
@@ -22,96 +21,39 @@ class ParagraphDiffStrategy(DiffStrategy):
     """Docx / 富文本 段落级 diff（支持行内变化和折叠）"""
 
     # ------------------------------------------------ helper
-    @staticmethod
-    def _paragraph_texts(loader, path: str) -> List[str]:
-        """调用 loader.load_structured → 返回带样式 token 的段落文本列表"""
+    # diff/detect_* setting -> paragraph_tokens feature
+    _DETECT_SETTINGS = {
+        "detect_bold": "bold",
+        "detect_italic": "italic",
+        "detect_underline": "underline",
+        "detect_font": "font",
+        "detect_color": "color",
+        "detect_size": "size",
+        "detect_line_spacing": "line_spacing",
+        "detect_alignment": "alignment",
+        "detect_numbering": "numbering",
+        "detect_images": "images",
+        "detect_tables": "tables",
+        "detect_style": "style",
+        "detect_indent": "indent",
+    }
+
+    @classmethod
+    def token_options(cls) -> FrozenSet[str]:
+        """当前设置中启用的样式检测项（paragraph_tokens 的 options）"""
+        settings = QSettings()
+        return frozenset(feature for key, feature in cls._DETECT_SETTINGS.items()
+                         if settings.value(f"diff/{key}", True, type=bool))
+
+    @classmethod
+    def paragraph_texts(cls, doc: Optional[ParsedDocument]) -> List[str]:
+        """带样式 token 的段落文本列表（按当前设置）；读取失败时为空"""
+        if doc is None:
+            return []
         try:
-            struct = loader.load_structured(path)
+            return doc.paragraph_tokens(cls.token_options())
         except Exception:
             return []
-        if not struct:
-            return []
-        if isinstance(struct[0], str):
-            return struct
-
-        settings = QSettings()
-        detect_bold = settings.value("diff/detect_bold", True, type=bool)
-        detect_italic = settings.value("diff/detect_italic", True, type=bool)
-        detect_underline = settings.value("diff/detect_underline", True, type=bool)
-        detect_font = settings.value("diff/detect_font", True, type=bool)
-        detect_color = settings.value("diff/detect_color", True, type=bool)
-        detect_size = settings.value("diff/detect_size", True, type=bool)
-        detect_ls = settings.value("diff/detect_line_spacing", True, type=bool)
-        detect_align = settings.value("diff/detect_alignment", True, type=bool)
-        detect_num = settings.value("diff/detect_numbering", True, type=bool)
-        detect_img = settings.value("diff/detect_images", True, type=bool)
-        detect_table = settings.value("diff/detect_tables", True, type=bool)
-        detect_style = settings.value("diff/detect_style", True, type=bool)
-        detect_indent = settings.value("diff/detect_indent", True, type=bool)
-
-        texts: List[str] = []
-        for p in struct:
-            if not isinstance(p, dict):
-                texts.append(str(p))
-                continue
-            runs = p.get("runs")
-            parts = []
-            ls = p.get("line_spacing")
-            if ls is not None and detect_ls:
-                parts.append(f"<ls:{ls}/>")
-            align = p.get("alignment")
-            if align and detect_align:
-                parts.append(f"<align:{align}/>")
-            if detect_indent:
-                left = p.get("indent_left")
-                first = p.get("indent_first")
-                if left is not None or first is not None:
-                    parts.append(f"<indent:{left},{first}/>")
-            style = p.get("style")
-            if style and detect_style:
-                parts.append(f"<style:{style}/>")
-            if p.get("numbering") and detect_num:
-                parts.append("<num/>")
-            if not runs:
-                parts.append(p.get("text", ""))
-                texts.append("".join(parts))
-                continue
-
-            for r in runs:
-                r_type = r.get("type", "text")
-                if r_type == "image":
-                    if detect_img:
-                        parts.append("<image/>")
-                    continue
-                if r_type == "table":
-                    rows = r.get("rows", [])
-                    table_text = "\n".join(" | ".join(row) for row in rows)
-                    if detect_table:
-                        parts.append(f"<table>{table_text}</table>")
-                    else:
-                        parts.append(table_text)
-                    continue
-
-                txt = r.get("text", "")
-                if r.get("bold") and detect_bold:
-                    txt = f"<b>{txt}</b>"
-                if r.get("italic") and detect_italic:
-                    txt = f"<i>{txt}</i>"
-                if r.get("underline") and detect_underline:
-                    txt = f"<u>{txt}</u>"
-                font = r.get("font")
-                if font and detect_font:
-                    txt = f"<font:{font}>{txt}</font>"
-                size = r.get("size")
-                if size is not None and detect_size:
-                    txt = f"<size:{size}>{txt}</size>"
-                color = r.get("color")
-                if color and detect_color:
-                    txt = f"<color:{color}>{txt}</color>"
-                parts.append(txt)
-
-            texts.append("".join(parts))
-        return texts
 
     @staticmethod
     def _inline_ops(a: str, b: str):
@@ -127,11 +69,8 @@ class ParagraphDiffStrategy(DiffStrategy):
         )
 
     def diff(self, path_a: str, path_b: str) -> DiffResult:
-        loader_a = LoaderRegistry.get_loader(Path(path_a).suffix)
-        loader_b = LoaderRegistry.get_loader(Path(path_b).suffix)
-
-        para_a = self._paragraph_texts(loader_a, path_a)
-        para_b = self._paragraph_texts(loader_b, path_b)
+        para_a = self.paragraph_texts(self.document(path_a))
+        para_b = self.paragraph_texts(self.document(path_b))
 
         sm = difflib.SequenceMatcher(None, para_a, para_b, autojunk=False)
         chunks: List[Dict] = []
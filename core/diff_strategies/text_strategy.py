@@ -23,25 +23,27 @@ from pathlib import Path
 import difflib
 
 from .base_strategy import DiffStrategy, DiffResult
-from ..snapshot_loaders.loader_registry import LoaderRegistry
+from ..snapshot_loaders.base_loader import open_source
 
 
 class TextDiffStrategy(DiffStrategy):
     """Line‑level text diff, acts as fallback."""
 
     # ------------------------------------------------------------------ utils
-    def _read_text(self, loader, path: str) -> str:
+    def _read_text(self, path: str) -> str:
         """
-        Try loader.get_text first; if loader is None or fails, read file
-        as UTF‑8 best‑effort.
+        Try the loader's text view first; if there is no loader or it
+        fails, read the file as UTF‑8 best‑effort.
         """
-        if loader:
-            try:
-                return loader.get_text(path)
-            except Exception:
-                pass  # fallback below
         try:
-            return Path(path).read_text(encoding="utf-8", errors="ignore")
+            doc = self.document(path)
+            if doc is not None:
+                return doc.text
+        except Exception:
+            pass  # fallback below
+        try:
+            with open_source(self.source(path)) as fp:
+                return fp.read().decode("utf-8", errors="ignore")
         except Exception:
             return ""
 
@@ -52,13 +54,8 @@ class TextDiffStrategy(DiffStrategy):
 
     def diff(self, path_a: str, path_b: str) -> DiffResult:
         """Return unified diff of two text snapshots."""
-        ext_a = Path(path_a).suffix
-        ext_b = Path(path_b).suffix
-        loader_a = LoaderRegistry.get_loader(ext_a)
-        loader_b = LoaderRegistry.get_loader(ext_b)
-
-        text_a = self._read_text(loader_a, path_a)
-        text_b = self._read_text(loader_b, path_b)
+        text_a = self._read_text(path_a)
+        text_b = self._read_text(path_b)
 
         diff_lines = difflib.unified_diff(
             text_a.splitlines(),
@@ -0,0 +1,123 @@
+"""
+docx_parts
+==========
+
+Split Office Open XML archives (.docx, also .xlsx / .pptx) into their zip
+member records so the blob store can deduplicate them individually.
+
+Each part is the *verbatim* byte range of one member – local file header,
+compressed data and optional data descriptor – followed by a final part
+holding the central directory and end‑of‑central‑directory record.
+Concatenating the parts in order yields the original archive byte for byte,
+so a rebuilt snapshot keeps its SHA‑256 and nothing is recompressed.
+
+``central_directory_summary`` reads just the central directory from the end
+of a file to fingerprint an archive during ingestion.
+
+Between two saves Word usually rewrites only ``word/document.xml`` and a few
+small XML members; ``word/media/*``, ``styles.xml``, ``theme1.xml``,
+``fontTable.xml`` and the headers come out identical and are stored once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import struct
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+# (member name, start offset, end offset); "" names leading / trailing bytes
+Part = Tuple[str, int, int]
+
+CENTRAL_DIRECTORY = ""
+
+
+def split_archive(data: bytes) -> Optional[List[Part]]:
+    """
+    Return the member byte ranges of the zip archive *data*.
+
+    Returns None when *data* is not a readable zip archive, in which case
+    the caller should store it whole.
+    """
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(data))
+        infos = sorted(zf.infolist(), key=lambda info: info.header_offset)
+        start_dir = zf.start_dir
+    except (zipfile.BadZipFile, OSError, ValueError):
+        return None
+    if not infos:
+        return None
+
+    parts: List[Part] = []
+    first = infos[0].header_offset
+    if first > 0:  # e.g. a self‑extracting stub; keep it verbatim
+        parts.append((CENTRAL_DIRECTORY, 0, first))
+    bounds = [info.header_offset for info in infos] + [start_dir]
+    for info, start, end in zip(infos, bounds, bounds[1:]):
+        if end <= start:
+            return None
+        parts.append((info.filename, start, end))
+    parts.append((CENTRAL_DIRECTORY, start_dir, len(data)))
+    return parts
+
+
+# folders of embedded pictures and objects (word/media, xl/embeddings, …)
+_MEDIA_DIRS = ("media", "embeddings")
+
+_EOCD = struct.Struct("<4s4H2LH")          # end of central directory record
+_CDIR = struct.Struct("<4s6H3L5H2L")        # central directory file header
+
+
+def central_directory_summary(tail: bytes, total_size: int) -> Optional[Dict]:
+    """
+    Summarise the central directory found in *tail*, the last bytes of a
+    file of *total_size* bytes.
+
+    Returns ``{"entries", "uncompressed_size", "crc_digest"}`` – the digest
+    covers every member's name and CRC‑32 (sorted by name), so it identifies
+    the archive content independently of zip timestamps and member order.
+    Archives with embedded pictures or objects also get ``"media_digest"``,
+    the same digest over those members only.  None when *tail* does not end
+    with a (non‑zip64) zip directory.
+    """
+    pos = tail.rfind(b"PK\x05\x06")
+    if pos < 0 or len(tail) - pos < _EOCD.size:
+        return None
+    _, _, _, _, count, cd_size, cd_offset, _ = _EOCD.unpack_from(tail, pos)
+    start = cd_offset - (total_size - len(tail))
+    if start < 0 or start + cd_size > pos or cd_offset == 0xFFFFFFFF:
+        return None
+    members = []
+    uncompressed = 0
+    p = start
+    for _ in range(count):
+        if p + _CDIR.size > len(tail):
+            return None
+        fields = _CDIR.unpack_from(tail, p)
+        if fields[0] != b"PK\x01\x02":
+            return None
+        crc, usize = fields[7], fields[9]
+        name_len, extra_len, comment_len = fields[10], fields[11], fields[12]
+        name = tail[p + _CDIR.size:p + _CDIR.size + name_len].decode("utf-8", errors="replace")
+        members.append((name, crc))
+        uncompressed += usize
+        p += _CDIR.size + name_len + extra_len + comment_len
+    summary = {"entries": count, "uncompressed_size": uncompressed,
+               "crc_digest": _members_digest(members)}
+    media = [(name, crc) for name, crc in members if _is_media(name)]
+    if media:
+        summary["media_digest"] = _members_digest(media)
+    return summary
+
+
+def _members_digest(members: List[Tuple[str, int]]) -> str:
+    h = hashlib.sha256()
+    for name, crc in sorted(members):
+        h.update(f"{name}\0{crc:08x}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _is_media(name: str) -> bool:
+    folders = name.split("/")[:-1]
+    return bool(folders) and folders[-1] in _MEDIA_DIRS and not name.endswith("/")
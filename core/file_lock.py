@@ -0,0 +1,105 @@
+"""
+file_lock
+=========
+
+Advisory inter‑process file lock.
+
+``fcntl.flock`` on macOS / Linux, ``msvcrt.locking`` on Windows (which has
+no shared mode, so shared requests lock exclusively there).  The lock is
+re‑entrant within one ``FileLock`` object and also serialises the threads
+of the owning process; a shared hold cannot be upgraded to exclusive::
+
+    lock = FileLock(data_dir / "versions.lock")
+    with lock.exclusive():
+        ...  # read‑modify‑write
+    with lock.shared():
+        ...  # consistent read
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover – Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Shared / exclusive advisory lock on *path* (created if missing)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._hold(exclusive=True):
+            yield
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._hold(exclusive=False):
+            yield
+
+    @contextmanager
+    def _hold(self, exclusive: bool) -> Iterator[None]:
+        with self._thread_lock:
+            if self._depth == 0:
+                self._acquire(exclusive)
+            elif exclusive and not self._exclusive:
+                # two shared holders upgrading at once would deadlock
+                raise RuntimeError("cannot upgrade a shared lock to exclusive")
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._release()
+
+    def _acquire(self, exclusive: bool) -> None:
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            self._lock_fd(exclusive)
+        except BaseException:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        self._exclusive = exclusive or fcntl is None
+
+    @property
+    def held_exclusive(self) -> bool:
+        return self._depth > 0 and self._exclusive
+
+    def _lock_fd(self, exclusive: bool) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            return
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:      # LK_LOCK gives up after ~10 s – keep waiting
+                time.sleep(0.05)
+
+    def _release(self) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
@@ -765,7 +765,45 @@ _TRANSLATIONS = {
         "fr": "… {count} paragraphes inchang\u00e9s …",
         "ru": "… {count} \u0431\u0435\u0437 \u0438\u0437\u043c\u0435\u043d\u0435\u043d\u0438\u0439 \u0430\u0431\u0437\u0430\u0446\u0435\u0432 …",
         "ko": "… {count}\uac1c \ub2e8\ub77d \ubcc0\ud654 \uc5c6\uc74c …",
-    }
+    },
+    "增量存储（仅保存与上一版本的差异）": {"en": "Delta storage (store only changes from the previous version)"},
+    "关键帧间隔：": {"en": "Keyframe interval:"},
+    "按部件去重存储 Word 文档": {"en": "Deduplicate Word documents by part"},
+    "压缩方式：": {"en": "Compression:"},
+    "不压缩": {"en": "None"},
+    "压缩级别：": {"en": "Level:"},
+    "快照占用：{stored:.1f} MB（原始 {logical:.1f} MB）": {"en": "Snapshot storage: {stored:.1f} MB (logical {logical:.1f} MB)"},
+    "整理历史": {"en": "Thin history"},
+    "已删除 {n} 个快照，释放 {mb:.1f} MB": {"en": "Removed {n} snapshots, freed {mb:.1f} MB"},
+    "没有需要清理的快照": {"en": "No snapshots to thin"},
+    "将删除 {n} 个快照，释放约 {mb:.1f} MB。带备注的快照和恢复点会被保留。继续？": {"en": "This removes {n} snapshots and frees about {mb:.1f} MB. Snapshots with remarks and restore points are kept. Continue?"},
+    "打包旧快照": {"en": "Pack old snapshots"},
+    "已打包 {n} 个对象": {"en": "Packed {n} objects"},
+    "自快照“{name}”以来没有变化": {"en": "No changes since snapshot \"{name}\""},
+    "内容未变化时不创建快照（忽略格式噪声）": {"en": "Skip snapshots when content is unchanged (ignore save noise)"},
+    "正在创建快照… {pct}%": {"en": "Creating snapshot… {pct}%"},
+    "为所选项目创建快照（{n}）": {"en": "Snapshot selected projects ({n})"},
+    "为全部项目创建快照": {"en": "Snapshot all projects"},
+    "已创建 {created} 个，未变化 {unchanged} 个，失败 {failed} 个": {"en": "Created {created}, unchanged {unchanged}, failed {failed}"},
+    "批量快照": {"en": "Bulk snapshot"},
+    "{n} 字": {"en": "{n} words"},
+    "{paragraphs} 段，{words} 字，{characters} 字符，{tables} 个表格，{images} 张图片": {"en": "{paragraphs} paragraphs, {words} words, {characters} characters, {tables} tables, {images} images"},
+    "较上一快照：新增 {inserted} 段，删除 {deleted} 段，修改 {modified} 段": {"en": "Since previous snapshot: {inserted} paragraphs added, {deleted} deleted, {modified} modified"},
+    "搜索(&S)": {"en": "&Search"},
+    "全文搜索…": {"en": "Full-text Search…"},
+    "全文搜索": {"en": "Full-text Search"},
+    "搜索所有快照的正文和备注…": {"en": "Search the text and remarks of all snapshots…"},
+    "显示最新的 {n} 条结果（{ms:.0f} ms）": {"en": "Showing the newest {n} results ({ms:.0f} ms)"},
+    "{n} 条结果（{ms:.0f} ms）": {"en": "{n} results ({ms:.0f} ms)"},
+    "备注": {"en": "Remark"},
+    "第 {n} 段": {"en": "Paragraph {n}"},
+    "正在为旧快照建立索引… {indexed}/{total}": {"en": "Indexing older snapshots… {indexed}/{total}"},
+    "{n} 个快照": {"en": "{n} snapshots"},
+    "解析缓存上限（MB，0 为关闭）：": {"en": "Parse cache limit (MB, 0 = off):"},
+    "文档内存缓存上限（MB）：": {"en": "Document memory cache limit (MB):"},
+    "文档缓存：{n} 个文档，{mb:.1f} MB，命中率 {rate:.0%}": {"en": "Document cache: {n} documents, {mb:.1f} MB, hit rate {rate:.0%}"},
+    "快照占用：统计中…": {"en": "Snapshot storage: calculating…"},
+    "快照占用：统计失败（{error}）": {"en": "Snapshot storage: could not be calculated ({error})"},
 }
 
 # Populate other languages with English text if missing
@@ -0,0 +1,134 @@
+"""
+ingest
+======
+
+Single‑pass ingestion of source documents.
+
+``stream_copy`` reads the source exactly once in large buffers (``readinto``
+into one reusable buffer) and, in the same pass, writes the copy, updates
+the SHA‑256, counts the bytes and keeps the tail of the file – enough to
+summarise the zip central directory of .docx / .xlsx / .pptx files without
+opening the archive again.  Everything later (dedup check, change
+detection, blob encoding) works on the local copy, so a document on a slow
+network drive is read only once.
+
+``fast_copy`` / ``fast_copy_into`` are for copies whose bytes do not need
+to be inspected (restore, packing): they use the kernel's
+``copy_file_range`` / ``sendfile`` and fall back to ``shutil``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from typing import Callable, Dict, NamedTuple, Optional
+
+from core.docx_parts import central_directory_summary
+
+_BUFFER_SIZE = 4 * 1024 * 1024
+_TAIL_SIZE = 256 * 1024        # central directories of Office files are far smaller
+
+
+class IngestResult(NamedTuple):
+    sha256: str
+    size: int
+    zip_summary: Optional[Dict]    # None for non‑zip files
+
+
+def stream_copy(src_path: str, dest_path: str,
+                progress: Optional[Callable[[int, int], None]] = None) -> IngestResult:
+    """
+    Copy *src_path* to *dest_path* while hashing it, in one read pass.
+
+    *progress* is called with ``(bytes_done, total_bytes)`` after each buffer.
+    """
+    h = hashlib.sha256()
+    buf = bytearray(_BUFFER_SIZE)
+    view = memoryview(buf)
+    tail = bytearray()
+    size = 0
+    with open(src_path, "rb", buffering=0) as src, open(dest_path, "wb", buffering=0) as dst:
+        total = os.fstat(src.fileno()).st_size
+        while True:
+            n = src.readinto(buf)
+            if not n:
+                break
+            chunk = view[:n]
+            h.update(chunk)
+            _write_all(dst, chunk)
+            size += n
+            if n >= _TAIL_SIZE:
+                tail = bytearray(chunk[n - _TAIL_SIZE:])
+            else:
+                tail += chunk
+                del tail[:-_TAIL_SIZE]
+            if progress is not None:
+                progress(size, total)
+    return IngestResult(h.hexdigest(), size, central_directory_summary(bytes(tail), size))
+
+
+def fast_copy(src_path: str, dest_path: str) -> None:
+    """Copy a whole file through the kernel where the platform allows it."""
+    with open(src_path, "rb") as src, open(dest_path, "wb") as dst:
+        fast_copy_into(src, dst)
+
+
+def fast_copy_into(src, dst) -> None:
+    """
+    Append the rest of the open file *src* to the open file *dst*.
+
+    Tries ``os.copy_file_range`` (Linux, may reflink), then ``os.sendfile``,
+    then a buffered ``shutil.copyfileobj``.
+    """
+    dst.flush()
+    in_fd, out_fd = src.fileno(), dst.fileno()
+    remaining = os.fstat(in_fd).st_size - src.tell()
+    for kernel_copy in (_copy_file_range, _sendfile):
+        copied = kernel_copy(in_fd, out_fd, src.tell(), remaining)
+        if copied:
+            src.seek(copied, os.SEEK_CUR)
+            dst.seek(0, os.SEEK_END)
+            remaining -= copied
+        if remaining <= 0:
+            return
+    shutil.copyfileobj(src, dst, _BUFFER_SIZE)
+
+
+def _copy_file_range(in_fd: int, out_fd: int, offset: int, count: int) -> int:
+    if not hasattr(os, "copy_file_range"):
+        return 0
+    out_offset = os.lseek(out_fd, 0, os.SEEK_END)
+    done = 0
+    try:
+        while done < count:
+            n = os.copy_file_range(in_fd, out_fd, count - done, offset + done, out_offset + done)
+            if n == 0:
+                break
+            done += n
+    except OSError:      # EXDEV, ENOSYS, unsupported file system … – fall back
+        pass
+    os.lseek(out_fd, out_offset + done, os.SEEK_SET)
+    return done
+
+
+def _sendfile(in_fd: int, out_fd: int, offset: int, count: int) -> int:
+    if not hasattr(os, "sendfile"):
+        return 0
+    os.lseek(out_fd, 0, os.SEEK_END)
+    done = 0
+    try:
+        while done < count:
+            n = os.sendfile(out_fd, in_fd, offset + done, min(count - done, 1 << 30))
+            if n == 0:
+                break
+            done += n
+    except OSError:
+        pass
+    return done
+
+
+def _write_all(f, data: memoryview) -> None:
+    while data:
+        n = f.write(data)
+        data = data[n:]
@@ -0,0 +1,484 @@
+"""
+parse_cache
+===========
+
+Persistent cache of parsed snapshots.
+
+Parsing an old .docx snapshot means rebuilding it from the blob store and
+running the loader over it – hundreds of milliseconds for a long document,
+paid again on every start when the history or compare page opens it.
+Snapshot content never changes, so the parsed views are written once to a
+compact binary file keyed by the blob's SHA‑256, the extension and the
+loader's ``cache_version``::
+
+    <app data>/parse_cache/ab/abcdef….docx.v1.bin
+
+and later opened with ``mmap``.  The file stores the document column‑wise
+rather than as pickled paragraph dicts: one array per paragraph attribute
+and per run attribute, with every string (texts, style, font and colour
+names …) interned once in a string table.  ``CachedDocument`` answers
+``text`` and ``paragraph_tokens`` straight from those arrays; the
+paragraph dicts of ``structured`` are only built when a caller asks for
+them.
+
+File layout (section arrays in native byte order, 8‑byte aligned)::
+
+    <magic:8> <format:u16> <byteorder:u8> <pad> <text id:u32> <sections:u32> <crc32:u32>
+    {<offset:u64> <length:u64>} × sections
+    strings   str_offsets u32[S+1]  str_data utf‑8
+    blocks    kind u8  text/style/align u32  flags u8  ls/left/first f64
+              run_start u32[B+1]
+    runs      type u8  flags u8  text u32  font/color u32  size f64
+    tables    row_start u32[T+1]  cell_start u32[R+1]  cells u32
+
+String ids of ``None`` are ``_NONE``; ``None`` floats are NaN.  The
+CRC‑32 covers everything after the header and is checked on open.  Only
+documents of the exact shape ``DocxLoader`` produces are cached – anything
+else is simply parsed every time.
+
+The cache is bounded by ``max_bytes`` (setting ``storage/parse_cache_mb``);
+a hit refreshes the file's mtime and the least recently used files are
+removed once the budget is exceeded.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from core.platform_utils import get_app_data_dir
+from core.snapshot_loaders.parsed_document import (
+    ParsedDocument, TOKEN_FEATURES, paragraph_prefix, run_token, table_token,
+)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_MAGIC = b"OMPCACHE"
+_FORMAT = 1
+_HEADER = struct.Struct("<8sHBxIII")
+_SECTION = struct.Struct("<QQ")
+_BYTEORDER = 0 if sys.byteorder == "little" else 1
+_NONE = 0xFFFFFFFF
+
+# section name -> array typecode, in file order
+_SECTIONS = (
+    ("str_offsets", "I"), ("str_data", "B"),
+    ("block_kind", "B"), ("block_text", "I"), ("block_style", "I"),
+    ("block_align", "I"), ("block_flags", "B"), ("block_ls", "d"),
+    ("block_left", "d"), ("block_first", "d"), ("run_start", "I"),
+    ("run_type", "B"), ("run_flags", "B"), ("run_text", "I"),
+    ("run_font", "I"), ("run_color", "I"), ("run_size", "d"),
+    ("row_start", "I"), ("cell_start", "I"), ("cells", "I"),
+)
+
+_PARAGRAPH_KEYS = ("index", "text", "style", "runs", "line_spacing", "alignment",
+                   "numbering", "indent_left", "indent_first")
+_TABLE_KEYS = ("index", "text", "style", "runs")
+_TEXT_RUN_KEYS = ("type", "text", "font", "size", "bold", "italic", "underline", "color")
+
+_KIND_PARAGRAPH, _KIND_TABLE = 0, 1
+_RUN_TEXT, _RUN_IMAGE, _RUN_TABLE = 0, 1, 2
+_BOLD, _ITALIC, _UNDERLINE = 1, 2, 4
+_NUMBERING = 1
+
+# what a damaged cache file raises while being decoded
+_CORRUPT = (ValueError, IndexError, TypeError, struct.error)
+
+
+# ---------------------------------------------------------------------- encoding
+def _encode(structured: Any, text: str) -> Optional[bytes]:
+    """Cache file bytes for a document's views; None if their shape is not supported."""
+    if not isinstance(structured, list) or not isinstance(text, str):
+        return None
+    cols = {name: array(code) for name, code in _SECTIONS}
+    strings: Dict[str, int] = {}
+
+    def sid(value) -> int:
+        if value is None:
+            return _NONE
+        if type(value) is not str:
+            raise ValueError(value)
+        i = strings.get(value)
+        if i is None:
+            i = strings[value] = len(strings)
+        return i
+
+    def number(value) -> float:
+        if value is None:
+            return math.nan
+        if type(value) is not float or value != value:
+            raise ValueError(value)
+        return value
+
+    def flag(value, bit: int) -> int:
+        if type(value) is not bool:
+            raise ValueError(value)
+        return bit if value else 0
+
+    try:
+        text_id = sid(text)
+        cols["run_start"].append(0)
+        cols["row_start"].append(0)
+        cols["cell_start"].append(0)
+        for i, block in enumerate(structured):
+            if not isinstance(block, dict) or block.get("index") != i:
+                return None
+            keys = tuple(block)
+            if keys == _PARAGRAPH_KEYS:
+                cols["block_kind"].append(_KIND_PARAGRAPH)
+                cols["block_align"].append(sid(block["alignment"]))
+                cols["block_flags"].append(flag(block["numbering"], _NUMBERING))
+                cols["block_ls"].append(number(block["line_spacing"]))
+                cols["block_left"].append(number(block["indent_left"]))
+                cols["block_first"].append(number(block["indent_first"]))
+            elif keys == _TABLE_KEYS:
+                cols["block_kind"].append(_KIND_TABLE)
+                cols["block_align"].append(_NONE)
+                cols["block_flags"].append(0)
+                for name in ("block_ls", "block_left", "block_first"):
+                    cols[name].append(math.nan)
+            else:
+                return None
+            cols["block_text"].append(sid(block["text"]))
+            cols["block_style"].append(sid(block["style"]))
+
+            for run in block["runs"]:
+                keys = tuple(run) if isinstance(run, dict) else ()
+                if keys == _TEXT_RUN_KEYS and run["type"] == "text":
+                    cols["run_type"].append(_RUN_TEXT)
+                    cols["run_flags"].append(flag(run["bold"], _BOLD) | flag(run["italic"], _ITALIC)
+                                             | flag(run["underline"], _UNDERLINE))
+                    cols["run_text"].append(sid(run["text"]))
+                    cols["run_font"].append(sid(run["font"]))
+                    cols["run_color"].append(sid(run["color"]))
+                    cols["run_size"].append(number(run["size"]))
+                    continue
+                if keys == ("type",) and run["type"] == "image":
+                    cols["run_type"].append(_RUN_IMAGE)
+                    cols["run_text"].append(_NONE)
+                elif keys == ("type", "rows") and run["type"] == "table":
+                    cols["run_type"].append(_RUN_TABLE)
+                    cols["run_text"].append(len(cols["row_start"]) - 1)
+                    for row in run["rows"]:
+                        for cell in row:
+                            cols["cells"].append(sid(cell))
+                        cols["cell_start"].append(len(cols["cells"]))
+                    cols["row_start"].append(len(cols["cell_start"]) - 1)
+                else:
+                    return None
+                cols["run_flags"].append(0)
+                cols["run_font"].append(_NONE)
+                cols["run_color"].append(_NONE)
+                cols["run_size"].append(math.nan)
+            cols["run_start"].append(len(cols["run_type"]))
+    except (ValueError, TypeError, KeyError):
+        return None
+
+    data = bytearray()
+    offsets = cols["str_offsets"]
+    offsets.append(0)
+    for s in strings:             # insertion order == id order
+        data += s.encode("utf-8", "surrogatepass")
+        offsets.append(len(data))
+    cols["str_data"] = array("B", data)
+
+    head = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    table, body, pos = [], [], _align(head)
+    for name, _ in _SECTIONS:
+        raw = cols[name].tobytes()
+        table.append(_SECTION.pack(pos, len(raw)))
+        body.append(raw + b"\0" * (_align(len(raw)) - len(raw)))
+        pos += _align(len(raw))
+    rest = b"".join(table) + b"\0" * (_align(head) - head) + b"".join(body)
+    return _HEADER.pack(_MAGIC, _FORMAT, _BYTEORDER, text_id, len(_SECTIONS),
+                        zlib.crc32(rest)) + rest
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# ---------------------------------------------------------------------- decoding
+class _CacheFile:
+    """Read access to one cache file through ``mmap``; strings decode on demand."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, order, self._text_id, count, crc = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or fmt != _FORMAT or order != _BYTEORDER or count != len(_SECTIONS):
+            raise ValueError(f"Not a parse cache file: {path}")
+        view = memoryview(self._map)
+        if zlib.crc32(view[_HEADER.size:]) != crc:
+            raise ValueError(f"Damaged parse cache file: {path}")
+        for i, (name, code) in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(self._map, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._map):
+                raise ValueError(f"Truncated parse cache file: {path}")
+            setattr(self, name, view[offset:offset + length].cast(code))
+        self._strings: Dict[int, Optional[str]] = {_NONE: None}
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._map)
+
+    def string(self, i: int) -> Optional[str]:
+        s = self._strings.get(i)
+        if s is None and i != _NONE:
+            start, end = self.str_offsets[i], self.str_offsets[i + 1]
+            s = self._strings[i] = str(self.str_data[start:end], "utf-8", "surrogatepass")
+        return s
+
+    def text(self) -> str:
+        return self.string(self._text_id)
+
+    def _rows(self, table: int) -> List[List[str]]:
+        cell_start, string = self.cell_start, self.string
+        return [[string(c) for c in self.cells[cell_start[r]:cell_start[r + 1]]]
+                for r in range(self.row_start[table], self.row_start[table + 1])]
+
+    @staticmethod
+    def _float(value: float) -> Optional[float]:
+        return None if value != value else value
+
+    def structured(self) -> List[Dict[str, Any]]:
+        string, num = self.string, self._float
+        run_start, run_type, run_flags = self.run_start, self.run_type, self.run_flags
+        blocks = []
+        for i in range(len(self.block_kind)):
+            runs = []
+            for r in range(run_start[i], run_start[i + 1]):
+                kind = run_type[r]
+                if kind == _RUN_IMAGE:
+                    runs.append({"type": "image"})
+                elif kind == _RUN_TABLE:
+                    runs.append({"type": "table", "rows": self._rows(self.run_text[r])})
+                else:
+                    flags = run_flags[r]
+                    runs.append({
+                        "type": "text",
+                        "text": string(self.run_text[r]),
+                        "font": string(self.run_font[r]),
+                        "size": num(self.run_size[r]),
+                        "bold": bool(flags & _BOLD),
+                        "italic": bool(flags & _ITALIC),
+                        "underline": bool(flags & _UNDERLINE),
+                        "color": string(self.run_color[r]),
+                    })
+            block = {"index": i, "text": string(self.block_text[i]),
+                     "style": string(self.block_style[i]), "runs": runs}
+            if self.block_kind[i] == _KIND_PARAGRAPH:
+                block.update({
+                    "line_spacing": num(self.block_ls[i]),
+                    "alignment": string(self.block_align[i]),
+                    "numbering": bool(self.block_flags[i] & _NUMBERING),
+                    "indent_left": num(self.block_left[i]),
+                    "indent_first": num(self.block_first[i]),
+                })
+            blocks.append(block)
+        return blocks
+
+    def paragraph_tokens(self, options) -> List[str]:
+        """``paragraph_tokens(structured, options)`` without building the paragraph dicts."""
+        string, num = self.string, self._float
+        run_start, run_type, run_flags = self.run_start, self.run_type, self.run_flags
+        texts = []
+        for i in range(len(self.block_kind)):
+            parts = paragraph_prefix(options, num(self.block_ls[i]), string(self.block_align[i]),
+                                     num(self.block_left[i]), num(self.block_first[i]),
+                                     string(self.block_style[i]),
+                                     self.block_flags[i] & _NUMBERING)
+            start, end = run_start[i], run_start[i + 1]
+            if start == end:
+                parts.append(string(self.block_text[i]))
+            for r in range(start, end):
+                kind = run_type[r]
+                if kind == _RUN_IMAGE:
+                    if "images" in options:
+                        parts.append("<image/>")
+                elif kind == _RUN_TABLE:
+                    parts.append(table_token(options, self._rows(self.run_text[r])))
+                else:
+                    flags = run_flags[r]
+                    parts.append(run_token(options, string(self.run_text[r]), flags & _BOLD,
+                                           flags & _ITALIC, flags & _UNDERLINE,
+                                           string(self.run_font[r]), num(self.run_size[r]),
+                                           string(self.run_color[r])))
+            texts.append("".join(parts))
+        return texts
+
+
+class CachedDocument(ParsedDocument):
+    """A parsed document served from its cache file; falls back to the loader if that is damaged."""
+
+    def __init__(self, loader: Any, opener: Callable[[], Any], cache_file: _CacheFile,
+                 discard: Callable[[], None]):
+        super().__init__(loader, opener)
+        self._file = cache_file
+        self._discard = discard
+        self._fresh: Optional[ParsedDocument] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Views built so far plus the mapped file."""
+        return super().nbytes + self._file.nbytes
+
+    def paragraph_tokens(self, options=TOKEN_FEATURES) -> List[str]:
+        options = frozenset(options)
+        return self.view(("tokens", options), lambda: self._read(
+            lambda: self._file.paragraph_tokens(options),
+            lambda doc: doc.paragraph_tokens(options)))
+
+    def _parse(self, name: str) -> Dict[str, Any]:
+        if name == "text":
+            return {"text": self._read(self._file.text, lambda doc: doc.text)}
+        return {"structured": self._read(self._file.structured, lambda doc: doc.structured)}
+
+    def _read(self, cached: Callable[[], Any], fresh: Callable[[ParsedDocument], Any]) -> Any:
+        with self._lock:
+            if self._fresh is None:
+                try:
+                    return cached()
+                except _CORRUPT:
+                    self._discard()
+                    self._fresh = self._loader.parse(self._opener)
+            return fresh(self._fresh)
+
+
+# ---------------------------------------------------------------------- cache
+class ParseCache:
+    """Size‑bounded directory of cache files, one per (blob, extension, loader version)."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root or Path(get_app_data_dir()) / "parse_cache")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._usage: Optional[int] = None     # bytes on disk, scanned on first store
+
+    def document(self, loader: Any, ext: str, digest: str,
+                 opener: Callable[[], Any]) -> ParsedDocument:
+        """
+        Parsed document of blob *digest*: read from its cache file when one
+        exists, else parsed by *loader* and written to the cache once parsed.
+        """
+        version = getattr(loader, "cache_version", None)
+        if version is None or self.max_bytes <= 0:
+            return loader.parse(opener) if hasattr(loader, "parse") else ParsedDocument(loader, opener)
+        path = self._path(digest, ext, version)
+        try:
+            cache_file = _CacheFile(path)
+        except (OSError, ValueError, struct.error):
+            doc = loader.parse(opener)
+            doc.on_parsed = lambda views: self.store(path, views["structured"], views["text"])
+            return doc
+        try:
+            os.utime(path)        # most recently used
+        except OSError:
+            pass
+        return CachedDocument(loader, opener, cache_file, lambda: self._remove(path))
+
+    def store(self, path: Path, structured: Any, text: str) -> bool:
+        """Write the cache file *path*; False if the views cannot be cached or the write failed."""
+        data = _encode(structured, text)
+        if data is None or len(data) > self.max_bytes:
+            return False
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        with self._lock:
+            if self._usage is None:
+                self._usage = sum(size for _, size, _ in self._files())
+            else:
+                self._usage += len(data)
+            if self._usage > self.max_bytes:
+                self._evict(self.max_bytes * 9 // 10)
+        return True
+
+    def discard(self, digest: str) -> None:
+        """Remove the cache files of blob *digest* (e.g. once the blob is deleted)."""
+        shard = self.root / digest[:2]
+        try:
+            names = [n for n in os.listdir(shard) if n.startswith(digest)]
+        except OSError:
+            return
+        for name in names:
+            self._remove(shard / name)
+
+    def clear(self) -> None:
+        for path, _, _ in self._files():
+            self._remove(path)
+
+    @property
+    def usage(self) -> int:
+        """Bytes currently used on disk."""
+        return sum(size for _, size, _ in self._files())
+
+    # ------------------------------------------------------------------ helpers
+    def _path(self, digest: str, ext: str, version: int) -> Path:
+        ext = ext.lower().lstrip(".") or "noext"
+        return self.root / digest[:2] / f"{digest}.{ext}.v{version}.bin"
+
+    def _files(self):
+        """``(path, size, mtime)`` of every cache file."""
+        try:
+            shards = list(os.scandir(self.root))
+        except OSError:
+            return []
+        files = []
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            try:
+                entries = list(os.scandir(shard.path))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.endswith(".bin"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((Path(entry.path), st.st_size, st.st_mtime_ns))
+        return files
+
+    def _evict(self, target: int) -> None:
+        """Remove least recently used files until at most *target* bytes remain (lock held)."""
+        files = sorted(self._files(), key=lambda f: f[2])
+        usage = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue          # still mapped (Windows) – try again next time
+            usage -= size
+        self._usage = usage
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._usage is not None:
+                self._usage -= size
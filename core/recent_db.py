@@ -1,41 +1,132 @@
-import os
+"""
+recent_db
+=========
+
+最近使用的项目列表（``recent_docs.json``，最近的在前）。
+
+The list is read once and kept in memory as an ordered set; changes are
+written back atomically (temp file + ``os.replace``) ``SAVE_DELAY``
+seconds after the last change and at exit, so opening or reordering
+projects never waits on the disk.  The file format is unchanged.
+
+Per‑document status for the dashboard – whether the file exists, its size
+and mtime, snapshot count and last snapshot time – is cached by
+``refresh_status``, which is meant for a worker thread; ``status`` only
+reads the cache.
+"""
+
+import atexit
 import json
+import os
+import threading
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
 from .platform_utils import get_app_data_dir
 
+
 class RecentDocDB:
-    def __init__(self):
+    SAVE_DELAY = 0.5
+
+    def __init__(self, path: Optional[str] = None):
         base = get_app_data_dir()
-        self.path = str(Path(base) / "recent_docs.json")
+        self.path = str(path or Path(base) / "recent_docs.json")
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        if not os.path.exists(self.path):
-            with open(self.path, "w") as f:
-                json.dump([], f)
+        self._lock = threading.RLock()
+        # insertion ordered: least recently used first, so touch() is O(1)
+        self._docs: Dict[str, None] = {}
+        self._status: Dict[str, Dict] = {}
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                docs = json.load(f)
+        except (OSError, ValueError):
+            docs = []
+        self._docs = dict.fromkeys(reversed(docs))
+        atexit.register(self.flush)
 
-    def get_all(self):
-        with open(self.path, "r") as f:
-            return json.load(f)
+    def get_all(self) -> List[str]:
+        with self._lock:
+            return list(reversed(self._docs))
 
     def add(self, file_path):
-        docs = self.get_all()
-        if file_path not in docs:
-            docs.insert(0, file_path)
-            with open(self.path, "w") as f:
-                json.dump(docs, f, indent=2)
+        with self._lock:
+            if file_path not in self._docs:
+                self._docs[file_path] = None
+                self._changed()
 
     def touch(self, file_path):
         """Move file_path to the top as the most recently used."""
-        docs = self.get_all()
-        if file_path in docs:
-            docs.remove(file_path)
-        docs.insert(0, file_path)
-        with open(self.path, "w") as f:
-            json.dump(docs, f, indent=2)
+        with self._lock:
+            self._docs.pop(file_path, None)
+            self._docs[file_path] = None
+            self._changed()
 
     def remove(self, file_path):
         """Remove a document from the recent list."""
-        docs = self.get_all()
-        if file_path in docs:
-            docs.remove(file_path)
-            with open(self.path, "w") as f:
-                json.dump(docs, f, indent=2)
+        with self._lock:
+            if file_path in self._docs:
+                del self._docs[file_path]
+                self._status.pop(file_path, None)
+                self._changed()
+
+    def flush(self):
+        """立即写入磁盘（有未保存的修改时）"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(list(reversed(self._docs)), f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # ------------------------------------------------------------------ status
+    def status(self, file_path) -> Optional[Dict]:
+        """
+        Cached ``{"exists", "size", "mtime", "snapshot_count",
+        "last_snapshot"}`` of *file_path*; None until ``refresh_status`` ran.
+        """
+        with self._lock:
+            return self._status.get(file_path)
+
+    def refresh_status(self, snapshot_summary: Optional[Callable[[str], Dict]] = None) -> List[str]:
+        """
+        Re‑read the status of every document (safe on a worker thread).
+
+        :param snapshot_summary: ``doc_name -> {"snapshot_count",
+                                 "last_snapshot"}``, e.g.
+                                 ``SnapshotManager.snapshot_summary``.
+        :return: the paths whose status changed.
+        """
+        fresh = {}
+        for path in self.get_all():
+            try:
+                st = os.stat(path)
+                info = {"exists": True, "size": st.st_size, "mtime": st.st_mtime}
+            except OSError:
+                info = {"exists": False, "size": None, "mtime": None}
+            if snapshot_summary is not None:
+                info.update(snapshot_summary(os.path.basename(path)))
+            fresh[path] = info
+        with self._lock:
+            changed = [p for p, info in fresh.items()
+                       if p in self._docs and self._status.get(p) != info]
+            for path in changed:
+                self._status[path] = fresh[path]
+        return changed
+
+    # ------------------------------------------------------------------ helpers
+    def _changed(self):
+        """Schedule a write; bursts of changes are saved once."""
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
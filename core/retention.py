@@ -0,0 +1,112 @@
+"""
+RetentionPolicy
+===============
+
+Thinning rules for snapshot history.  A policy is an ordered list of tiers,
+each covering snapshots up to a certain age and keeping at most one
+snapshot per time bucket inside that range::
+
+    RetentionPolicy([
+        (timedelta(hours=24), None),                 # last 24 h: keep all
+        (timedelta(days=7),   timedelta(hours=1)),   # then one per hour
+        (None,                timedelta(days=1)),    # older: one per day
+    ])
+
+Buckets are aligned to the calendar (whole hours, local midnights, …)
+rather than counted back from now, and a bucket only joins a tier once
+all of it is old enough for that tier – until then its snapshots follow
+the previous tier.  So a snapshot kept as the newest of its bucket stays
+kept on later passes until it ages into the next tier.
+
+Within a bucket the newest snapshot survives.  Pinned snapshots are never
+selected for removal: anything with a remark, restore points (the backup /
+restore entries written by ``SnapshotManager.restore_snapshot``) and
+entries flagged ``"pinned": True``.  The newest snapshot of a document is
+always kept.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (maximum age, bucket width); None age = no upper bound, None bucket = keep all
+Tier = Tuple[Optional[datetime.timedelta], Optional[datetime.timedelta]]
+
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+# buckets count from here; timestamps are naive local time, so day buckets
+# start at local midnight
+_BUCKET_EPOCH = datetime.datetime(1970, 1, 1)
+
+DEFAULT_TIERS: Sequence[Tier] = (
+    (datetime.timedelta(hours=24), None),
+    (datetime.timedelta(days=7), datetime.timedelta(hours=1)),
+    (None, datetime.timedelta(days=1)),
+)
+
+
+def parse_timestamp(value: str) -> Optional[datetime.datetime]:
+    """Parse a snapshot timestamp; returns None for unknown formats."""
+    try:
+        return datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_pinned(meta: Dict) -> bool:
+    """Return True if *meta* must survive any thinning."""
+    return bool(meta.get("pinned")) or bool((meta.get("remark") or "").strip())
+
+
+class RetentionPolicy:
+    """Select which snapshots of one document a thinning pass removes."""
+
+    def __init__(self, tiers: Optional[Sequence[Tier]] = None):
+        self.tiers = list(tiers or DEFAULT_TIERS)
+
+    def select_removals(self, versions: List[Dict],
+                        now: Optional[datetime.datetime] = None) -> List[Dict]:
+        """
+        Return the metadata entries of *versions* that should be deleted.
+
+        Entries with unparsable timestamps are kept.
+        """
+        now = now or datetime.datetime.now()
+        dated = []
+        for meta in versions:
+            ts = parse_timestamp(meta.get("timestamp", ""))
+            if ts is not None:
+                dated.append((ts, meta))
+        dated.sort(key=lambda item: item[0], reverse=True)     # newest first
+
+        seen_buckets = set()
+        removals: List[Dict] = []
+        for position, (ts, meta) in enumerate(dated):
+            tier_idx, bucket = self._tier_for(ts, now)
+            if bucket is None:
+                continue                       # keep‑all tier
+            key = (tier_idx, (ts - _BUCKET_EPOCH) // bucket)
+            if key in seen_buckets and position > 0 and not is_pinned(meta):
+                removals.append(meta)
+                continue
+            seen_buckets.add(key)
+        return removals
+
+    def _tier_for(self, ts: datetime.datetime, now: datetime.datetime):
+        """``(tier index, bucket width)`` for a snapshot taken at *ts*."""
+        tier_idx, bucket = self._bucket_for(now - ts)
+        while bucket is not None and tier_idx > 0:
+            # the bucket's newest edge must be old enough for this tier too
+            end = _BUCKET_EPOCH + ((ts - _BUCKET_EPOCH) // bucket + 1) * bucket
+            edge_idx, _ = self._bucket_for(now - end)
+            if edge_idx >= tier_idx:
+                break
+            tier_idx, bucket = tier_idx - 1, self.tiers[tier_idx - 1][1]
+        return tier_idx, bucket
+
+    def _bucket_for(self, age: datetime.timedelta):
+        for idx, (max_age, bucket) in enumerate(self.tiers):
+            if max_age is None or age <= max_age:
+                return idx, bucket
+        return len(self.tiers), None           # beyond the last tier: keep
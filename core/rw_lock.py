@@ -0,0 +1,100 @@
+"""
+rw_lock
+=======
+
+Readers‑writer lock for in‑memory state shared with background workers.
+
+Any number of threads may hold the lock for reading at the same time; a
+writer waits for them to leave and then holds it alone.  Waiting writers
+block *new* readers so a steady stream of UI reads cannot starve a
+background write::
+
+    lock = RWLock()
+    with lock.read():
+        ...  # lookups
+    with lock.write():
+        ...  # mutations
+
+Both modes are re‑entrant per thread, and the writing thread may also take
+the read lock.  Like ``FileLock`` a read hold cannot be upgraded to a write
+hold – two readers upgrading at once would deadlock – so that raises
+``RuntimeError`` instead.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class RWLock:
+    """Writer‑preferring, re‑entrant readers‑writer lock."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}      # thread id -> read depth
+        self._writer: Optional[int] = None      # thread id of the writer
+        self._write_depth = 0
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self._acquire_read()
+        try:
+            yield
+        finally:
+            self._release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self._acquire_write()
+        try:
+            yield
+        finally:
+            self._release_write()
+
+    # ------------------------------------------------------------------ helpers
+    def _acquire_read(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                # a thread already reading must not wait for a queued writer
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def _release_read(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._cond.notify_all()
+
+    def _acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("cannot upgrade a read lock to a write lock")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def _release_write(self) -> None:
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
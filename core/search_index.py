@@ -0,0 +1,253 @@
+"""
+search_index
+============
+
+Full‑text index over the paragraphs and remarks of every snapshot.
+
+Consecutive snapshots of a document share almost all of their paragraphs,
+so each distinct paragraph text is stored – and indexed – once, and a
+postings table records where it occurs::
+
+    texts(rowid, text)                  -- FTS5, trigram tokenizer
+    text_hashes(hash, text_id)          -- dedup of paragraph texts
+    snapshots(id, snapshot_key, doc_name, timestamp)
+    postings(text_id, snap, para)       -- para −1 is the remark
+
+The trigram tokenizer needs no word segmentation, so Chinese / Japanese /
+Korean text is found as reliably as Latin text, case‑insensitively.  Terms
+shorter than three characters (``合同``) cannot use the trigram index and
+are matched with ``LIKE`` instead – over distinct paragraphs only, which
+keeps them fast in practice.  Without FTS5 support in the SQLite library
+``texts`` is an ordinary table and every term uses ``LIKE``.
+
+A query is split on whitespace; a paragraph matches when it contains every
+term.  Hits are returned newest snapshot first: rare matches are collected
+and sorted, matches found in most snapshots are read by walking the
+snapshots from the newest one until the result limit is reached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.platform_utils import get_app_data_dir
+
+REMARK_PARAGRAPH = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS text_hashes (
+    hash      TEXT PRIMARY KEY,
+    text_id   INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    id            INTEGER PRIMARY KEY,
+    snapshot_key  TEXT NOT NULL UNIQUE,
+    doc_name      TEXT NOT NULL,
+    timestamp     TEXT
+);
+CREATE TABLE IF NOT EXISTS postings (
+    text_id   INTEGER NOT NULL,
+    snap      INTEGER NOT NULL,
+    para      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_text ON postings(text_id);
+CREATE INDEX IF NOT EXISTS postings_snap ON postings(snap);
+CREATE INDEX IF NOT EXISTS snapshots_doc ON snapshots(doc_name, timestamp);
+CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots(timestamp);
+"""
+
+# from this many postings on, a search walks the snapshots newest first
+# instead of sorting every match
+_DENSE = 5000
+
+
+class SearchIndex:
+    """Incremental full‑text index of snapshot contents (``search.sqlite3``)."""
+
+    def __init__(self, db_path: str | None = None):
+        if db_path is None:
+            db_path = Path(get_app_data_dir()) / "search.sqlite3"
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # one connection shared by all threads, serialised by self._lock
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS texts USING fts5(text, tokenize='trigram')")
+        except sqlite3.OperationalError:     # SQLite without FTS5 / trigram (< 3.34)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS texts (rowid INTEGER PRIMARY KEY, text TEXT)")
+        sql = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'texts'").fetchone()[0]
+        self.fts = "fts5" in sql.lower()
+        self._conn.execute("CREATE TEMP TABLE hits (id INTEGER PRIMARY KEY)")
+
+    # ------------------------------------------------------------------ writes
+    def add_snapshot(self, doc_name: str, snapshot_key: str, timestamp: str,
+                     texts: Iterable[str], remark: str = "") -> None:
+        """Index (or re‑index) one snapshot's paragraph *texts* and *remark*."""
+        entries = [(i, t) for i, t in enumerate(texts) if t and t.strip()]
+        if remark and remark.strip():
+            entries.append((REMARK_PARAGRAPH, remark))
+        with self._lock, self._transaction():
+            self._remove([snapshot_key])
+            snap = self._conn.execute(
+                "INSERT INTO snapshots(snapshot_key, doc_name, timestamp) VALUES (?, ?, ?)",
+                (snapshot_key, doc_name, timestamp)).lastrowid
+            ids = self._text_ids({t for _, t in entries})
+            self._conn.executemany(
+                "INSERT INTO postings(text_id, snap, para) VALUES (?, ?, ?)",
+                [(ids[t], snap, para) for para, t in entries])
+
+    def remove_snapshots(self, snapshot_keys: Iterable[str]) -> None:
+        keys = list(snapshot_keys)
+        if not keys:
+            return
+        with self._lock, self._transaction():
+            self._remove(keys)
+
+    def remove_document(self, doc_name: str) -> None:
+        with self._lock:
+            keys = [k for (k,) in self._conn.execute(
+                "SELECT snapshot_key FROM snapshots WHERE doc_name = ?", (doc_name,))]
+        self.remove_snapshots(keys)
+
+    # ------------------------------------------------------------------ reads
+    def indexed_keys(self) -> Set[str]:
+        with self._lock:
+            return {k for (k,) in self._conn.execute("SELECT snapshot_key FROM snapshots")}
+
+    def search(self, query: str, doc_name: Optional[str] = None,
+               limit: int = 200) -> List[Dict]:
+        """
+        Paragraphs containing every whitespace‑separated term of *query*.
+
+        :return: ``[{"doc_name", "snapshot_key", "timestamp", "paragraph",
+                 "text", "snippet"}, ...]`` newest first; ``paragraph`` is
+                 the 0‑based paragraph index (``REMARK_PARAGRAPH`` for the
+                 remark), ``snippet`` an HTML excerpt with ``<b>`` around
+                 the matches.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        where, params = [], []
+        long_terms = [t for t in terms if len(t) >= 3] if self.fts else []
+        if long_terms:
+            where.append("rowid IN (SELECT rowid FROM texts WHERE texts MATCH ?)")
+            params.append(" ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for term in terms:
+            if term not in long_terms:
+                where.append(r"text LIKE ? ESCAPE '\'")
+                params.append("%" + re.sub(r"([\\%_])", r"\\\1", term) + "%")
+        doc_filter, doc_params = ("AND s.doc_name = ?", [doc_name]) if doc_name is not None else ("", [])
+        with self._lock:
+            self._conn.execute("DELETE FROM temp.hits")
+            self._conn.execute(f"INSERT INTO temp.hits SELECT rowid FROM texts WHERE {' AND '.join(where)}",
+                               params)
+            dense = self._conn.execute(
+                f"SELECT count(*) FROM (SELECT 1 FROM temp.hits h CROSS JOIN postings p ON p.text_id = h.id "
+                f"LIMIT {_DENSE})").fetchone()[0] == _DENSE
+            if dense:
+                # matches everywhere: walk snapshots newest first, stop at *limit*
+                source = ("FROM snapshots s CROSS JOIN postings p ON p.snap = s.id "
+                          "WHERE p.text_id IN (SELECT id FROM temp.hits)")
+            else:
+                # few matches: collect them all, then sort
+                source = ("FROM temp.hits h CROSS JOIN postings p ON p.text_id = h.id "
+                          "JOIN snapshots s ON s.id = p.snap WHERE 1")
+            rows = self._conn.execute(
+                f"SELECT s.doc_name, s.snapshot_key, s.timestamp, p.para, p.text_id {source} "
+                f"{doc_filter} ORDER BY s.timestamp DESC, s.id DESC, p.para LIMIT ?",
+                (*doc_params, limit)).fetchall()
+            ids = {r[4] for r in rows}
+            texts = dict(self._conn.execute(
+                f"SELECT rowid, text FROM texts WHERE rowid IN ({','.join('?' * len(ids))})",
+                list(ids))) if ids else {}
+        return [{"doc_name": doc, "snapshot_key": key, "timestamp": ts, "paragraph": para,
+                 "text": texts[text_id], "snippet": snippet(texts[text_id], terms)}
+                for doc, key, ts, para, text_id in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------ helpers
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return _Commit(self._conn)
+
+    def _text_ids(self, texts: Set[str]) -> Dict[str, int]:
+        """Row ids of *texts*, inserting the ones not indexed yet."""
+        ids = {}
+        for text in texts:
+            digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            row = self._conn.execute(
+                "SELECT text_id FROM text_hashes WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                text_id = self._conn.execute("INSERT INTO texts(text) VALUES (?)", (text,)).lastrowid
+                self._conn.execute("INSERT INTO text_hashes(hash, text_id) VALUES (?, ?)",
+                                   (digest, text_id))
+            else:
+                text_id = row[0]
+            ids[text] = text_id
+        return ids
+
+    def _remove(self, keys: List[str]) -> None:
+        """Drop *keys* and the paragraph texts no other snapshot uses."""
+        marks = ",".join("?" * len(keys))
+        snaps = [s for (s,) in self._conn.execute(
+            f"SELECT id FROM snapshots WHERE snapshot_key IN ({marks})", keys)]
+        if not snaps:
+            return
+        marks = ",".join("?" * len(snaps))
+        text_ids = [t for (t,) in self._conn.execute(
+            f"SELECT DISTINCT text_id FROM postings WHERE snap IN ({marks})", snaps)]
+        self._conn.execute(f"DELETE FROM postings WHERE snap IN ({marks})", snaps)
+        self._conn.execute(f"DELETE FROM snapshots WHERE id IN ({marks})", snaps)
+        orphans = [(t,) for t in text_ids if self._conn.execute(
+            "SELECT 1 FROM postings WHERE text_id = ? LIMIT 1", (t,)).fetchone() is None]
+        self._conn.executemany("DELETE FROM texts WHERE rowid = ?", orphans)
+        self._conn.executemany("DELETE FROM text_hashes WHERE text_id = ?", orphans)
+
+
+class _Commit:
+    """Commit on success, roll back on error (after ``BEGIN IMMEDIATE``)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def snippet(text: str, terms: List[str], width: int = 80) -> str:
+    """HTML excerpt of *text* around the first match with ``<b>`` highlights."""
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)),
+                         re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, (first.start() if first else 0) - width // 3)
+    end = min(len(text), start + width)
+    start = max(0, min(start, end - width))
+    excerpt = text[start:end]
+    parts, pos = [], 0
+    for m in pattern.finditer(excerpt):
+        parts.append(escape(excerpt[pos:m.start()]))
+        parts.append(f"<b>{escape(m.group())}</b>")
+        pos = m.end()
+    parts.append(escape(excerpt[pos:]))
+    return ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
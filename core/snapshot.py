@@ -1,24 +1,30 @@
 # core/snapshot.py
-import hashlib
-import shutil
 import os
 import datetime
 from abc import ABC, abstractmethod
+from typing import Optional
 from core.version_db import SnapshotRepository
 from docplatform.paths import get_snapshot_dir
-from core.utils import get_file_hash
+from core.ingest import IngestResult, stream_copy
 
 
 class SnapshotSaver(ABC):
     """保存快照的策略接口"""
+    # 为 True 时 create_snapshot 会先提取文本并作为 content 传入
+    needs_content = True
+
     @abstractmethod
-    def save(self, source_path: str, content: str, dest_path: str) -> None:
+    def save(self, source_path: str, content: str, dest_path: str) -> Optional[IngestResult]:
+        """保存快照；可返回单次读取得到的哈希 / 大小，None 表示由调用方计算"""
         pass
 
 
 class DefaultSnapshotSaver(SnapshotSaver):
-    def save(self, source_path: str, content: str, dest_path: str) -> None:
-        shutil.copy(source_path, dest_path)
+    needs_content = False
+
+    def save(self, source_path: str, content: str, dest_path: str) -> Optional[IngestResult]:
+        # 单次读取：复制的同时计算 SHA‑256 与大小
+        return stream_copy(source_path, dest_path)
 
 
 class SnapshotStrategy(ABC):
@@ -69,8 +75,8 @@ class SnapshotManager:
         if not strategy:
             raise ValueError(f"Unsupported file type: {file_path}")
 
-        content = strategy.extract_text(file_path)
-        file_hash = get_file_hash(content)
+        # 仅在自定义 saver 需要时才提取全文
+        content = strategy.extract_text(file_path) if self.saver.needs_content else ""
         timestamp = datetime.datetime.now().isoformat()
         base_name = os.path.basename(file_path)
         snapshot_dir = get_snapshot_dir(base_name)
@@ -78,16 +84,21 @@ class SnapshotManager:
         # 存储原始文件副本
         snapshot_file_path = os.path.join(snapshot_dir, f"{timestamp}.bak")
         os.makedirs(snapshot_dir, exist_ok=True)
-        self.saver.save(file_path, content, snapshot_file_path)
+        ingest = self.saver.save(file_path, content, snapshot_file_path)
+        if ingest is None:
+            ingest = stream_copy(snapshot_file_path, os.devnull)
 
         # 存储元信息
         metadata = {
             "file": base_name,
             "timestamp": timestamp,
-            "hash": file_hash,
+            "hash": ingest.sha256,           # SHA‑256 of the file bytes
+            "size": ingest.size,
             "snapshot_path": snapshot_file_path,
             "remark": remark,
         }
+        if ingest.zip_summary is not None:
+            metadata["zip_summary"] = ingest.zip_summary
         self.version_db.save_version(base_name, metadata)
         return metadata
 
@@ -1,17 +1,19 @@
 """
 snapshot_loaders package
 ========================
-Import loader plugin modules here so that they register themselves with
-LoaderRegistry at application start‑up.
+Announce loader plugin modules here so that LoaderRegistry imports them –
+and they register themselves – on the first lookup of their extension.
+Nothing heavy (lxml for .docx) is imported at application start‑up.
 
-Add new loader imports below (e.g., docx_loader, json_loader) as you
-implement additional formats.
+Add new loaders below (e.g., json_loader) as you implement additional
+formats.
 """
 
-# Import loader plugins (auto‑register via LoaderRegistry)
-from . import txt_loader  # noqa: F401  (imported for side‑effects)
-from . import docx_loader   # noqa: F401
+from .loader_registry import LoaderRegistry
+
+# Loader plugins (imported on first use, auto‑register via LoaderRegistry)
+LoaderRegistry.register_lazy(".txt", f"{__name__}.txt_loader")
+LoaderRegistry.register_lazy(".docx", f"{__name__}.docx_loader")
 # Future loaders:
-# from . import docx_loader
-# from . import json_loader
-# from . import markdown_loader
+# LoaderRegistry.register_lazy(".json", f"{__name__}.json_loader")
+# LoaderRegistry.register_lazy(".md", f"{__name__}.markdown_loader")
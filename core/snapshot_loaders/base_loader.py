@@ -25,12 +25,56 @@ Design notes
 """
 
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import nullcontext
+from typing import Any, BinaryIO, Callable, ContextManager, Optional, Union
+
+from .parsed_document import ParsedDocument
+
+# What loaders accept: a filesystem path or a readable binary stream (the
+# blob store hands out streams for snapshots that are not stored verbatim).
+Source = Union[str, BinaryIO]
+
+
+def open_source(source: Source) -> ContextManager[BinaryIO]:
+    """
+    Open *source* for binary reading.
+
+    Paths are opened (and closed on exit); streams are rewound and returned
+    as‑is so the caller's stream is not closed.
+    """
+    if hasattr(source, "read"):
+        source.seek(0)
+        return nullcontext(source)
+    return open(source, "rb")
 
 
 class SnapshotLoader(ABC):
     """Abstract interface for snapshot loader plugins."""
 
+    # what parse() returns; loaders that read all views in one pass override
+    # ParsedDocument._parse in a subclass
+    document_class = ParsedDocument
+
+    # version of the loader's output; loaders that set it have their parsed
+    # views persisted by core.parse_cache – bump it whenever the output of
+    # load_structured / get_text changes so stale cache files are ignored
+    cache_version: Optional[int] = None
+
+    def parse(self, source: Union[Source, Callable[[], Source]]) -> ParsedDocument:
+        """
+        Return the parsed document for *source*; its views (``text``,
+        ``structured``, ``paragraph_tokens``) are read on first use and
+        kept, so use this rather than ``get_text`` + ``load_structured``
+        when more than one view is needed.
+
+        Parameters
+        ----------
+        source : str | BinaryIO | callable
+            What ``get_text`` accepts, or a callable returning it (called
+            only when the file is actually read).
+        """
+        return self.document_class(self, source if callable(source) else (lambda: source))
+
     @abstractmethod
     def get_text(self, file_path: str) -> str:
         """
@@ -38,8 +82,9 @@ class SnapshotLoader(ABC):
 
         Parameters
         ----------
-        file_path : str
-            Absolute path to the snapshot file.
+        file_path : str | BinaryIO
+            Absolute path to the snapshot file, or a readable binary stream
+            over its content.
 
         Returns
         -------
@@ -59,8 +104,9 @@ class SnapshotLoader(ABC):
 
         Parameters
         ----------
-        file_path : str
-            Absolute path to the snapshot file.
+        file_path : str | BinaryIO
+            Absolute path to the snapshot file, or a readable binary stream
+            over its content.
 
         Returns
         -------
@@ -0,0 +1,168 @@
+"""
+document_cache
+==============
+
+Process‑wide cache of ``ParsedDocument`` objects so previews, diffs and
+statistics of the same file share one parse – across pages and windows::
+
+    doc = parse_file(path)
+    doc = parse_document(lambda: store.source(digest), ".docx", key=("blob", digest))
+
+Callers choose the key: snapshot content never changes, so a blob's
+SHA‑256 identifies it for good.  Ordinary files (the working document,
+legacy snapshots) are keyed by path with their size and mtime as the
+entry's *version*: once the file changes on disk the next lookup drops the
+stale document and parses the new content.  Without a key nothing is
+cached.
+
+``SnapshotManager`` owns the cache (``manager.documents``, by default the
+shared ``default_cache()``).  It is bounded by an estimate of the memory
+its documents' views occupy (``max_bytes``, setting ``cache/document_mb``)
+rather than by a number of documents; least recently used documents are
+dropped first.  ``stats()`` reports size and hit rate.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+from .loader_registry import LoaderRegistry
+from .parsed_document import ParsedDocument
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class DocumentCache:
+    """Least‑recently‑used map of cache key -> ParsedDocument within a memory budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # key -> (version, document), least recently used first
+        self._docs: "OrderedDict[Hashable, Tuple[Hashable, ParsedDocument]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def get_or_create(self, key: Hashable, create: Callable[[], ParsedDocument],
+                      version: Hashable = None) -> ParsedDocument:
+        """
+        Document cached under *key*, created by ``create()`` if there is
+        none or if it was cached for another *version* of the content.
+        """
+        with self._lock:
+            entry = self._docs.get(key)
+            if entry is not None and entry[0] == version:
+                self._hits += 1
+                self._docs.move_to_end(key)
+                doc = entry[1]
+            else:
+                if entry is not None:
+                    self._invalidations += 1
+                self._misses += 1
+                # documents parse lazily, so creating one under the lock is cheap
+                # and concurrent callers end up sharing the same parse
+                doc = create()
+                self._docs[key] = (version, doc)
+                self._docs.move_to_end(key)
+            # documents grow as their views are parsed, so the budget is
+            # checked on every lookup rather than on insertion only
+            self._trim(keep=key)
+            return doc
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._docs.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ``{"documents", "bytes", "max_bytes", "hits", "misses", "hit_rate",
+        "evictions", "invalidations"}`` – *bytes* is the estimated size of
+        the cached views.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "documents": len(self._docs),
+                "bytes": sum(doc.nbytes for _, doc in self._docs.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _trim(self, keep: Hashable) -> None:
+        """Drop least recently used documents (never *keep*) until within budget (lock held)."""
+        total = sum(doc.nbytes for _, doc in self._docs.values())
+        while total > self.max_bytes and len(self._docs) > 1:
+            key, (_, doc) = next(iter(self._docs.items()))
+            if key == keep:
+                break
+            del self._docs[key]
+            total -= doc.nbytes
+            self._evictions += 1
+
+
+_cache = DocumentCache()
+
+
+def default_cache() -> DocumentCache:
+    """The process‑wide cache used when no other is given."""
+    return _cache
+
+
+def parse_document(source: Union[Any, Callable[[], Any]], ext: str,
+                   key: Optional[Hashable] = None,
+                   factory: Optional[Callable[[Any, Callable[[], Any]], ParsedDocument]] = None,
+                   cache: Optional[DocumentCache] = None,
+                   version: Hashable = None) -> Optional[ParsedDocument]:
+    """
+    Parsed document for *source* via the loader registered for *ext*.
+
+    :param source: path or binary stream, or a callable returning one (only
+                   called when the document is not cached yet).
+    :param key:    cache key; None parses without caching.
+    :param factory: ``factory(loader, opener)`` creates the document instead
+                    of ``loader.parse`` (e.g. ``ParseCache.document``).
+    :param cache:  the cache to use, default ``default_cache()``.
+    :param version: version of the content under *key*; a cached document
+                    of another version is replaced.
+    :return: the document, or None if no loader handles *ext*.
+    """
+    loader = LoaderRegistry.get_loader(ext)
+    if loader is None:
+        return None
+
+    def create() -> ParsedDocument:
+        if factory is not None:
+            return factory(loader, source if callable(source) else (lambda: source))
+        if hasattr(loader, "parse"):
+            return loader.parse(source)
+        return ParsedDocument(loader, source if callable(source) else (lambda: source))
+
+    if key is None:
+        return create()
+    return (cache or _cache).get_or_create((ext.lower().lstrip("."), key), create, version)
+
+
+def parse_file(path: str, ext: Optional[str] = None,
+               cache: Optional[DocumentCache] = None) -> Optional[ParsedDocument]:
+    """
+    Parsed document of the file at *path*, cached by path; a cached parse
+    is replaced once the file's size or mtime changes.
+    """
+    if ext is None:
+        ext = os.path.splitext(path)[1]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return parse_document(path, ext)
+    return parse_document(path, ext, ("file", os.path.abspath(path)), cache=cache,
+                          version=(st.st_size, st.st_mtime_ns))
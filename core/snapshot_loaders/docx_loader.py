@@ -4,34 +4,66 @@ DocxLoader
 
 Snapshot loader plugin for Microsoft Word documents (.docx).
 
-Uses `python-docx` to extract text and paragraph structure.  Registering
-itself with LoaderRegistry enables SnapshotManager to automatically load
-.docx snapshots via plugin architecture.
+Reads the package with the streaming parser in ``docx_stream`` (lxml,
+no python‑docx object model) to extract text and paragraph structure.
+Registering itself with LoaderRegistry enables SnapshotManager to
+automatically load .docx snapshots via plugin architecture.
 
-Note: Ensure `python-docx` is installed:
-    pip install python-docx
+``PythonDocxLoader`` is the former python‑docx based implementation.  It
+is not registered; it remains as the reference the streaming parser's
+output is checked against (see ``tools/docx_loader_benchmark.py``).
+
+Note: Ensure `lxml` is installed (python‑docx depends on it):
+    pip install lxml
 """
 
 from __future__ import annotations
 
 from typing import List, Dict, Any, Iterable
-from pathlib import Path
-
-try:
-    from docx import Document
-except ModuleNotFoundError as exc:  # pillow dependency missing?
-    raise ImportError(
-        "The 'python-docx' package is required for DocxLoader. "
-        "Install it with: pip install python-docx"
-    ) from exc
 
+from . import docx_stream
 from .base_loader import SnapshotLoader
 from .loader_registry import LoaderRegistry
+from .parsed_document import ParsedDocument
+
+
+class DocxDocument(ParsedDocument):
+    """Parsed .docx: text and structure come from the same streaming pass."""
+
+    def _parse(self, name: str) -> Dict[str, Any]:
+        structured, text = docx_stream.read(self._opener())
+        return {"text": text, "structured": structured}
 
 
 class DocxLoader(SnapshotLoader):
     """Loader for .docx snapshot files."""
 
+    document_class = DocxDocument
+    cache_version = 1
+
+    def get_text(self, file_path: str) -> str:
+        """Return concatenated text of all paragraphs."""
+        return docx_stream.get_text(file_path)
+
+    def load_structured(self, file_path: str):
+        """Return a list of paragraph dicts with style information."""
+        return docx_stream.load_structured(file_path)
+
+
+def _document(file_path):
+    try:
+        from docx import Document
+    except ModuleNotFoundError as exc:  # pillow dependency missing?
+        raise ImportError(
+            "The 'python-docx' package is required for PythonDocxLoader. "
+            "Install it with: pip install python-docx"
+        ) from exc
+    return Document(file_path)
+
+
+class PythonDocxLoader(SnapshotLoader):
+    """python-docx based loader for .docx files (reference implementation)."""
+
     @staticmethod
     def _extract_run_text(run) -> str:
         """Return text content of a run including tabs and breaks."""
@@ -104,7 +136,7 @@ class DocxLoader(SnapshotLoader):
 
     def get_text(self, file_path: str) -> str:
         """Return concatenated text of all paragraphs."""
-        doc = Document(file_path)
+        doc = _document(file_path)
         paragraphs: List[str] = []
         for container in self._iter_containers(doc):
             from docx.text.paragraph import Paragraph
@@ -120,7 +152,7 @@ class DocxLoader(SnapshotLoader):
 
     def load_structured(self, file_path: str):
         """Return a list of paragraph dicts with style information."""
-        doc = Document(file_path)
+        doc = _document(file_path)
         structured: List[Dict[str, Any]] = []
 
         from docx.text.paragraph import Paragraph
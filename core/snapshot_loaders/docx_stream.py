@@ -0,0 +1,548 @@
+"""
+docx_stream
+===========
+
+Streaming reader for the text parts of a .docx package.
+
+``DocxLoader`` used to build python‑docx ``Document`` / ``Paragraph`` /
+``Run`` proxies and query their formatting property by property, which
+takes seconds on long documents.  This module reads the package directly:
+the main document part, its header / footer parts and ``styles.xml`` are
+streamed with ``lxml.etree.iterparse`` and every top‑level paragraph or
+table is converted as soon as its end tag is seen, then freed.  Other
+parts – ``word/media/*`` in particular – are never read; only the zip's
+central directory is.
+
+The output is the one the python‑docx based loader produced, including
+its quirks:
+
+* containers are visited as *headers of every section, body, footers of
+  every section*; a header/footer part is emitted once even when several
+  sections share it, and a section without its own definition inherits
+  the previous section's;
+* python‑docx adds an empty default header/footer definition (one empty
+  paragraph styled ``Header`` / ``Footer``) when the first section has
+  none, so those paragraphs are emitted as well;
+* only direct ``w:r`` children of a paragraph are runs (runs inside
+  hyperlinks are not), while table cell text does include hyperlinks;
+* formatting is the paragraph's / run's direct formatting, not the value
+  resolved through styles.
+
+Lengths are converted with python‑docx's EMU arithmetic so the float
+values compare equal.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from lxml import etree
+except ModuleNotFoundError as exc:
+    raise ImportError(
+        "The 'lxml' package is required to read .docx files. "
+        "Install it with: pip install lxml"
+    ) from exc
+
+from .base_loader import Source, open_source
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_PIC = "{http://schemas.openxmlformats.org/drawingml/2006/picture}pic"
+_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_REL_OFFICE_DOCUMENT = "/officeDocument"
+_REL_STYLES = "/styles"
+
+_P, _TBL, _TR, _TC, _R = _W + "p", _W + "tbl", _W + "tr", _W + "tc", _W + "r"
+_BODY, _SECT_PR, _VAL = _W + "body", _W + "sectPr", _W + "val"
+
+# the section's header / footer slots in python-docx's order
+_HEADER_TYPES = ("default", "first", "even")
+
+# ``str(WD_PARAGRAPH_ALIGNMENT.X)`` for every ``w:jc`` value python-docx knows
+_ALIGNMENTS = {
+    "left": "LEFT (0)",
+    "center": "CENTER (1)",
+    "right": "RIGHT (2)",
+    "both": "JUSTIFY (3)",
+    "distribute": "DISTRIBUTE (4)",
+    "mediumKashida": "JUSTIFY_MED (5)",
+    "highKashida": "JUSTIFY_HI (7)",
+    "lowKashida": "JUSTIFY_LOW (8)",
+    "thaiDistribute": "THAI_JUSTIFY (9)",
+}
+
+# python-docx's internal -> UI style names (BabelFish)
+_UI_STYLE_NAMES = {
+    "caption": "Caption",
+    "footer": "Footer",
+    "header": "Header",
+    **{f"heading {n}": f"Heading {n}" for n in range(1, 10)},
+}
+
+_EMU_PER_PT = 12700
+_EMU_PER_TWIP = 635
+_UNIVERSAL_UNITS = {"mm": 36000, "cm": 360000, "in": 914400,
+                    "pt": 12700, "pc": 152400, "pi": 152400}
+
+# run content that contributes text (matched by local name, any namespace)
+_RUN_TEXT_TAGS = ("{*}t", "{*}delText", "{*}instrText", "{*}tab", "{*}br", "{*}cr")
+
+
+# --------------------------------------------------------------------------- #
+# Public API                                                                  #
+# --------------------------------------------------------------------------- #
+def load_structured(source: Source) -> List[Dict[str, Any]]:
+    """Paragraph / table dicts of *source* (see ``DocxLoader.load_structured``)."""
+    blocks = _read(source, _structured_paragraph, _structured_table)
+    for index, block in enumerate(blocks):
+        block["index"] = index
+    return blocks
+
+
+def get_text(source: Source) -> str:
+    """Plain text of *source*, one line per paragraph / table row."""
+    return "\n".join(_read(source, _plain_paragraph, _plain_table))
+
+
+def read(source: Source) -> Tuple[List[Dict[str, Any]], str]:
+    """``(load_structured(source), get_text(source))`` in a single pass."""
+    pairs = _read(source, _paragraph_views, _table_views)
+    structured = [block for block, _ in pairs]
+    for index, block in enumerate(structured):
+        block["index"] = index
+    return structured, "\n".join(text for _, text in pairs)
+
+
+# --------------------------------------------------------------------------- #
+# Package walking                                                             #
+# --------------------------------------------------------------------------- #
+def _read(source: Source, paragraph: Callable, table: Callable) -> List:
+    """Convert every block of the package with *paragraph* / *table*, in order."""
+    with open_source(source) as fh, zipfile.ZipFile(fh) as zf:
+        main = _main_part(zf)
+        rels = _relationships(zf, main)
+        styles_part = next((target for rel_type, target in rels.values()
+                            if rel_type.endswith(_REL_STYLES)), None)
+        styles = _Styles(zf, styles_part)
+
+        sections: List[Dict[Tuple[str, str], str]] = []
+        body = list(_iter_blocks(zf, main, _BODY, paragraph, table, styles, sections))
+
+        headers, footers = [], []
+        seen = set()
+        for kind, out in (("header", headers), ("footer", footers)):
+            for i in range(len(sections)):
+                for hf_type in _HEADER_TYPES:
+                    part = _header_footer_part(sections, i, kind, hf_type, rels)
+                    if part is None or part in seen:
+                        continue
+                    seen.add(part)
+                    if isinstance(part, tuple):
+                        # python-docx adds an empty definition for the first section
+                        out.append(paragraph(_default_header_footer(kind), styles))
+                    else:
+                        out.extend(_iter_blocks(zf, part, None, paragraph, table, styles))
+        return headers + body + footers
+
+
+def _main_part(zf: zipfile.ZipFile) -> str:
+    for rel_type, target in _relationships(zf, "").values():
+        if rel_type.endswith(_REL_OFFICE_DOCUMENT):
+            return target
+    return "word/document.xml"
+
+
+def _relationships(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """``rId -> (type, part name)`` of the internal relationships of *part*."""
+    folder, name = posixpath.split(part)
+    rels_name = posixpath.join(folder, "_rels", name + ".rels")
+    try:
+        stream = zf.open(rels_name)
+    except KeyError:
+        return {}
+    rels = {}
+    with stream:
+        for _, rel in etree.iterparse(stream, tag=_RELS, resolve_entities=False):
+            if rel.get("TargetMode") != "External":
+                target = rel.get("Target", "")
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join(folder, target))
+                rels[rel.get("Id")] = (rel.get("Type", ""), target)
+            rel.clear()
+    return rels
+
+
+def _header_footer_part(sections, index: int, kind: str, hf_type: str, rels):
+    """
+    Part name of the *kind* (header/footer) of type *hf_type* in effect for
+    section *index*, ``(kind, hf_type)`` for python-docx's added default
+    definition, or None when the reference is broken.
+    """
+    for section in reversed(sections[:index + 1]):
+        rid = section.get((kind, hf_type))
+        if rid is not None:
+            rel = rels.get(rid)
+            return rel[1] if rel else None
+    return kind, hf_type
+
+
+def _default_header_footer(kind: str):
+    p = etree.Element(_P)
+    ppr = etree.SubElement(p, _W + "pPr")
+    etree.SubElement(ppr, _W + "pStyle", {_VAL: "Header" if kind == "header" else "Footer"})
+    return p
+
+
+def _iter_blocks(zf, part: str, container: Optional[str], paragraph, table, styles,
+                 sections: Optional[List] = None) -> Iterator:
+    """
+    Stream *part* and yield the converted top‑level paragraphs and tables.
+
+    *container* is the tag of the element holding the blocks (``w:body``);
+    None means the root element (``w:hdr`` / ``w:ftr``).  With *sections*
+    the header / footer references of every section are collected as well.
+    """
+    try:
+        stream = zf.open(part)
+    except KeyError:
+        return
+    with stream:
+        events = etree.iterparse(stream, tag=(_P, _TBL, _SECT_PR), huge_tree=True,
+                                 remove_comments=True, resolve_entities=False)
+        for _, elem in events:
+            parent = elem.getparent()
+            top_level = parent is not None and (
+                parent.tag == container if container else parent.getparent() is None)
+            if not top_level:
+                continue            # nested in a table (or a paragraph's sectPr); handled with it
+            tag = elem.tag
+            if tag == _P:
+                if sections is not None:
+                    sect_pr = elem.find(f"{_W}pPr/{_SECT_PR}")
+                    if sect_pr is not None:
+                        sections.append(_section_references(sect_pr))
+                yield paragraph(elem, styles)
+            elif tag == _TBL:
+                yield table(elem)
+            elif sections is not None:
+                sections.append(_section_references(elem))
+            # free what has been converted
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def _section_references(sect_pr) -> Dict[Tuple[str, str], str]:
+    refs = {}
+    for kind in ("header", "footer"):
+        for ref in sect_pr.iterchildren(f"{_W}{kind}Reference"):
+            refs.setdefault((kind, ref.get(_W + "type")), ref.get(_R_ID))
+    return refs
+
+
+class _Styles:
+    """Paragraph style names by style id, read from ``styles.xml``."""
+
+    def __init__(self, zf: zipfile.ZipFile, part: Optional[str]):
+        self._names: Dict[str, Optional[str]] = {}
+        self.default: Optional[str] = None
+        if part is None:
+            # python-docx falls back to its template, whose default is "Normal"
+            self.default = "Normal"
+            return
+        try:
+            stream = zf.open(part)
+        except KeyError:
+            return
+        with stream:
+            for _, style in etree.iterparse(stream, tag=_W + "style", resolve_entities=False):
+                style_id = style.get(_W + "styleId")
+                name_el = style.find(_W + "name")
+                name = None
+                if name_el is not None and name_el.get(_VAL) is not None:
+                    name = _UI_STYLE_NAMES.get(name_el.get(_VAL), name_el.get(_VAL))
+                is_paragraph = style.get(_W + "type") == "paragraph"
+                # the first style with an id wins, a non-paragraph one hides it
+                if style_id is not None and style_id not in self._names:
+                    self._names[style_id] = name if is_paragraph else _NOT_PARAGRAPH
+                if is_paragraph and style.get(_W + "default") in ("1", "true", "on"):
+                    self.default = name       # the last default wins
+                style.clear()
+
+    def name(self, style_id: Optional[str]) -> Optional[str]:
+        if style_id is None:
+            return self.default
+        name = self._names.get(style_id, _NOT_PARAGRAPH)
+        return self.default if name is _NOT_PARAGRAPH else name
+
+
+_NOT_PARAGRAPH = object()
+
+
+# --------------------------------------------------------------------------- #
+# Block conversion                                                            #
+# --------------------------------------------------------------------------- #
+def _structured_paragraph(p, styles: _Styles) -> Dict[str, Any]:
+    return _paragraph_views(p, styles)[0]
+
+
+def _paragraph_views(p, styles: _Styles) -> Tuple[Dict[str, Any], str]:
+    """Structured dict and plain text of a paragraph."""
+    ppr = p.find(_W + "pPr")
+    style_id = line_spacing = alignment = indent_left = indent_first = None
+    numbered = False
+    if ppr is not None:
+        pstyle = ppr.find(_W + "pStyle")
+        if pstyle is not None:
+            style_id = pstyle.get(_VAL)
+        line_spacing = _line_spacing(ppr.find(_W + "spacing"))
+        jc = ppr.find(_W + "jc")
+        if jc is not None:
+            alignment = _ALIGNMENTS.get(jc.get(_VAL))
+        numbered = ppr.find(_W + "numPr") is not None
+        ind = ppr.find(_W + "ind")
+        if ind is not None:
+            indent_left, indent_first = _indents(ind)
+
+    runs, plain = [], []
+    for r in p.iterchildren(_R):
+        if next(r.iter(_PIC, _W + "drawing"), None) is not None:
+            runs.append({"type": "image"})
+            plain.append(_run_text(r))
+        else:
+            run = _structured_run(r)
+            runs.append(run)
+            plain.append(run["text"])
+    return {
+        "index": 0,
+        "text": "".join(r["text"] for r in runs if r["type"] == "text"),
+        "style": styles.name(style_id),
+        "runs": runs,
+        "line_spacing": line_spacing,
+        "alignment": alignment,
+        "numbering": numbered,
+        "indent_left": indent_left,
+        "indent_first": indent_first,
+    }, "".join(plain)
+
+
+def _structured_run(r) -> Dict[str, Any]:
+    font = size = color = None
+    bold = italic = underline = False
+    rpr = r.find(_W + "rPr")
+    if rpr is not None:
+        fonts = rpr.find(_W + "rFonts")
+        if fonts is not None:
+            font = fonts.get(_W + "ascii")
+        try:
+            sz = rpr.find(_W + "sz")
+            if sz is not None:
+                size = _hps(sz.get(_VAL)) / _EMU_PER_PT
+            c = rpr.find(_W + "color")
+            if c is not None and c.get(_VAL) != "auto":
+                color = _rgb(c.get(_VAL))
+        except (TypeError, ValueError, KeyError):
+            pass
+        bold = _on_off(rpr.find(_W + "b"))
+        italic = _on_off(rpr.find(_W + "i"))
+        u = rpr.find(_W + "u")
+        underline = u is not None and u.get(_VAL) not in (None, "none")
+    return {
+        "type": "text",
+        "text": _run_text(r),
+        "font": font,
+        "size": size,
+        "bold": bold,
+        "italic": italic,
+        "underline": underline,
+        "color": color,
+    }
+
+
+def _structured_table(tbl) -> Dict[str, Any]:
+    return _table_views(tbl)[0]
+
+
+def _table_views(tbl) -> Tuple[Dict[str, Any], str]:
+    """Structured dict and plain text of a table."""
+    cells = _table_cells(tbl)
+    rows = [[" ".join(texts).strip() for texts in row] for row in cells]
+    return {
+        "index": 0,
+        "text": "\n".join(" | ".join(r) for r in rows),
+        "style": None,
+        "runs": [{"type": "table", "rows": rows}],
+    }, _cells_text(cells)
+
+
+def _plain_paragraph(p, styles: _Styles) -> str:
+    return "".join(_run_text(r) for r in p.iterchildren(_R))
+
+
+def _plain_table(tbl) -> str:
+    return _cells_text(_table_cells(tbl))
+
+
+def _cells_text(cells: List[List[List[str]]]) -> str:
+    return "\n".join(" | ".join("\n".join(texts) for texts in row) for row in cells)
+
+
+def _table_cells(tbl) -> List[List[List[str]]]:
+    """
+    Paragraph texts of each cell, row by row, as python-docx's ``row.cells``
+    lays them out: a cell spanning columns repeats, the continuation of a
+    vertical merge repeats the cell above.
+    """
+    rows = []
+    above: Dict[int, Tuple[List[str], int]] = {}
+    for tr in tbl.iterchildren(_TR):
+        offset = _int_val(tr.find(f"{_W}trPr/{_W}gridBefore"), 0)
+        current: Dict[int, Tuple[List[str], int]] = {}
+        cells: List[List[str]] = []
+        for tc in tr.iterchildren(_TC):
+            span = _int_val(tc.find(f"{_W}tcPr/{_W}gridSpan"), 1)
+            v_merge = tc.find(f"{_W}tcPr/{_W}vMerge")
+            cell = None
+            if v_merge is not None and v_merge.get(_VAL, "continue") == "continue":
+                cell = above.get(offset)
+            if cell is None:
+                cell = ([_paragraph_text(p) for p in tc.iterchildren(_P)], span)
+            current[offset] = cell
+            cells.extend([cell[0]] * cell[1])
+            offset += span
+        rows.append(cells)
+        above = current
+    return rows
+
+
+# --------------------------------------------------------------------------- #
+# Text                                                                        #
+# --------------------------------------------------------------------------- #
+def _run_text(r) -> str:
+    """Text of a run including tabs and breaks (any nested text counts)."""
+    parts = []
+    for node in r.iter(*_RUN_TEXT_TAGS):
+        tag = node.tag.rpartition("}")[2]
+        if tag in ("t", "delText", "instrText"):
+            if node.text:
+                parts.append(node.text)
+        elif tag == "tab":
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    if parts:
+        return "".join(parts)
+    # python-docx's run.text: the remaining direct children with a text form
+    return "".join("-" if child.tag == _W + "noBreakHyphen" else "\t"
+                   for child in r.iterchildren(_W + "noBreakHyphen", _W + "ptab"))
+
+
+def _paragraph_text(p) -> str:
+    """python-docx's ``paragraph.text``: direct runs and hyperlink runs."""
+    parts = []
+    for child in p.iterchildren(_R, _W + "hyperlink"):
+        for r in ([child] if child.tag == _R else child.iterchildren(_R)):
+            for node in r.iterchildren(_W + "t", _W + "tab", _W + "br", _W + "cr",
+                                       _W + "noBreakHyphen", _W + "ptab"):
+                tag = node.tag
+                if tag == _W + "t":
+                    parts.append(node.text or "")
+                elif tag == _W + "br":
+                    if node.get(_W + "type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                elif tag == _W + "noBreakHyphen":
+                    parts.append("-")
+                elif tag == _W + "cr":
+                    parts.append("\n")
+                else:
+                    parts.append("\t")
+    return "".join(parts)
+
+
+# --------------------------------------------------------------------------- #
+# Values                                                                      #
+# --------------------------------------------------------------------------- #
+def _line_spacing(spacing) -> Optional[float]:
+    if spacing is None or spacing.get(_W + "line") is None:
+        return None
+    try:
+        line = _signed_twips(spacing.get(_W + "line"))
+    except (ValueError, KeyError):
+        return None
+    rule = spacing.get(_W + "lineRule", "auto")
+    if rule == "auto":
+        return line / (12 * _EMU_PER_PT)          # multiple of single spacing
+    if rule in ("exact", "atLeast"):
+        return line / _EMU_PER_PT
+    return None
+
+
+def _indents(ind) -> Tuple[Optional[float], Optional[float]]:
+    left = first = None
+    try:
+        value = ind.get(_W + "left")
+        if value is not None:
+            left = _signed_twips(value) / _EMU_PER_PT
+    except (ValueError, KeyError):
+        pass
+    try:
+        hanging, first_line = ind.get(_W + "hanging"), ind.get(_W + "firstLine")
+        if hanging is not None:
+            first = -_twips(hanging) / _EMU_PER_PT
+        elif first_line is not None:
+            first = _twips(first_line) / _EMU_PER_PT
+    except (ValueError, KeyError):
+        pass
+    return left, first
+
+
+def _universal(value: str) -> int:
+    return int(round(float(value[:-2]) * _UNIVERSAL_UNITS[value[-2:]]))
+
+
+def _signed_twips(value: str) -> int:
+    """EMU of an ``ST_SignedTwipsMeasure``."""
+    if "i" in value or "m" in value or "p" in value:
+        return _universal(value)
+    return int(round(float(value))) * _EMU_PER_TWIP
+
+
+def _twips(value: str) -> int:
+    """EMU of an ``ST_TwipsMeasure``."""
+    if "i" in value or "m" in value or "p" in value:
+        return _universal(value)
+    return int(value) * _EMU_PER_TWIP
+
+
+def _hps(value: str) -> int:
+    """EMU of an ``ST_HpsMeasure`` (half points)."""
+    if "m" in value or "n" in value or "p" in value:
+        return _universal(value)
+    return int(int(value) / 2.0 * _EMU_PER_PT)
+
+
+def _rgb(value: str) -> str:
+    rgb = (int(value[:2], 16), int(value[2:4], 16), int(value[4:], 16))
+    if not all(0 <= c <= 255 for c in rgb):
+        raise ValueError(value)
+    return "%02X%02X%02X" % rgb
+
+
+def _on_off(elem) -> bool:
+    if elem is None:
+        return False
+    return elem.get(_VAL, "true") in ("1", "true", "on")
+
+
+def _int_val(elem, default: int) -> int:
+    if elem is None:
+        return default
+    try:
+        return int(elem.get(_VAL))
+    except (TypeError, ValueError):
+        return default
@@ -18,15 +18,28 @@ SnapshotManager (or any other component) can then retrieve the loader:
 The registry is case‑insensitive and treats extensions with or without
 a leading dot equivalently (".txt" == "txt").
 
+Lazy registration
+-----------------
+Importing a loader can be expensive (the .docx loader pulls in lxml), so
+plugins are normally announced by module path instead and imported on the
+first lookup of one of their extensions::
+
+    LoaderRegistry.register_lazy(".docx", "core.snapshot_loaders.docx_loader")
+
+The module registers its loader at import time as usual.  ``extensions``
+and ``has_loader`` answer without importing anything.
+
 Design goals
 ------------
 * Single responsibility: only manages extension‑>loader mapping.
 * Open/Closed: new loaders register themselves without modifying this file.
-* Thread‑safe for typical UI usage (single thread); for multi‑threading,
-  consider adding locks.
+* Thread‑safe: lookups from background workers never take a lock – the
+  mapping is replaced, not mutated, by registrations, which are serialised.
 """
 
-from typing import Dict, Optional
+import importlib
+import threading
+from typing import Dict, List, Optional
 from .base_loader import SnapshotLoader
 
 
@@ -34,6 +47,9 @@ class LoaderRegistry:
     """Central registry for snapshot loader plugins."""
 
     _loaders: Dict[str, SnapshotLoader] = {}
+    # extension -> module that registers its loader when imported
+    _lazy: Dict[str, str] = {}
+    _lock = threading.Lock()
 
     # --------------------------------------------------------------------- API
     @classmethod
@@ -51,7 +67,23 @@ class LoaderRegistry:
         if not ext:
             raise ValueError("Extension may not be empty")
         key = cls._normalize_ext(ext)
-        cls._loaders[key] = loader
+        with cls._lock:
+            # copy‑on‑write: readers keep using the mapping they fetched
+            cls._loaders = {**cls._loaders, key: loader}
+
+    @classmethod
+    def register_lazy(cls, ext: str, module: str) -> None:
+        """
+        Announce that importing *module* registers the loader for *ext*.
+
+        The module is imported by the first ``get_loader`` for *ext*; a
+        loader registered directly for *ext* takes precedence.
+        """
+        if not ext:
+            raise ValueError("Extension may not be empty")
+        key = cls._normalize_ext(ext)
+        with cls._lock:
+            cls._lazy = {**cls._lazy, key: module}
 
     @classmethod
     def get_loader(cls, ext: str) -> Optional[SnapshotLoader]:
@@ -63,9 +95,36 @@ class LoaderRegistry:
         if not ext:
             return None
         key = cls._normalize_ext(ext)
-        return cls._loaders.get(key)
+        loader = cls._loaders.get(key)
+        if loader is None and key in cls._lazy:
+            loader = cls._import(key)
+        return loader
+
+    @classmethod
+    def has_loader(cls, ext: str) -> bool:
+        """True if a loader is registered (or announced) for *ext*; imports nothing."""
+        if not ext:
+            return False
+        key = cls._normalize_ext(ext)
+        return key in cls._loaders or key in cls._lazy
+
+    @classmethod
+    def extensions(cls) -> List[str]:
+        """Registered and announced extensions (without dot), sorted."""
+        return sorted({*cls._loaders, *cls._lazy})
 
     # ------------------------------------------------------------------ helper
+    @classmethod
+    def _import(cls, key: str) -> Optional[SnapshotLoader]:
+        """Import the module announced for *key*; ImportError propagates."""
+        module = cls._lazy[key]
+        importlib.import_module(module)   # thread‑safe: the import lock serialises
+        with cls._lock:
+            if key not in cls._loaders:
+                # the module did not register this extension – don't retry
+                cls._lazy = {k: m for k, m in cls._lazy.items() if k != key}
+            return cls._loaders.get(key)
+
     @staticmethod
     def _normalize_ext(ext: str) -> str:
         """
@@ -0,0 +1,208 @@
+"""
+ParsedDocument
+==============
+
+One parse of a snapshot file, shared by every view of it.
+
+``SnapshotLoader.parse`` returns a ``ParsedDocument``; previews, diffs and
+statistics ask it for the view they need instead of calling the loader
+again::
+
+    doc = loader.parse(source)
+    doc.text                        # plain text (get_text)
+    doc.structured                  # paragraph dicts / lines (load_structured)
+    doc.paragraph_tokens(options)   # paragraph texts with style tokens
+
+Nothing is read until the first view is requested.  Loaders that can
+produce their plain and structured views in one pass (.docx, .txt)
+override ``_parse``; the default falls back to ``get_text`` /
+``load_structured``.  Every view – including derived ones built with
+``view`` – is computed once and kept, so any combination of views costs a
+single parse.  Views are shared between threads: do not mutate them.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional
+
+# style features paragraph_tokens() can mark, cf. the diff/detect_* settings
+TOKEN_FEATURES = frozenset({
+    "bold", "italic", "underline", "font", "color", "size", "line_spacing",
+    "alignment", "numbering", "images", "tables", "style", "indent",
+})
+
+
+class ParsedDocument:
+    """Lazily parsed snapshot with memoised views."""
+
+    def __init__(self, loader: Any, opener: Callable[[], Any]):
+        """
+        :param loader: the loader for the file's format.
+        :param opener: returns the source to read (path or binary stream);
+                       called only when a view needs the file.
+        """
+        self._loader = loader
+        self._opener = opener
+        self._lock = threading.RLock()
+        self._views: Dict[Hashable, Any] = {}
+        # called with the views of a parse that produced both base views,
+        # e.g. to persist them (core.parse_cache)
+        self.on_parsed: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._nbytes = 0
+
+    # ------------------------------------------------------------------ views
+    @property
+    def text(self) -> str:
+        return self._base_view("text")
+
+    @property
+    def structured(self) -> Any:
+        return self._base_view("structured")
+
+    def paragraph_tokens(self, options: FrozenSet[str] = TOKEN_FEATURES) -> List[str]:
+        """Paragraph texts with the style tokens of *options* (see ``paragraph_tokens``)."""
+        options = frozenset(options)
+        return self.view(("tokens", options), lambda: paragraph_tokens(self.structured, options))
+
+    def view(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Derived view *key*, built by ``build()`` on first use."""
+        with self._lock:
+            if key not in self._views:
+                self._views[key] = build()
+                self._nbytes += estimate_size(self._views[key])
+            return self._views[key]
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory held by the views built so far (see ``estimate_size``)."""
+        return self._nbytes
+
+    # ------------------------------------------------------------------ parsing
+    def _base_view(self, name: str) -> Any:
+        with self._lock:
+            if name not in self._views:
+                views = self._parse(name)
+                self._views.update(views)
+                self._nbytes += sum(estimate_size(v) for v in views.values())
+                if self.on_parsed is not None and "text" in views and "structured" in views:
+                    self.on_parsed(views)
+            return self._views[name]
+
+    def _parse(self, name: str) -> Dict[str, Any]:
+        """
+        Read the file and return ``{"text": ..., "structured": ...}`` – at
+        least *name*.  The default asks the loader for that view only.
+        """
+        if name == "text":
+            return {"text": self._loader.get_text(self._opener())}
+        return {"structured": self._loader.load_structured(self._opener())}
+
+
+def estimate_size(obj: Any, _sample: int = 32) -> int:
+    """
+    Approximate memory of a view: ``sys.getsizeof`` summed over the
+    strings, numbers and containers it is built from.  Long lists are
+    extrapolated from an evenly spaced sample of their items and dict keys
+    are skipped (they are shared literals), so this stays cheap next to
+    the parse it measures.
+    """
+    getsizeof = sys.getsizeof
+    size = getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + sum(estimate_size(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)) and obj:
+        step = max(1, len(obj) // _sample)
+        items = obj[::step]
+        return size + sum(estimate_size(v) for v in items) * len(obj) // len(items)
+    return size
+
+
+def paragraph_tokens(structured: Any, options: FrozenSet[str] = TOKEN_FEATURES) -> List[str]:
+    """
+    Paragraph texts of a ``load_structured`` result with inline style tokens
+    (``<b>…</b>``, ``<align:…/>``, ``<table>…</table>`` …) for the features
+    in *options*, as compared by the paragraph diff and shown in previews.
+    """
+    if not structured:
+        return []
+    if isinstance(structured[0], str):
+        return structured
+
+    texts: List[str] = []
+    for p in structured:
+        if not isinstance(p, dict):
+            texts.append(str(p))
+            continue
+        runs = p.get("runs")
+        parts = paragraph_prefix(options, p.get("line_spacing"), p.get("alignment"),
+                                 p.get("indent_left"), p.get("indent_first"),
+                                 p.get("style"), p.get("numbering"))
+        if not runs:
+            parts.append(p.get("text", ""))
+            texts.append("".join(parts))
+            continue
+
+        for r in runs:
+            r_type = r.get("type", "text")
+            if r_type == "image":
+                if "images" in options:
+                    parts.append("<image/>")
+                continue
+            if r_type == "table":
+                parts.append(table_token(options, r.get("rows", [])))
+                continue
+            parts.append(run_token(options, r.get("text", ""), r.get("bold"), r.get("italic"),
+                                   r.get("underline"), r.get("font"), r.get("size"),
+                                   r.get("color")))
+
+        texts.append("".join(parts))
+    return texts
+
+
+# Building blocks of paragraph_tokens, shared with documents that tokenize
+# without materialising the paragraph dicts (core.parse_cache).
+
+def paragraph_prefix(options: FrozenSet[str], line_spacing, alignment, indent_left,
+                     indent_first, style, numbering) -> List[str]:
+    """Paragraph level tokens that precede the paragraph's runs."""
+    parts = []
+    if line_spacing is not None and "line_spacing" in options:
+        parts.append(f"<ls:{line_spacing}/>")
+    if alignment and "alignment" in options:
+        parts.append(f"<align:{alignment}/>")
+    if "indent" in options:
+        if indent_left is not None or indent_first is not None:
+            parts.append(f"<indent:{indent_left},{indent_first}/>")
+    if style and "style" in options:
+        parts.append(f"<style:{style}/>")
+    if numbering and "numbering" in options:
+        parts.append("<num/>")
+    return parts
+
+
+def run_token(options: FrozenSet[str], txt: str, bold, italic, underline,
+              font, size, color) -> str:
+    """Text of a run wrapped in the tokens of its character formatting."""
+    if bold and "bold" in options:
+        txt = f"<b>{txt}</b>"
+    if italic and "italic" in options:
+        txt = f"<i>{txt}</i>"
+    if underline and "underline" in options:
+        txt = f"<u>{txt}</u>"
+    if font and "font" in options:
+        txt = f"<font:{font}>{txt}</font>"
+    if size is not None and "size" in options:
+        txt = f"<size:{size}>{txt}</size>"
+    if color and "color" in options:
+        txt = f"<color:{color}>{txt}</color>"
+    return txt
+
+
+def table_token(options: FrozenSet[str], rows) -> str:
+    """A table run: its cells, inside ``<table>`` when tables are compared."""
+    table_text = "\n".join(" | ".join(row) for row in rows)
+    if "tables" in options:
+        return f"<table>{table_text}</table>"
+    return table_text
@@ -13,22 +13,49 @@ or a list of lines (load_structured).  Real‑world usage might add
 encoding detection or configurable fallback encodings.
 """
 
+import io
+
 from .base_loader import SnapshotLoader
 from .loader_registry import LoaderRegistry
+from .parsed_document import ParsedDocument
+
+
+class TxtDocument(ParsedDocument):
+    """Parsed text file: the lines are split from the text read once."""
+
+    def _parse(self, name):
+        text = self._loader.get_text(self._opener())
+        return {"text": text, "structured": TxtLoader._lines(text)}
 
 
 class TxtLoader(SnapshotLoader):
     """Loader for plain‑text snapshot files (.txt)."""
 
-    def get_text(self, file_path: str) -> str:
+    document_class = TxtDocument
+
+    @staticmethod
+    def _open_text(file_path):
+        """Text view over a path or binary stream (UTF‑8, errors ignored)."""
+        if hasattr(file_path, "read"):
+            file_path.seek(0)
+            return io.TextIOWrapper(file_path, encoding="utf-8", errors="ignore")
+        return open(file_path, "r", encoding="utf-8", errors="ignore")
+
+    def get_text(self, file_path) -> str:
         """Return the entire text content of the file."""
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as fp:
+        with self._open_text(file_path) as fp:
             return fp.read()
 
-    def load_structured(self, file_path: str):
+    def load_structured(self, file_path):
         """Return a list of lines for structure‑aware operations."""
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as fp:
-            return [line.rstrip("\n") for line in fp.readlines()]
+        return self._lines(self.get_text(file_path))
+
+    @staticmethod
+    def _lines(text: str):
+        lines = text.split("\n")
+        if lines[-1] == "":
+            lines.pop()           # like readlines(): no entry after a final newline
+        return lines
 
 
 # --------------------------------------------------------------------------- #
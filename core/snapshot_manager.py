@@ -2,7 +2,13 @@ import os
 import shutil
 import datetime
 import uuid
-from typing import List, Dict, Optional
+import threading
+import functools
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from typing import Callable, List, Dict, Optional
 from typing import Tuple
 from pathlib import Path
 from core.platform_utils import get_app_data_dir
@@ -11,10 +17,23 @@ from core.platform_utils import get_app_data_dir
 SNAP_ROOT = Path(get_app_data_dir()) / "snapshots"
 SNAP_ROOT.mkdir(parents=True, exist_ok=True)
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QSettings, QRunnable, QThread, QThreadPool, Qt
 
-from .version_db import SnapshotRepository
+from .version_db import SnapshotRepository, open_repository
+from .blob_store import BlobStore, DEFAULT_KEYFRAME_INTERVAL, DEFAULT_PACK_MIN_AGE
+from .blob_codecs import DEFAULT_LEVEL
 from .diff_engine import DiffEngine
+from .retention import RetentionPolicy
+from .change_detection import file_signature, semantic_hash, signature_matches
+from .snapshot_stats import document_stats, paragraph_texts
+from .search_index import SearchIndex
+from .parse_cache import DEFAULT_MAX_BYTES, ParseCache
+from .snapshot_loaders.base_loader import open_source
+from .snapshot_loaders.document_cache import (
+    DEFAULT_MAX_BYTES as DEFAULT_DOCUMENT_CACHE_BYTES, DocumentCache, default_cache,
+    parse_document, parse_file,
+)
+from .snapshot_loaders.parsed_document import ParsedDocument
 from .snapshot_loaders.loader_registry import LoaderRegistry
 
 
@@ -23,107 +42,328 @@ class SnapshotManager(QObject):
     Central service class that coordinates snapshot creation, deletion, listing,
     content retrieval and diff operations.  All UI layers should depend on this
     class rather than talking directly to the repository or the file‑system.
+
+    Concurrency model – every public method may be called from any thread:
+
+    * the repository guards its own state (a readers‑writer lock for the
+      JSON store, one serialised connection for SQLite), so UI reads run
+      alongside background writes;
+    * creating, deleting, restoring and thinning snapshots of one document
+      are serialised by a per‑document lock (re‑entrant – a restore creates
+      snapshots itself);
+    * ``_lock`` covers the manager's own state (undo stack, caches) and
+      sequences of repository / blob store calls that must not interleave;
+      it is taken after a document lock, never before one;
+    * all signals are emitted on the GUI thread (the manager's thread);
+      emissions from workers are queued there by ``_emit``.
     """
 
     snapshot_created = Signal(dict)   # metadata dict emitted after creation
     snapshot_deleted = Signal(dict)   # metadata dict emitted after deletion
+    history_thinned = Signal(str, dict)   # doc_name, thinning report
+    storage_packed = Signal(dict)         # packing report
+    storage_stats_ready = Signal(dict)    # storage_stats_async result
+    # create_snapshot_async
+    snapshot_progress = Signal(str, int)  # file_path, percent
+    snapshot_finished = Signal(str, dict) # requested file_path, new or unchanged metadata
+    snapshot_failed = Signal(str, str)    # file_path, error message
+    bulk_finished = Signal(list)          # create_snapshots_async results
+    snapshot_updated = Signal(dict)       # metadata completed later (stats)
+    search_indexing = Signal(int, int)    # index_snapshots_async: indexed, total
+    _dispatch = Signal(object)            # callable queued for the GUI thread
 
     def __init__(self,
                  repository: Optional[SnapshotRepository] = None,
-                 diff_engine: Optional[DiffEngine] = None):
+                 diff_engine: Optional[DiffEngine] = None,
+                 blob_store: Optional[BlobStore] = None,
+                 search_index: Optional[SearchIndex] = None,
+                 parse_cache: Optional[ParseCache] = None,
+                 document_cache: Optional[DocumentCache] = None):
         super().__init__()
         # Dependency injection: allows easy replacement in tests or future cloud repo.
-        self.repo = repository or SnapshotRepository()
-        self.diff_engine = diff_engine or DiffEngine()
+        self.repo = repository or open_repository(
+            QSettings().value("storage/metadata_backend", "sqlite"))
+        self.store = blob_store or BlobStore()
+        self.search = search_index or SearchIndex()
+        self.parse_cache = parse_cache or ParseCache(max_bytes=QSettings().value(
+            "storage/parse_cache_mb", DEFAULT_MAX_BYTES // (1024 * 1024), type=int) * 1024 * 1024)
+        # parsed documents shared by every page, window and diff of this process
+        if document_cache is None:
+            document_cache = default_cache()
+            document_cache.max_bytes = QSettings().value(
+                "cache/document_mb", DEFAULT_DOCUMENT_CACHE_BYTES // (1024 * 1024), type=int) * 1024 * 1024
+        self.documents = document_cache
+        self.diff_engine = diff_engine or DiffEngine(resolver=self.snapshot_source,
+                                                        parser=self.parse_snapshot)
         # stack of (doc_name, undo_meta, restore_meta) for undo feature
         self._undo_stack: List[Tuple[str, Dict, Dict]] = []
+        # serialises repository / blob writes with background workers
+        self._lock = threading.RLock()
+        # one lock per document: its snapshots are created / removed in order
+        self._doc_locks: Dict[str, threading.RLock] = {}
+        self._doc_locks_guard = threading.Lock()
+        # doc_name -> (blob, paragraph texts) of its newest analysed version
+        self._paragraphs: Dict[str, Tuple[str, List[str]]] = {}
+        # snapshot_id -> previous metadata, for statistics computed after commit
+        self._pending_stats: Dict[str, Optional[Dict]] = {}
+        # doc_name -> newest metadata of a create_snapshots batch, not yet committed
+        self._uncommitted: Dict[str, Dict] = {}
+        self._dispatch.connect(self._run_dispatched, Qt.QueuedConnection)
 
     def delete_all_snapshots(self, doc_name: str) -> None:
         """Delete all snapshots of a document and clear metadata."""
-        self.repo.reload()
-        versions = self.repo.get_versions(doc_name)
-        for meta in versions:
-            path = meta.get("snapshot_path")
-            if path and os.path.exists(path):
-                os.remove(path)
-        if doc_name in self.repo.data:
-            del self.repo.data[doc_name]
-            self.repo.save()
-        snap_dir = SNAP_ROOT / doc_name
-        if snap_dir.exists():
-            shutil.rmtree(snap_dir, ignore_errors=True)
+        with self._doc_lock(doc_name):
+            with self._lock, self.store.transaction():
+                self.repo.reload()
+                versions = self.repo.get_versions(doc_name)
+                # metadata first: a crash in between leaks a reference
+                # instead of leaving metadata that points at a deleted blob
+                self.repo.remove_document(doc_name)
+                self.search.remove_document(doc_name)
+                for meta in versions:
+                    self._release_snapshot_file(meta)
+            snap_dir = SNAP_ROOT / doc_name
+            if snap_dir.exists():
+                shutil.rmtree(snap_dir, ignore_errors=True)
 
     # ------------------------------------------------------------------ public API
 
-    def create_snapshot(self, file_path: str, remark: str = "") -> Dict:
+    def create_snapshot(self, file_path: str, remark: str = "", force: bool = False) -> Dict:
         """
         Create a new snapshot from `file_path`.
 
+        Unless *force* is set or a *remark* is given, a file that has not
+        changed since the latest snapshot of the document is not recorded
+        again: the latest metadata is returned with ``"unchanged": True``
+        and no signal is emitted.  "Unchanged" means same size + mtime, else
+        same SHA‑256 (the latest snapshot then takes over the file's new
+        mtime), else – when the ``snapshot/semantic_check`` option is on –
+        the same semantic hash of the loader's structured content.
+
         :param file_path: Absolute path of the source document.
         :param remark:    Optional commit message / remark string.
-        :return:          Metadata dict describing the new snapshot.
-        """
-        if not os.path.isfile(file_path):
-            raise FileNotFoundError(file_path)
+        :param force:     Always record a new snapshot.
+        :return:          Metadata dict describing the new (or unchanged) snapshot.
 
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        doc_name = os.path.basename(file_path)
-        ext = os.path.splitext(file_path)[1]  # keep original extension (e.g., ".txt")
-        # Store snapshots under .../OfficeMate/snapshots/<doc_name>/
-        snapshot_dir = SNAP_ROOT / os.path.basename(file_path)
-        snapshot_dir.mkdir(parents=True, exist_ok=True)
-
-        snapshot_id = f"{timestamp}_{uuid.uuid4().hex[:6]}"
-        snapshot_file = snapshot_dir / f"{snapshot_id}{ext}"
-
-        # 1. copy file bytes (default saver behaviour)
-        shutil.copyfile(file_path, str(snapshot_file))
-
-        # 2. prepare metadata & persist
-        meta = {
-            "snapshot_id": snapshot_id,
-            "file": doc_name,
-            "file_path": file_path,          # absolute path of original doc
-            "timestamp": timestamp,
-            "remark": remark,
-            "snapshot_path": str(snapshot_file)
-        }
-        self.repo.save_version(doc_name, meta)
-        # register a fallback plain‑text loader for legacy '.bak' if not yet registered
-        if LoaderRegistry.get_loader(".bak") is None:
-            class _BakFallbackLoader:
-                def get_text(self, fp):  # simplistic; tries text read
-                    try:
-                        with open(fp, "r", encoding="utf-8", errors="ignore") as f:
-                            return f.read()
-                    except Exception:
-                        return "(binary content)"
-                def load_structured(self, fp):
-                    return self.get_text(fp)
-            LoaderRegistry.register_loader(".bak", _BakFallbackLoader())
-        # emit signal for UI refresh
-        self.snapshot_created.emit(meta)
+        Statistics (``meta["stats"]``) are computed on the thread pool after
+        the snapshot is committed; ``snapshot_updated`` fires when they are
+        stored.  The async and bulk variants compute them before committing.
+        """
+        meta = self._create_snapshot(file_path, remark, force, stats=False)
+        if not meta.get("unchanged"):
+            # emit signal for UI refresh
+            self._emit(self.snapshot_created, meta)
+            QThreadPool.globalInstance().start(_BackgroundTask(
+                lambda: self._complete_stats(meta), self._on_stats_done))
         return meta
 
-    def delete_snapshot(self, doc_name: str, version_meta: Dict) -> None:
+    def create_snapshot_async(self, file_path: str, remark: str = "", force: bool = False) -> None:
+        """
+        Run ``create_snapshot`` on the global thread pool.
+
+        ``snapshot_progress`` reports the hashing / storing progress,
+        ``snapshot_finished`` (plus ``snapshot_created`` for a new version)
+        or ``snapshot_failed`` fire on the GUI thread when the work is done;
+        all three carry the requested *file_path* – the metadata of an
+        unchanged result may name another file with the same content.
+        Snapshots of the same document are serialised.
+        """
+        def _done(result: Dict) -> None:
+            if "error" in result:
+                self._emit(self.snapshot_failed, file_path, result["error"])
+            else:
+                self._on_gui(self._on_create_finished, file_path, result)
+
+        QThreadPool.globalInstance().start(_BackgroundTask(
+            lambda: self._create_snapshot(
+                file_path, remark, force,
+                progress=lambda pct: self._emit(self.snapshot_progress, file_path, pct)),
+            _done))
+
+    def create_snapshots(self, file_paths: List[str], remark: str = "",
+                         max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Snapshot several documents at once (e.g. every tracked project).
+
+        Files are hashed and stored in parallel on a thread pool; the new
+        metadata entries are committed with a single repository write.
+        Every document's lock is held until that write, so a concurrent
+        ``create_snapshot`` never deltas against a stale latest version.  If
+        the write fails the new blob references are released again and the
+        created entries are reported as failed.
+        No signals are emitted – see ``create_snapshots_async``.
+
+        :return: one result per path, in input order:
+                 ``{"file_path", "status": "created" | "unchanged" | "failed",
+                 "meta" (unless failed), "error" (if failed)}``
+        """
+        paths = list(dict.fromkeys(file_paths))      # drop duplicates, keep order
+        # paths sharing a document name run in order within one task
+        groups: Dict[str, List[str]] = {}
+        for path in paths:
+            groups.setdefault(os.path.basename(path), []).append(path)
+        outcome: Dict[str, Dict] = {}
+
+        def run(group: List[str]) -> None:
+            for path in group:
+                try:
+                    meta = self._create_snapshot(path, remark, commit=False, doc_locked=True)
+                except Exception as exc:
+                    outcome[path] = {"file_path": path, "status": "failed", "error": str(exc)}
+                    continue
+                status = "unchanged" if meta.get("unchanged") else "created"
+                outcome[path] = {"file_path": path, "status": status, "meta": meta}
+                if status == "created":
+                    with self._lock:
+                        self._uncommitted[meta["file"]] = meta
+
+        with ExitStack() as locks:
+            # this thread holds the document locks on the workers' behalf;
+            # sorted, so two batches cannot deadlock
+            for doc_name in sorted(groups):
+                locks.enter_context(self._doc_lock(doc_name))
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    list(pool.map(run, groups.values()))
+                results = [outcome[path] for path in paths]
+                created = [r for r in results if r["status"] == "created"]
+                try:
+                    with self._lock:
+                        self.repo.save_versions([(r["meta"]["file"], r["meta"]) for r in created])
+                except Exception as exc:
+                    # nothing was committed: give the blob references back
+                    for r in created:
+                        self._release_snapshot_file(r.pop("meta"))
+                        r.update(status="failed", error=str(exc))
+            finally:
+                with self._lock:
+                    for doc_name in groups:
+                        self._uncommitted.pop(doc_name, None)
+        return results
+
+    def create_snapshots_async(self, file_paths: List[str], remark: str = "") -> None:
+        """
+        Run ``create_snapshots`` in the background.  ``snapshot_created``
+        fires for every new version, then ``bulk_finished`` with the
+        per‑document results – both on the GUI thread.
+        """
+        QThreadPool.globalInstance().start(_BackgroundTask(
+            lambda: {"results": self.create_snapshots(file_paths, remark)},
+            lambda report: self._on_gui(self._on_bulk_finished, report)))
+
+    def delete_snapshot(self, doc_name: str, snapshot) -> None:
         """
         Delete snapshot file and remove metadata entry.
+
+        *snapshot* is a snapshot key (see ``get_snapshot``) or its metadata.
+        Blob‑backed snapshots only drop a reference; the shared blob is
+        removed once no other snapshot points at it.
         """
-        snapshot_path = version_meta.get("snapshot_path")
-        if snapshot_path and os.path.exists(snapshot_path):
-            os.remove(snapshot_path)
-        self.repo.remove_version(doc_name, version_meta)
+        # the store transaction excludes deletes in other processes too
+        with self._doc_lock(doc_name), self._lock, self.store.transaction():
+            version_meta = self._resolve(snapshot)
+            # gone already (deleted by another thread or process): never
+            # release twice
+            if version_meta is None or self.get_snapshot(self.snapshot_key(version_meta)) is None:
+                return
+            self.repo.remove_version(doc_name, version_meta)
+            self.search.remove_snapshots([self.snapshot_key(version_meta)])
+            self._release_snapshot_file(version_meta)
         # emit signal for UI refresh
-        self.snapshot_deleted.emit(version_meta)
+        self._emit(self.snapshot_deleted, version_meta)
 
     def list_snapshots(self, doc_name: str) -> List[Dict]:
         """
         Return list of snapshot metadata for given document, newest first.
         """
+        self.repo.reload()      # cheap unless another process changed the store
+        return sorted(self.repo.get_versions(doc_name),
+                      key=lambda v: v.get("timestamp", ""), reverse=True)
+
+    def query_snapshots(self, doc_name: str, limit: int = 100, cursor=None,
+                        since: Optional[str] = None, until: Optional[str] = None,
+                        remark: Optional[str] = None) -> Tuple[List[Dict], Optional[list]]:
+        """
+        Return one page of snapshot metadata, newest first.
+
+        :param cursor: ``None`` for the first page, else the cursor returned
+                       with the previous page.
+        :param since:  inclusive lower timestamp bound (``%Y-%m-%d_%H-%M-%S``).
+        :param until:  inclusive upper timestamp bound.
+        :param remark: case‑insensitive substring of the remark.
+        :return:       ``(versions, next_cursor)``; ``next_cursor`` is None
+                       after the last page.
+        """
         self.repo.reload()
-        versions = self.repo.get_versions(doc_name)
-        versions.sort(key=lambda v: v.get("timestamp", ""), reverse=True)
-        return versions
+        return self.repo.query_versions(doc_name, limit, cursor, since, until, remark)
+
+    def get_snapshot(self, key: str) -> Optional[Dict]:
+        """
+        Return the metadata for a snapshot key, or None.
+
+        The key is ``snapshot_id``; legacy snapshots without an id are
+        keyed by their ``snapshot_path`` (see ``snapshot_key``).
+        """
+        self.repo.reload()
+        return self.repo.get_version(key) or self.repo.find_by_path(key)
+
+    def snapshot_summary(self, doc_name: str) -> Dict:
+        """``{"snapshot_count", "last_snapshot"}`` of *doc_name* without loading its history."""
+        self.repo.reload()
+        latest, _ = self.repo.query_versions(doc_name, 1)
+        return {"snapshot_count": self.repo.count_versions(doc_name),
+                "last_snapshot": latest[0].get("timestamp") if latest else None}
+
+    @staticmethod
+    def snapshot_key(meta: Dict) -> str:
+        """Stable key of *meta* for UI item data – pass it back to the API."""
+        return meta.get("snapshot_id") or meta.get("snapshot_path", "")
+
+    # ----------------- full‑text search -----------------
+    def search_snapshots(self, query: str, doc_name: Optional[str] = None,
+                         limit: int = 200) -> List[Dict]:
+        """
+        Find paragraphs (and remarks) containing every term of *query* in
+        all snapshots – or only those of *doc_name* – newest first.
+
+        :return: ``[{"doc_name", "snapshot_key", "timestamp", "paragraph",
+                 "text", "snippet", "meta"}, ...]`` – see
+                 ``SearchIndex.search``; snapshots deleted in the meantime
+                 are skipped.
+        """
+        hits = []
+        for hit in self.search.search(query, doc_name, limit):
+            meta = self.get_snapshot(hit["snapshot_key"])
+            if meta is not None:
+                hits.append(dict(hit, meta=meta))
+        return hits
+
+    def index_snapshots(self, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+        """
+        Add the snapshots missing from the search index (those created
+        before it existed, or whose indexing failed).  New snapshots are
+        indexed when they are created.
+
+        :return: ``{"indexed": int}``
+        """
+        self.repo.reload()
+        done = self.search.indexed_keys()
+        missing = [m for _, m in self.repo.iter_versions() if self.snapshot_key(m) not in done]
+        progress = progress or (lambda indexed, total: None)
+        for i, meta in enumerate(missing, 1):
+            structured = self._load_structured(meta.get("snapshot_path", ""))
+            self._index_texts(meta, paragraph_texts(structured) if structured is not None else [])
+            if i % 50 == 0:
+                progress(i, len(missing))
+        progress(len(missing), len(missing))
+        return {"indexed": len(missing)}
+
+    def index_snapshots_async(self) -> None:
+        """Run ``index_snapshots`` in the background; reports ``search_indexing``."""
+        QThreadPool.globalInstance().start(_BackgroundTask(
+            lambda: self.index_snapshots(
+                lambda indexed, total: self._emit(self.search_indexing, indexed, total)),
+            lambda report: None))
 
     def get_snapshot_content(self, snapshot_path: str) -> str:
         """
@@ -144,11 +384,10 @@ class SnapshotManager(QObject):
         ValueError
             If no loader is registered for the file extension.
         """
-        _, ext = os.path.splitext(snapshot_path)
-        loader = LoaderRegistry.get_loader(ext)
-        if loader is None:
-            raise ValueError(f"Unsupported snapshot format: {ext}")
-        return loader.get_text(snapshot_path)
+        doc = self.parse_snapshot(snapshot_path)
+        if doc is None:
+            raise ValueError(f"Unsupported snapshot format: {os.path.splitext(snapshot_path)[1]}")
+        return doc.text
 
     def compare_snapshots(self, path1: str, path2: str) -> str:
         """
@@ -156,51 +395,488 @@ class SnapshotManager(QObject):
         """
         return self.diff_engine.compare_files(path1, path2)
 
+    def storage_stats(self) -> Dict[str, int]:
+        """
+        Report snapshot storage usage.
+
+        ``logical_bytes`` is what all snapshots would occupy as plain copies,
+        ``stored_bytes`` what the blob store (plus legacy files) really uses.
+        """
+        logical = stored = 0
+        for _, meta in self.repo.iter_versions():
+            if meta.get("blob"):
+                if self.store.contains(meta["blob"]):
+                    logical += self.store.logical_size(meta["blob"])
+            elif os.path.exists(meta.get("snapshot_path", "")):
+                size = os.path.getsize(meta["snapshot_path"])
+                logical += size
+                stored += size
+        stored += self.store.stored_bytes()
+        return {"logical_bytes": logical, "stored_bytes": stored}
+
+    # ----------------- retention / thinning -----------------
+    def thin_history(self, doc_name: str,
+                     policy: Optional[RetentionPolicy] = None,
+                     dry_run: bool = False) -> Dict:
+        """
+        Remove the snapshots of *doc_name* that *policy* does not keep.
+
+        All metadata changes go to the repository in one write and the
+        released blobs are reclaimed immediately.  With *dry_run* nothing is
+        changed; the report lists what would be removed.
+
+        :return: ``{"removed": [meta, ...], "freed_bytes": int, "dry_run": bool}``
+        """
+        policy = policy or RetentionPolicy()
+        # the store transaction keeps other processes from deleting the same
+        # versions (and releasing their blobs) in between
+        with self._doc_lock(doc_name), self._lock, self.store.transaction():
+            self.repo.reload()
+            removals = policy.select_removals(list(self.repo.get_versions(doc_name)))
+            blobs = [m["blob"] for m in removals if m.get("blob")]
+            legacy = [m["snapshot_path"] for m in removals
+                      if not m.get("blob") and os.path.exists(m.get("snapshot_path", ""))]
+            freed = sum(os.path.getsize(p) for p in legacy)
+            if dry_run or not removals:
+                freed += self.store.release_many(blobs, dry_run=True)
+            else:
+                # metadata first: a crash in between leaks references
+                # instead of leaving versions that point at deleted blobs
+                self.repo.remove_versions(doc_name, removals)
+                self.search.remove_snapshots(self.snapshot_key(m) for m in removals)
+                freed += self.store.release_many(blobs)
+                for path in legacy:
+                    os.remove(path)
+        return {"removed": removals, "freed_bytes": freed, "dry_run": dry_run}
+
+    def thin_history_async(self, doc_name: str,
+                           policy: Optional[RetentionPolicy] = None,
+                           dry_run: bool = False) -> None:
+        """
+        Run ``thin_history`` on the global thread pool; ``history_thinned``
+        is emitted on the GUI thread when it finishes.
+        """
+        QThreadPool.globalInstance().start(_BackgroundTask(
+            lambda: self.thin_history(doc_name, policy, dry_run),
+            lambda report: self._emit(self.history_thinned, doc_name, report)))
+
+    # ----------------- packing -----------------
+    def pack_snapshots(self, min_age: float = DEFAULT_PACK_MIN_AGE) -> Dict[str, int]:
+        """
+        Merge older loose snapshot data into pack files.
+
+        Legacy snapshot files (written before the blob store existed) are
+        imported into the store first so they are packed too; their
+        metadata is updated in a single repository write.  Packs with many
+        dead objects are rewritten afterwards.
+
+        :return: ``{"imported": int, "packed": int, "reclaimed_bytes": int}``
+        """
+        cutoff = time.time() - min_age
+        imported: List[str] = []
+        updated: List[Tuple[str, Dict]] = []
+        with self._lock:
+            self._load_storage_settings()
+            for doc_name, meta in self.repo.iter_versions():
+                path = meta.get("snapshot_path", "")
+                if meta.get("blob") or not os.path.isfile(path):
+                    continue
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                meta = dict(meta, blob=self.store.put_file(path))
+                os.remove(path)
+                imported.append(meta["blob"])
+                updated.append((doc_name, meta))
+            self.repo.update_versions(updated)
+            for doc_name in {doc for doc, _ in updated}:
+                snap_dir = SNAP_ROOT / doc_name
+                if snap_dir.is_dir() and not any(snap_dir.iterdir()):
+                    snap_dir.rmdir()
+            # imported files are old by definition, pack them regardless of age
+            packed = self.store.pack_objects(min_age, digests=imported)
+            reclaimed = self.store.repack()
+        return {"imported": len(imported), "packed": packed, "reclaimed_bytes": reclaimed}
+
+    def storage_stats_async(self) -> None:
+        """Run ``storage_stats`` in the background; emits ``storage_stats_ready``."""
+        QThreadPool.globalInstance().start(_BackgroundTask(
+            self.storage_stats, lambda report: self._emit(self.storage_stats_ready, report)))
+
+    def pack_snapshots_async(self, min_age: float = DEFAULT_PACK_MIN_AGE) -> None:
+        """Run ``pack_snapshots`` in the background; emits ``storage_packed``."""
+        QThreadPool.globalInstance().start(_BackgroundTask(
+            lambda: self.pack_snapshots(min_age),
+            lambda report: self._emit(self.storage_packed, report)))
+
+    def parse_snapshot(self, path: str) -> Optional[ParsedDocument]:
+        """
+        Parsed document of the snapshot (or plain file) at *path*, shared
+        process‑wide through ``self.documents``: previews, diffs and
+        statistics of the same content read it once.  Blob‑backed snapshots
+        are keyed by their SHA‑256, other files – the working document –
+        by path and re‑parsed once their size or mtime changes.  None if no
+        loader handles the extension.
+        """
+        ext = os.path.splitext(path)[1]
+        meta = self._find_meta(path)
+        if meta and meta.get("blob"):
+            return self._blob_document(meta["blob"], ext)
+        return parse_file(path, ext, cache=self.documents)
+
+    def snapshot_source(self, path: str):
+        """
+        Resolve a snapshot path to something a loader can read.
+
+        ``meta["snapshot_path"]`` is a logical name (it keeps the original
+        extension for loader lookup); blob‑backed snapshots are resolved
+        through the blob store, which returns either the object path or a
+        binary stream over the reconstructed bytes (delta storage).  Legacy
+        snapshots and ordinary working documents are returned unchanged.
+        """
+        meta = self._find_meta(path)
+        if meta and meta.get("blob"):
+            return self.store.source(meta["blob"])
+        return path
+
 
     # ----------------- restore / undo -----------------
-    def restore_snapshot(self, target_meta: Dict):
+    def restore_snapshot(self, target):
         """
-        Safely restore working document to the state of target_meta.
+        Safely restore working document to the state of *target*
+        (a snapshot key or its metadata).
         1) create auto-backup of current doc (undo point)
         2) overwrite current doc with snapshot content
         3) create new snapshot entry 'Restore to <id>'
         """
+        target_meta = self._resolve(target)
+        if target_meta is None:
+            raise KeyError(f"Unknown snapshot: {target}")
         snap_id = target_meta.get("snapshot_id") or os.path.splitext(os.path.basename(target_meta.get("snapshot_path", "")))[0]
         work_file = self._get_work_file(target_meta)
 
-        # 1. backup current state
-        backup_meta = self.create_snapshot(
-            work_file,
-            remark=f"Auto backup before restore -> {snap_id}"
-        )
+        with self._doc_lock(os.path.basename(work_file)):
+            # 1. backup current state
+            backup_meta = self.create_snapshot(
+                work_file,
+                remark=f"Auto backup before restore -> {snap_id}",
+                force=True,
+            )
 
-        # 2. overwrite
-        shutil.copyfile(target_meta["snapshot_path"], work_file)
+            # 2. overwrite
+            self._write_snapshot_to(target_meta, work_file)
 
-        # 3. add new snapshot indicating restore
-        restore_meta = self.create_snapshot(
-            work_file,
-            remark=f"Restore to {snap_id}"
-        )
+            # 3. add new snapshot indicating restore
+            restore_meta = self.create_snapshot(
+                work_file,
+                remark=f"Restore to {snap_id}",
+                force=True,
+            )
 
         # push undo stack
-        self._undo_stack.append((target_meta.get("file", ""), backup_meta, restore_meta))
+        with self._lock:
+            self._undo_stack.append((target_meta.get("file", ""), backup_meta, restore_meta))
 
     def can_undo(self) -> bool:
         return bool(self._undo_stack)
 
     def undo_restore(self):
         """Undo the most recent restore operation."""
-        if not self._undo_stack:
-            return
-        doc_name, backup_meta, restore_meta = self._undo_stack.pop()
+        with self._lock:
+            if not self._undo_stack:
+                return
+            doc_name, backup_meta, restore_meta = self._undo_stack.pop()
         # restore to backup_meta (this will push another entry, but we don't push recursively)
         work_file = self._get_work_file(backup_meta)
-        shutil.copyfile(backup_meta["snapshot_path"], work_file)
-        self.create_snapshot(work_file, remark="Undo Restore")
+        with self._doc_lock(os.path.basename(work_file)):
+            self._write_snapshot_to(backup_meta, work_file)
+            self.create_snapshot(work_file, remark="Undo Restore", force=True)
 
 
     # ----------------- internal helpers -----------------
+    def _load_storage_settings(self) -> None:
+        """Apply the user's storage options (Settings → Snapshot) to the store."""
+        settings = QSettings()
+        self.store.delta_mode = settings.value("storage/delta_mode", False, type=bool)
+        self.store.keyframe_interval = settings.value(
+            "storage/keyframe_interval", DEFAULT_KEYFRAME_INTERVAL, type=int)
+        self.store.docx_parts = settings.value("storage/docx_parts", True, type=bool)
+        self.store.compression = settings.value("storage/compression", "none")
+        self.store.compression_level = settings.value(
+            "storage/compression_level", DEFAULT_LEVEL, type=int)
+
+    def _create_snapshot(self, file_path: str, remark: str = "", force: bool = False,
+                         progress: Optional[Callable[[int], None]] = None,
+                         commit: bool = True, stats: bool = True,
+                         doc_locked: bool = False) -> Dict:
+        """
+        Body of ``create_snapshot`` without signals; safe on worker threads.
+
+        With ``commit=False`` the blob is stored but the metadata is only
+        returned – the caller persists it (batched writes).  With
+        ``stats=False`` the statistics are left to ``_complete_stats``.
+        ``doc_locked`` means the caller holds the document lock for this
+        call (``create_snapshots``).
+        """
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(file_path)
+
+        doc_name = os.path.basename(file_path)
+        ext = os.path.splitext(file_path)[1]  # keep original extension (e.g., ".txt")
+        progress = progress or (lambda pct: None)
+        with nullcontext() if doc_locked else self._doc_lock(doc_name):
+            # timestamp once the document lock is held: queued snapshots keep their order
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            # Logical snapshot path .../OfficeMate/snapshots/<doc_name>/<id><ext>;
+            # the bytes themselves live once per SHA‑256 in the blob store.
+            snapshot_dir = SNAP_ROOT / doc_name
+
+            snapshot_id = f"{timestamp}_{uuid.uuid4().hex[:6]}"
+            snapshot_file = snapshot_dir / f"{snapshot_id}{ext}"
+
+            latest = self._latest_meta(doc_name)
+            signature = file_signature(file_path)
+            # a remark always gets its own snapshot, even of unchanged content
+            gate = latest is not None and not force and not remark
+            if gate and signature_matches(latest, file_path, signature):
+                return dict(latest, unchanged=True)
+
+            # 1. read the source exactly once: copy + SHA‑256 + size + zip
+            #    summary; every later step works on the local staged copy
+            staged = self.store.stage(
+                file_path, progress=lambda done, total: progress(done * 50 // max(total, 1)))
+            try:
+                if gate and latest.get("blob") == staged.digest:
+                    return self._refresh_signature(doc_name, latest, file_path,
+                                                   (staged.size, signature[1]))
+                semantic = structured = None
+                semantic_check = QSettings().value("snapshot/semantic_check", False, type=bool)
+                if semantic_check or stats:
+                    # parsed once, for the semantic hash and the statistics
+                    # (and kept for previews of the new snapshot)
+                    structured = self._structured_of(self._blob_document(staged.digest, ext, staged.path))
+                if semantic_check and structured is not None:
+                    semantic = semantic_hash(structured, staged.zip_summary)
+                    if (gate and semantic is not None
+                            and semantic == self._latest_semantic_hash(latest)):
+                        return dict(latest, unchanged=True)
+                progress(60)
+                # 2. store it (deduplicated by content hash; in delta mode
+                #    encoded against the previous version of this document)
+                with self._lock:
+                    self._load_storage_settings()
+                digest = self.store.put_staged(staged, base=latest.get("blob") if latest else None)
+            finally:
+                staged.discard()
+            progress(90)
+
+            # 3. prepare metadata & persist
+            meta = {
+                "snapshot_id": snapshot_id,
+                "file": doc_name,
+                "file_path": file_path,          # absolute path of original doc
+                "timestamp": timestamp,
+                "remark": remark,
+                "snapshot_path": str(snapshot_file),
+                "blob": digest,                  # SHA‑256 of the file bytes
+                "size": staged.size,
+                "mtime_ns": signature[1],
+            }
+            if staged.zip_summary is not None:
+                meta["zip_summary"] = staged.zip_summary
+            if semantic is not None:
+                meta["semantic_hash"] = semantic
+            if stats and structured is not None:
+                meta["stats"] = self._document_stats(meta, structured, latest)
+            elif not stats:
+                with self._lock:
+                    self._pending_stats[snapshot_id] = latest
+            if commit:
+                with self._lock:
+                    self.repo.save_version(doc_name, meta)
+            progress(100)
+        # register a fallback plain‑text loader for legacy '.bak' if not yet registered
+        if LoaderRegistry.get_loader(".bak") is None:
+            class _BakFallbackLoader:
+                def get_text(self, fp):  # simplistic; tries text read
+                    try:
+                        with open_source(fp) as f:
+                            return f.read().decode("utf-8", errors="ignore")
+                    except Exception:
+                        return "(binary content)"
+                def load_structured(self, fp):
+                    return self.get_text(fp)
+            LoaderRegistry.register_loader(".bak", _BakFallbackLoader())
+        return meta
+
+    def _emit(self, signal, *args) -> None:
+        """Emit *signal* on the GUI thread: directly there, queued from workers."""
+        self._on_gui(signal.emit, *args)
+
+    def _on_gui(self, fn: Callable, *args) -> None:
+        """Call ``fn(*args)`` on the manager's (GUI) thread."""
+        if QThread.currentThread() is self.thread():
+            fn(*args)
+        else:
+            self._dispatch.emit(functools.partial(fn, *args))
+
+    def _run_dispatched(self, fn: Callable) -> None:
+        fn()
+
+    def _on_create_finished(self, file_path: str, meta: Dict) -> None:
+        if not meta.get("unchanged"):
+            self.snapshot_created.emit(meta)
+        self.snapshot_finished.emit(file_path, meta)
+
+    def _on_bulk_finished(self, report: Dict) -> None:
+        results = report.get("results")
+        if results is None:   # the whole batch failed (e.g. repository write)
+            results = [{"file_path": "", "status": "failed", "error": report.get("error", "")}]
+        for result in results:
+            if result["status"] == "created":
+                self.snapshot_created.emit(result["meta"])
+        self.bulk_finished.emit(results)
+
+    def _doc_lock(self, doc_name: str) -> threading.RLock:
+        with self._doc_locks_guard:
+            return self._doc_locks.setdefault(doc_name, threading.RLock())
+
+    def _blob_document(self, digest: str, ext: str,
+                       staged: Optional[Path] = None) -> Optional[ParsedDocument]:
+        """
+        Cached document of blob *digest* (read from *staged* while that
+        exists).  Its views come from the persistent parse cache when the
+        blob has been parsed before, in this or an earlier session.
+        """
+        def source():
+            if staged is not None and staged.exists():
+                return str(staged)
+            return self.store.source(digest)
+
+        def create(loader, opener) -> ParsedDocument:
+            return self.parse_cache.document(loader, ext, digest, opener)
+        return parse_document(source, ext, ("blob", digest), factory=create, cache=self.documents)
+
+    def _load_structured(self, path: str):
+        """Structured content of the snapshot at *path*; None if unsupported or unreadable."""
+        try:
+            return self._structured_of(self.parse_snapshot(path))
+        except OSError:          # snapshot data gone (legacy file removed …)
+            return None
+
+    @staticmethod
+    def _structured_of(doc: Optional[ParsedDocument]):
+        if doc is None:
+            return None
+        try:
+            return doc.structured
+        except Exception:
+            return None
+
+    def _document_stats(self, meta: Dict, structured, previous: Optional[Dict]) -> Dict:
+        """
+        Statistics of the new version *meta*; changes are counted against
+        *previous*.  The paragraph texts are added to the search index too.
+        """
+        texts = paragraph_texts(structured)
+        before = self._paragraph_texts_of(meta["file"], previous) if previous else None
+        with self._lock:
+            self._paragraphs[meta["file"]] = (meta.get("blob"), texts)
+        self._index_texts(meta, texts)
+        return document_stats(structured, before)
+
+    def _index_texts(self, meta: Dict, texts: List[str]) -> None:
+        try:
+            self.search.add_snapshot(meta["file"], self.snapshot_key(meta),
+                                     meta.get("timestamp", ""), texts, meta.get("remark", ""))
+        except sqlite3.Error:
+            pass                 # not fatal: index_snapshots picks it up later
+
+    def _paragraph_texts_of(self, doc_name: str, meta: Dict) -> Optional[List[str]]:
+        """Paragraph texts of the version *meta* – cached for the newest one."""
+        with self._lock:
+            cached = self._paragraphs.get(doc_name)
+        if cached and meta.get("blob") and cached[0] == meta["blob"]:
+            return cached[1]
+        structured = self._load_structured(meta.get("snapshot_path", ""))
+        return paragraph_texts(structured) if structured is not None else None
+
+    def _complete_stats(self, meta: Dict) -> Dict:
+        """Compute and store the statistics of a committed snapshot (worker thread)."""
+        with self._lock:
+            previous = self._pending_stats.pop(meta["snapshot_id"], None)
+        structured = self._load_structured(meta["snapshot_path"])
+        if structured is None:
+            return {}
+        meta = dict(meta, stats=self._document_stats(meta, structured, previous))
+        with self._lock:
+            if self.repo.get_version(meta["snapshot_id"]) is None:
+                return {}        # deleted in the meantime
+            self.repo.update_version(meta["file"], meta)
+        return meta
+
+    def _on_stats_done(self, meta: Dict) -> None:
+        if meta.get("snapshot_id"):
+            self._emit(self.snapshot_updated, meta)
+
+    def _latest_semantic_hash(self, latest: Dict) -> Optional[str]:
+        """Semantic hash recorded for *latest*, computed from its bytes if missing."""
+        if latest.get("semantic_hash"):
+            return latest["semantic_hash"]
+        structured = self._load_structured(latest.get("snapshot_path", ""))
+        if structured is None:
+            return None
+        return semantic_hash(structured, latest.get("zip_summary"))
+
+    def _refresh_signature(self, doc_name: str, latest: Dict, file_path: str,
+                           signature: Tuple[int, int]) -> Dict:
+        """
+        Same content as *latest* under another mtime (touched, saved without
+        edits): store the new signature so the next check is a stat again.
+        """
+        # another file of the same name (other folder) keeps its own path
+        if latest.get("file_path") == file_path and not signature_matches(latest, file_path, signature):
+            latest = dict(latest, size=signature[0], mtime_ns=signature[1])
+            with self._lock:
+                self.repo.update_version(doc_name, latest)
+        return dict(latest, unchanged=True)
+
+    def _latest_meta(self, doc_name: str) -> Optional[Dict]:
+        """Return the newest snapshot metadata of *doc_name*, if any."""
+        pending = self._uncommitted.get(doc_name)
+        if pending is not None:
+            return pending
+        versions = self.repo.get_versions(doc_name)
+        if not versions:
+            return None
+        # reversed: among equal (second‑resolution) timestamps prefer the
+        # most recently appended entry
+        return max(reversed(versions), key=lambda v: v.get("timestamp", ""))
+
+    def _find_meta(self, snapshot_path: str) -> Optional[Dict]:
+        """Return metadata whose ``snapshot_path`` equals *snapshot_path*."""
+        return self.repo.find_by_path(snapshot_path)
+
+    def _resolve(self, snapshot) -> Optional[Dict]:
+        """Metadata for a snapshot key; metadata dicts are passed through."""
+        return snapshot if isinstance(snapshot, dict) else self.get_snapshot(snapshot)
+
+    def _write_snapshot_to(self, meta: Dict, dest_path: str) -> None:
+        """Copy the snapshot bytes described by *meta* to *dest_path*."""
+        if meta.get("blob"):
+            self.store.copy_to(meta["blob"], dest_path)
+        else:
+            shutil.copyfile(meta["snapshot_path"], dest_path)
+
+    def _release_snapshot_file(self, meta: Dict) -> None:
+        """Drop the blob reference (or legacy file) owned by *meta*."""
+        if meta.get("blob"):
+            if self.store.release(meta["blob"]):
+                self.parse_cache.discard(meta["blob"])
+            return
+        path = meta.get("snapshot_path")
+        if path and os.path.exists(path):
+            os.remove(path)
+
     def _get_work_file(self, meta: Dict) -> str:
         """
         Return absolute path to the original working document.
@@ -216,3 +892,19 @@ class SnapshotManager(QObject):
         doc_name = meta["file"]
         doc_dir = os.path.dirname(os.path.dirname(snap_path))  # parent dir of snapshots
         return os.path.join(doc_dir, doc_name)
+
+
+class _BackgroundTask(QRunnable):
+    """Run *fn* on the thread pool and hand its report dict to *done*."""
+
+    def __init__(self, fn, done):
+        super().__init__()
+        self.fn = fn
+        self.done = done
+
+    def run(self) -> None:
+        try:
+            report = self.fn()
+        except Exception as exc:  # report failures instead of losing them in the pool
+            report = {"error": str(exc)}
+        self.done(report)
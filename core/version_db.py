@@ -1,12 +1,40 @@
 import os
 import json
+from bisect import bisect_left, bisect_right, insort
 from pathlib import Path
 from core.platform_utils import get_app_data_dir
+from core.file_lock import FileLock
+from core.rw_lock import RWLock
+
+# journal records replayed before the checkpoint is rewritten
+COMPACT_EVERY = 500
+
 
 class SnapshotRepository:
     """
     SnapshotRepository is responsible for managing snapshot metadata,
     including saving, retrieving, and deleting version entries from disk.
+
+    ``versions.json`` is a checkpoint of all versions; changes since the
+    checkpoint are appended to ``versions.journal`` (one JSON record per
+    line) so a write costs one short line instead of the whole history.
+    Loading reads the checkpoint and replays the journal; every
+    ``COMPACT_EVERY`` records the checkpoint is rewritten atomically and the
+    journal emptied.  Replaying is idempotent, so a crash between those two
+    steps – or in the middle of an append – loses at most the last record.
+
+    In memory each document maps ``snapshot_id`` (``snapshot_path`` for
+    legacy entries) to its metadata, with a secondary index by
+    ``snapshot_path``; lookup, update and removal are O(1).
+
+    Several OfficeMate processes may share the files: every write is a
+    read‑modify‑write under an exclusive advisory lock on ``versions.lock``
+    (replay what others appended, then append), reads hold the lock shared.
+
+    Within a process the in‑memory state is guarded by a readers‑writer
+    lock: lookups and queries from the GUI run in parallel with each other
+    and wait only while a worker applies a change.  The file lock is always
+    taken before the state lock, never inside it.
     """
     def __init__(self, db_path: str | None = None):
         """
@@ -19,33 +47,320 @@ class SnapshotRepository:
         if db_path is None:
             db_path = Path(get_app_data_dir()) / "versions.json"
         self.db_path = Path(db_path)
+        self.journal_path = self.db_path.with_suffix(".journal")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = FileLock(self.db_path.with_suffix(".lock"))
+        self._state = RWLock()
 
-        if not self.db_path.exists():
-            self.db_path.write_text("{}")
+        with self._lock.exclusive():
+            if not self.db_path.exists():
+                self.db_path.write_text("{}")
 
-        # load existing data
-        with self.db_path.open("r", encoding="utf-8") as f:
-            self.data = json.load(f)
+            # load existing data
+            self.generation = 0     # bumped whenever self.data changes
+            self._load()
 
     def save_version(self, doc_name, metadata: dict):
-        self.data.setdefault(doc_name, []).append(metadata)
-        self.save()
+        self.save_versions([(doc_name, metadata)])
+
+    def save_versions(self, entries):
+        """批量追加 (doc_name, metadata) 列表，只追加日志"""
+        self._commit([{"op": "add", "doc": doc_name, "meta": metadata}
+                      for doc_name, metadata in entries])
 
     def get_versions(self, doc_name) -> list:
-        return self.data.get(doc_name, [])
-    
+        with self._state.read():
+            return list(self._docs.get(doc_name, {}).values())
+
+    def count_versions(self, doc_name) -> int:
+        with self._state.read():
+            return len(self._docs.get(doc_name, {}))
+
+    def get_version(self, snapshot_id):
+        """按 snapshot_id 查找版本（O(1)），不存在时返回 None"""
+        with self._state.read():
+            doc_name = self._by_id.get(snapshot_id)
+            if doc_name is None:
+                return None
+            return self._docs[doc_name].get(snapshot_id)
+
+    def find_by_path(self, snapshot_path):
+        """按 snapshot_path 查找版本（O(1)），不存在时返回 None"""
+        with self._state.read():
+            hit = self._by_path.get(snapshot_path)
+            if hit is None:
+                return None
+            doc_name, key = hit
+            return self._docs[doc_name].get(key)
+
+    def query_versions(self, doc_name, limit=100, cursor=None,
+                       since=None, until=None, remark=None):
+        """
+        分页查询，按时间从新到旧
+
+        *cursor* is the value returned with the previous page (None for the
+        first page); *since* / *until* are inclusive timestamp bounds and
+        *remark* a case‑insensitive substring.  Returns ``(versions,
+        next_cursor)``; ``next_cursor`` is None after the last page.
+        """
+        with self._state.read():
+            return self._query(doc_name, limit, cursor, since, until, remark)
+
+    def _query(self, doc_name, limit, cursor, since, until, remark):
+        order = self._sorted_keys(doc_name)
+        lo = bisect_left(order, (since,)) if since else 0
+        hi = bisect_right(order, (until, "\uffff")) if until else len(order)
+        if cursor is not None:
+            hi = min(hi, bisect_left(order, tuple(cursor)))
+        versions = self._docs.get(doc_name, {})
+        needle = remark.lower() if remark else None
+        page = []
+        for i in range(hi - 1, lo - 1, -1):
+            meta = versions[order[i][1]]
+            if needle and needle not in (meta.get("remark") or "").lower():
+                continue
+            if len(page) == limit:
+                last = page[-1]
+                return page, [last.get("timestamp") or "", _key(last)]
+            page.append(meta)
+        return page, None
+
+    @property
+    def data(self) -> dict:
+        """{doc_name: [metadata, ...]} snapshot of the repository (read‑only)."""
+        with self._state.read():
+            return {doc_name: list(versions.values()) for doc_name, versions in self._docs.items()}
+
     def remove_version(self, doc_name, target_version):
-        if doc_name not in self.data:
+        self.remove_versions(doc_name, [target_version])
+
+    def remove_versions(self, doc_name, targets):
+        """批量删除多个版本（元信息或 snapshot_id），只追加一条日志"""
+        self.reload()
+        if not targets or doc_name not in self.documents():
             return
-        self.data[doc_name] = [v for v in self.data[doc_name] if v != target_version]
-        self.save()
+        self._commit([{"op": "remove", "doc": doc_name,
+                       "keys": [t if isinstance(t, str) else _key(t) for t in targets]}])
+
+    def update_version(self, doc_name, metadata):
+        self.update_versions([(doc_name, metadata)])
+
+    def update_versions(self, entries):
+        """替换已有版本的元信息（按 snapshot_id，否则按 snapshot_path 匹配）"""
+        self._commit([{"op": "update", "doc": doc_name, "meta": metadata}
+                      for doc_name, metadata in entries])
+
+    def remove_document(self, doc_name):
+        """删除文档的全部版本记录"""
+        self.reload()
+        if doc_name in self.documents():
+            self._commit([{"op": "drop", "doc": doc_name}])
+
+    def documents(self) -> list:
+        with self._state.read():
+            return list(self._docs)
+
+    def iter_versions(self):
+        """Yield ``(doc_name, metadata)`` for every stored version."""
+        with self._state.read():
+            entries = [(doc_name, metadata) for doc_name, versions in self._docs.items()
+                       for metadata in versions.values()]
+        yield from entries
 
     def save(self):
-        with self.db_path.open("w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        """写入完整检查点并清空日志"""
+        with self._lock.exclusive():
+            self.reload()       # never overwrite records of other processes
+            tmp = self.db_path.with_name(f".{self.db_path.name}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.db_path)
+            # the checkpoint already contains every journal record
+            with self.journal_path.open("w", encoding="utf-8"):
+                pass
+            self._journal_records = 0
+            self._journal_offset = 0
+            self._checkpoint_key = _stat_key(self.db_path)
+            self._journal_key = _stat_key(self.journal_path)
 
-    def reload(self):
-        """从磁盘重新加载版本数据"""
+    def reload(self, force: bool = False):
+        """
+        从磁盘同步版本数据：只有检查点或日志在磁盘上发生变化时才重新读取
+
+        A checkpoint replaced by another process forces a full load; records
+        appended to the journal by another process are replayed from the
+        last known offset.  Writes made through this instance never trigger
+        a reload.
+        """
+        if (not force and _stat_key(self.db_path) == self._checkpoint_key
+                and _stat_key(self.journal_path) == self._journal_key):
+            return              # fast path without taking the lock
+        with self._lock.shared():
+            checkpoint = _stat_key(self.db_path)
+            if force or checkpoint != self._checkpoint_key:
+                self._load()
+                return
+            journal = _stat_key(self.journal_path)
+            if journal == self._journal_key:
+                return
+            if (journal is None or journal[1] < self._journal_offset
+                    or (self._journal_key and journal[0] != self._journal_key[0])):
+                self._load()        # journal recreated or truncated by a compaction
+                return
+            self._replay(self._journal_offset)
+
+    def _load(self):
         with open(self.db_path, "r", encoding="utf-8") as f:
-            self.data = json.load(f)
+            data = json.load(f)
+        with self._state.write():
+            self._load_data(data)
+
+    def _load_data(self, data):
+        self._docs, self._by_id, self._by_path, self._order = {}, {}, {}, {}
+        for doc_name, versions in data.items():
+            for meta in versions:
+                self._add(doc_name, meta)
+        self._checkpoint_key = _stat_key(self.db_path)
+        self._journal_records = 0
+        self._journal_offset = 0
+        self._journal_key = None
+        self.generation += 1
+        self._replay(0)
+
+    def _replay(self, offset):
+        """Apply journal records from byte *offset* on."""
+        if not self.journal_path.exists():
+            return
+        good = offset
+        with self.journal_path.open("rb") as f, self._state.write():
+            f.seek(offset)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break       # torn final line from an interrupted append
+                if not line.endswith(b"\n"):
+                    break
+                self._apply(record)
+                self._journal_records += 1
+                good += len(line)
+            torn = f.tell() != good
+        if torn and self._lock.held_exclusive:
+            # drop the partial record (a writer crashed mid‑append) so later
+            # appends start on a fresh line; under a shared lock leave it
+            os.truncate(self.journal_path, good)
+        if good != offset:
+            self.generation += 1
+        self._journal_offset = good
+        self._journal_key = _stat_key(self.journal_path)
+
+    # ------------------------------------------------------------------ journal
+    def _commit(self, records):
+        if not records:
+            return
+        with self._lock.exclusive():
+            self.reload()           # pick up other processes' records first
+            with self._state.write():
+                for record in records:
+                    self._apply(record)
+                self.generation += 1
+            with self.journal_path.open("ab") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n"
+                                for r in records).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_offset = f.tell()
+            self._journal_key = _stat_key(self.journal_path)
+            self._journal_records += len(records)
+            if self._journal_records >= COMPACT_EVERY:
+                self.save()
+
+    def _apply(self, record):
+        """Apply one journal record; applying it twice is harmless."""
+        op, doc_name = record.get("op"), record.get("doc")
+        if op == "add":
+            self._add(doc_name, record["meta"])
+        elif op == "remove":
+            # "targets" (whole dicts) is the record format of older journals
+            keys = record.get("keys") or [_key(t) for t in record.get("targets", [])]
+            for key in keys:
+                self._discard(doc_name, key)
+        elif op == "update":
+            meta = record["meta"]
+            key = _key(meta)
+            if key in self._docs.get(doc_name, {}):
+                self._discard(doc_name, key)
+                self._add(doc_name, meta)
+        elif op == "drop":
+            for key in list(self._docs.get(doc_name, {})):
+                self._discard(doc_name, key)
+            self._docs.pop(doc_name, None)
+            self._order.pop(doc_name, None)
+
+    def _sorted_keys(self, doc_name):
+        """[(timestamp, key), …] of *doc_name* in ascending order, cached until it changes."""
+        order = self._order.get(doc_name)
+        if order is None:
+            # filled under the read lock: concurrent readers store equal lists
+            order = self._order[doc_name] = sorted(
+                (m.get("timestamp") or "", k) for k, m in self._docs.get(doc_name, {}).items())
+        return order
+
+    def _add(self, doc_name, meta):
+        versions = self._docs.setdefault(doc_name, {})
+        key = _key(meta)
+        if key in versions:
+            if key == meta.get("snapshot_id"):
+                return          # replayed record
+            self._discard(doc_name, key)
+        versions[key] = meta
+        if doc_name in self._order:
+            insort(self._order[doc_name], (meta.get("timestamp") or "", key))
+        if meta.get("snapshot_id"):
+            self._by_id[meta["snapshot_id"]] = doc_name
+        if meta.get("snapshot_path"):
+            self._by_path[meta["snapshot_path"]] = (doc_name, key)
+
+    def _discard(self, doc_name, key):
+        meta = self._docs.get(doc_name, {}).pop(key, None)
+        if meta is None:
+            return
+        order = self._order.get(doc_name)
+        if order is not None:
+            i = bisect_left(order, (meta.get("timestamp") or "", key))
+            if i < len(order) and order[i][1] == key:
+                del order[i]
+        if self._by_id.get(meta.get("snapshot_id")) == doc_name:
+            del self._by_id[meta["snapshot_id"]]
+        if self._by_path.get(meta.get("snapshot_path")) == (doc_name, key):
+            del self._by_path[meta["snapshot_path"]]
+
+
+def _key(meta):
+    """Primary key of a version: its snapshot_id, else (legacy) its snapshot_path."""
+    return meta.get("snapshot_id") or meta.get("snapshot_path") or json.dumps(meta, sort_keys=True)
+
+
+def _stat_key(path):
+    """(inode, size, mtime_ns) of *path*, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def open_repository(backend: str = "sqlite", data_dir: str | None = None):
+    """
+    Return the metadata repository for *backend* (``"sqlite"`` or ``"json"``).
+
+    The SQLite database imports an existing ``versions.json`` the first time
+    it is opened.
+    """
+    data_dir = Path(data_dir or get_app_data_dir())
+    if backend == "json":
+        return SnapshotRepository(data_dir / "versions.json")
+    from core.version_sqlite import SqliteSnapshotRepository
+    return SqliteSnapshotRepository(data_dir / "versions.sqlite3", data_dir / "versions.json")
@@ -0,0 +1,293 @@
+"""
+version_sqlite
+==============
+
+SQLite backend for snapshot metadata.
+
+``versions.json`` is rewritten completely on every change, which gets slow
+once a few documents carry thousands of snapshots.  This repository keeps
+one row per snapshot in ``versions.sqlite3`` (stdlib ``sqlite3``, WAL
+mode) and touches only the affected rows::
+
+    versions(id INTEGER PRIMARY KEY,    -- append order
+             doc_name, snapshot_id, timestamp, snapshot_path,
+             meta TEXT)                 -- the full metadata dict as JSON
+
+with indexes on ``(doc_name, timestamp)``, ``snapshot_id`` and
+``snapshot_path``.  The public methods mirror ``SnapshotRepository`` so the
+two are interchangeable.  An existing ``versions.json`` is imported in a
+single transaction the first time the database is opened (together with
+its journal); the JSON files are left in place as a backup.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.platform_utils import get_app_data_dir
+
+# 1: initial schema, 2: remark column for filtered history queries
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id            INTEGER PRIMARY KEY,
+    doc_name      TEXT NOT NULL,
+    snapshot_id   TEXT,
+    timestamp     TEXT NOT NULL DEFAULT '',
+    snapshot_path TEXT,
+    remark        TEXT NOT NULL DEFAULT '',
+    meta          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_versions_doc_ts ON versions(doc_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_versions_snapshot_id ON versions(snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_versions_snapshot_path ON versions(snapshot_path);
+"""
+
+_INSERT = ("INSERT INTO versions (doc_name, snapshot_id, timestamp, snapshot_path, remark, meta)"
+           " VALUES (?, ?, ?, ?, ?, ?)")
+
+
+class SqliteSnapshotRepository:
+    """Snapshot metadata in an SQLite database; drop‑in for SnapshotRepository."""
+
+    def __init__(self, db_path: str | None = None, legacy_json: str | None = None):
+        """
+        *db_path* defaults to ``versions.sqlite3`` in the application data
+        directory; *legacy_json* (default: ``versions.json`` next to it) is
+        migrated on first use.
+        """
+        if db_path is None:
+            db_path = Path(get_app_data_dir()) / "versions.sqlite3"
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if legacy_json is None:
+            legacy_json = self.db_path.with_name("versions.json")
+        self._lock = threading.RLock()
+        # one connection shared by all threads, serialised by self._lock
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._generation = 0
+        self._init_schema(Path(legacy_json))
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # ------------------------------------------------------------------ writes
+    def save_version(self, doc_name, metadata: dict):
+        self.save_versions([(doc_name, metadata)])
+
+    def save_versions(self, entries):
+        """批量追加 (doc_name, metadata) 列表，单个事务"""
+        if not entries:
+            return
+        with self._transaction() as cur:
+            cur.executemany(_INSERT, [_row(doc_name, meta) for doc_name, meta in entries])
+
+    def update_version(self, doc_name, metadata: dict):
+        self.update_versions([(doc_name, metadata)])
+
+    def update_versions(self, entries):
+        """Replace the stored metadata of existing versions (matched by id or path)."""
+        if not entries:
+            return
+        with self._transaction() as cur:
+            for doc_name, meta in entries:
+                key, value = _match_key(meta)
+                cur.execute(
+                    "UPDATE versions SET snapshot_id = ?, timestamp = ?, snapshot_path = ?,"
+                    " remark = ?, meta = ?"
+                    f" WHERE doc_name = ? AND {key} = ?",
+                    _row(doc_name, meta)[1:] + (doc_name, value))
+
+    def remove_version(self, doc_name, target_version):
+        self.remove_versions(doc_name, [target_version])
+
+    def remove_versions(self, doc_name, targets):
+        """批量删除多个版本（元信息或 snapshot_id），单个事务"""
+        if not targets:
+            return
+        with self._transaction() as cur:
+            for target in targets:
+                if isinstance(target, str) or target.get("snapshot_id"):
+                    sid = target if isinstance(target, str) else target["snapshot_id"]
+                    cur.execute("DELETE FROM versions WHERE doc_name = ? AND snapshot_id = ?",
+                                (doc_name, sid))
+                    continue
+                # legacy entries without an id: same path and identical metadata
+                rows = cur.execute(
+                    "SELECT id, meta FROM versions WHERE doc_name = ? AND snapshot_path IS ?",
+                    (doc_name, target.get("snapshot_path"))).fetchall()
+                cur.executemany("DELETE FROM versions WHERE id = ?",
+                                [(rid,) for rid, meta in rows if json.loads(meta) == target])
+
+    def remove_document(self, doc_name):
+        """删除文档的全部版本记录"""
+        with self._transaction() as cur:
+            cur.execute("DELETE FROM versions WHERE doc_name = ?", (doc_name,))
+
+    # ------------------------------------------------------------------ reads
+    def get_versions(self, doc_name) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT meta FROM versions WHERE doc_name = ? ORDER BY id", (doc_name,)).fetchall()
+        return [json.loads(meta) for (meta,) in rows]
+
+    def count_versions(self, doc_name) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT count(*) FROM versions WHERE doc_name = ?", (doc_name,)).fetchone()[0]
+
+    def get_version(self, snapshot_id) -> Optional[Dict]:
+        """按 snapshot_id 查找版本（索引），不存在时返回 None"""
+        return self._fetch_one("SELECT meta FROM versions WHERE snapshot_id = ?", snapshot_id)
+
+    def find_by_path(self, snapshot_path) -> Optional[Dict]:
+        """按 snapshot_path 查找版本（索引），不存在时返回 None"""
+        return self._fetch_one("SELECT meta FROM versions WHERE snapshot_path = ?", snapshot_path)
+
+    def query_versions(self, doc_name, limit=100, cursor=None,
+                       since=None, until=None, remark=None) -> Tuple[List[Dict], Optional[list]]:
+        """
+        分页查询，按时间从新到旧（见 SnapshotRepository.query_versions）
+
+        Served by the ``(doc_name, timestamp)`` index; the cursor is the
+        ``[timestamp, id]`` of the last row of the previous page.
+        """
+        sql = "SELECT id, timestamp, meta FROM versions WHERE doc_name = ?"
+        args: list = [doc_name]
+        if cursor is not None:
+            sql += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            args += [cursor[0], cursor[0], cursor[1]]
+        if since:
+            sql += " AND timestamp >= ?"
+            args.append(since)
+        if until:
+            sql += " AND timestamp <= ?"
+            args.append(until)
+        if remark:
+            sql += " AND remark LIKE ? ESCAPE '\\'"
+            args.append("%" + remark.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        args.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        page = [json.loads(meta) for _, _, meta in rows[:limit]]
+        if len(rows) <= limit:
+            return page, None
+        rid, timestamp, _ = rows[limit - 1]
+        return page, [timestamp, rid]
+
+    def documents(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT doc_name FROM versions").fetchall()
+        return [doc_name for (doc_name,) in rows]
+
+    def iter_versions(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield ``(doc_name, metadata)`` for every stored version."""
+        with self._lock:
+            rows = self._conn.execute("SELECT doc_name, meta FROM versions ORDER BY id").fetchall()
+        for doc_name, meta in rows:
+            yield doc_name, json.loads(meta)
+
+    @property
+    def generation(self) -> int:
+        """
+        Counter bumped by every change – ours or another process's.
+
+        ``PRAGMA data_version`` changes when another connection commits;
+        each of our own write transactions bumps it as well.
+        """
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self._generation += 1
+            return self._generation
+
+    # ------------------------------------------------------------------ compat
+    def save(self):
+        """Every write is committed immediately – kept for API compatibility."""
+
+    def reload(self):
+        """Queries always see the committed database – nothing to reload."""
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------ internals
+    def _fetch_one(self, sql: str, value) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(sql + " LIMIT 1", (value,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _transaction(self):
+        with self._lock:
+            self._generation += 1
+        return _Transaction(self._conn, self._lock)
+
+    def _init_schema(self, legacy_json: Path) -> None:
+        with self._transaction() as cur:
+            for statement in filter(None, (s.strip() for s in _SCHEMA.split(";"))):
+                cur.execute(statement)
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            if version >= _SCHEMA_VERSION:
+                return
+            if version == 0 and legacy_json.exists():
+                cur.executemany(_INSERT, list(_legacy_rows(legacy_json)))
+            if version == 1:
+                cur.execute("ALTER TABLE versions ADD COLUMN remark TEXT NOT NULL DEFAULT ''")
+                rows = cur.execute("SELECT id, meta FROM versions").fetchall()
+                cur.executemany("UPDATE versions SET remark = ? WHERE id = ?",
+                                [(json.loads(meta).get("remark") or "", rid) for rid, meta in rows])
+            cur.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` … ``COMMIT`` / ``ROLLBACK`` under the repository lock."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Cursor:
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._conn.cursor()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
+
+
+def _row(doc_name: str, meta: Dict) -> Tuple:
+    return (doc_name, meta.get("snapshot_id") or None, meta.get("timestamp") or "",
+            meta.get("snapshot_path"), meta.get("remark") or "", json.dumps(meta, ensure_ascii=False))
+
+
+def _match_key(meta: Dict) -> Tuple[str, Optional[str]]:
+    if meta.get("snapshot_id"):
+        return "snapshot_id", meta["snapshot_id"]
+    return "snapshot_path", meta.get("snapshot_path")
+
+
+def _legacy_rows(json_path: Path) -> Iterable[Tuple]:
+    from core.version_db import SnapshotRepository   # checkpoint + journal
+    try:
+        data = SnapshotRepository(json_path).data
+    except (OSError, ValueError):
+        return
+    for doc_name, versions in data.items():
+        for meta in versions:
+            yield _row(doc_name, meta)
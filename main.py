@@ -2,10 +2,14 @@
 DocSnap entry point
 ~~~~~~~~~~~~~~~~~~~
 Loads shared `base.qss` plus the current theme via ``core.themes.apply_theme``.
+
+``python main.py snapshot-all [paths…]`` snapshots every tracked document
+(or the given ones) without starting the GUI.
 """
 
 import sys
 import os
+import argparse
 from pathlib import Path
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
@@ -22,15 +26,43 @@ from core.platform_utils import get_app_data_dir
 from app.main_window import MainWindow
 
 
+def _configure_settings() -> None:
+    """Configure persistent settings path cross-platform."""
+    settings_dir = get_app_data_dir()
+    QSettings.setDefaultFormat(QSettings.IniFormat)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, str(settings_dir))
+
+
+def snapshot_all(argv) -> int:
+    """Headless bulk snapshot; returns the process exit code."""
+    from core.recent_db import RecentDocDB
+
+    parser = argparse.ArgumentParser(prog="main.py snapshot-all",
+                                     description="Snapshot tracked documents.")
+    parser.add_argument("paths", nargs="*", help="documents to snapshot (default: all tracked)")
+    parser.add_argument("-m", "--remark", default="", help="remark for the new snapshots")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="parallel workers")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication(sys.argv[:1])  # noqa: F841 – QSettings needs an application
+    _configure_settings()
+    paths = [os.path.abspath(p) for p in args.paths] or RecentDocDB().get_all()
+    results = SnapshotManager().create_snapshots(paths, remark=args.remark, max_workers=args.jobs)
+    for r in results:
+        detail = r["meta"]["timestamp"] if "meta" in r else r.get("error", "")
+        print(f"{r['status']:<9} {r['file_path']}  {detail}")
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+
 def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "snapshot-all":
+        sys.exit(snapshot_all(sys.argv[2:]))
+
     app = QApplication(sys.argv)
     icon_path = Path(__file__).resolve().parent / "assets" / "img" / "icon.png"
     app.setWindowIcon(QIcon(str(icon_path)))
 
-    # --- Configure persistent settings path cross-platform ---
-    settings_dir = get_app_data_dir()
-    QSettings.setDefaultFormat(QSettings.IniFormat)
-    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, str(settings_dir))
+    _configure_settings()
 
     lang = os.getenv("DOCSNAP_LANG")
     if lang:
@@ -0,0 +1,78 @@
+"""
+docx_loader_benchmark
+=====================
+
+Compares the streaming .docx loader with the python‑docx based reference
+implementation: both must produce identical ``load_structured`` and
+``get_text`` output, and the timings of both are printed::
+
+    python tools/docx_loader_benchmark.py                  # data/*.docx
+    python tools/docx_loader_benchmark.py contract.docx -r 10
+
+Exits with status 1 if the outputs of any document differ.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.snapshot_loaders.docx_loader import DocxLoader, PythonDocxLoader  # noqa: E402
+
+
+def _best(fn, path, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _first_difference(a, b) -> str:
+    if len(a) != len(b):
+        return f"{len(a)} vs {len(b)} blocks"
+    for x, y in zip(a, b):
+        if x != y:
+            return f"block {x.get('index')}: {x!r} != {y!r}"
+    return ""
+
+
+def run(paths, repeat: int) -> bool:
+    stream, reference = DocxLoader(), PythonDocxLoader()
+    ok = True
+    print(f"{'document':<32} {'python-docx':>12} {'streaming':>12} {'speedup':>8}")
+    for path in paths:
+        path = str(path)
+        a, b = reference.load_structured(path), stream.load_structured(path)
+        if a != b:
+            ok = False
+            print(f"{Path(path).name}: load_structured differs – {_first_difference(a, b)}")
+        if reference.get_text(path) != stream.get_text(path):
+            ok = False
+            print(f"{Path(path).name}: get_text differs")
+        slow = _best(reference.load_structured, path, repeat)
+        fast = _best(stream.load_structured, path, repeat)
+        print(f"{Path(path).name[:32]:<32} {slow * 1000:>9.1f} ms {fast * 1000:>9.1f} ms "
+              f"{slow / fast:>7.1f}x")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="documents to compare (default: data/*.docx)")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="timing runs per document, the best one counts")
+    args = parser.parse_args()
+    paths = args.paths or sorted((ROOT / "data").glob("*.docx"))
+    return 0 if run(paths, args.repeat) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+metadata_stress
+===============
+
+Multi‑process stress run for the snapshot metadata repositories.
+
+Several worker processes open the same repository and concurrently add
+snapshot entries (and delete every fifth one again).  Afterwards a fresh
+repository must contain exactly the surviving entries of every worker –
+nothing lost, nothing duplicated::
+
+    python tools/metadata_stress.py                    # both backends
+    python tools/metadata_stress.py --backend json -p 8 -n 500
+
+Exits with status 1 if any backend loses or duplicates entries.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.version_db import open_repository  # noqa: E402
+
+_DOCS = ("report.docx", "notes.txt", "plan.docx")
+
+
+def _worker(backend: str, data_dir: str, worker: int, count: int) -> None:
+    repo = open_repository(backend, data_dir)
+    for i in range(count):
+        doc_name = _DOCS[i % len(_DOCS)]
+        meta = {
+            "snapshot_id": f"w{worker}-{i}",
+            "file": doc_name,
+            "timestamp": time.strftime("%Y-%m-%d_%H-%M-%S"),
+            "snapshot_path": f"/stress/{doc_name}/w{worker}-{i}",
+            "remark": "",
+        }
+        repo.save_version(doc_name, meta)
+        if i % 5 == 4:
+            repo.remove_version(doc_name, meta)
+
+
+def run(backend: str, processes: int, count: int) -> bool:
+    with tempfile.TemporaryDirectory(prefix="officemate-stress-") as data_dir:
+        open_repository(backend, data_dir)          # create / migrate once up front
+        workers = [multiprocessing.Process(target=_worker, args=(backend, data_dir, w, count))
+                   for w in range(processes)]
+        start = time.perf_counter()
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        repo = open_repository(backend, data_dir)
+        found = [m["snapshot_id"] for _, m in repo.iter_versions()]
+        expected = {f"w{w}-{i}" for w in range(processes) for i in range(count) if i % 5 != 4}
+        ok = (len(found) == len(set(found)) and set(found) == expected
+              and all(p.exitcode == 0 for p in workers))
+        writes = processes * (count + count // 5)
+        print(f"{backend:<7} {processes} procs × {count} adds: {writes / elapsed:8.0f} writes/s  "
+              f"{len(found)}/{len(expected)} entries  {'OK' if ok else 'FAILED'}")
+        return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--backend", choices=("json", "sqlite", "both"), default="both")
+    parser.add_argument("-p", "--processes", type=int, default=4)
+    parser.add_argument("-n", "--count", type=int, default=200, help="adds per process")
+    args = parser.parse_args()
+    backends = ("json", "sqlite") if args.backend == "both" else (args.backend,)
+    results = [run(b, args.processes, args.count) for b in backends]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+parse_cache_benchmark
+=====================
+
+Checks that documents served from the persistent parse cache are
+identical to a fresh parse – ``text``, ``structured`` and
+``paragraph_tokens`` with all and with no style features – and prints the
+time to open each one both ways::
+
+    python tools/parse_cache_benchmark.py                  # data/*.docx
+    python tools/parse_cache_benchmark.py contract.docx -r 10
+
+The cache files are written to a temporary directory.  Exits with status 1
+if any view differs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.parse_cache import CachedDocument, ParseCache  # noqa: E402
+from core.snapshot_loaders.docx_loader import DocxLoader  # noqa: E402
+from core.snapshot_loaders.parsed_document import TOKEN_FEATURES  # noqa: E402
+
+
+def _open(cache: ParseCache, loader, path: str, digest: str):
+    return cache.document(loader, ".docx", digest, lambda: path)
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(paths, repeat: int) -> bool:
+    loader = DocxLoader()
+    ok = True
+    print(f"{'document':<32} {'parse':>10} {'cached':>10} {'size':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(Path(tmp))
+        for path in paths:
+            path = str(path)
+            digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+            fresh = loader.parse(path)
+            _open(cache, loader, path, digest).text          # parses and stores
+            cached = _open(cache, loader, path, digest)
+            if not isinstance(cached, CachedDocument):
+                print(f"{Path(path).name}: not cached")
+                ok = False
+                continue
+            for name, a, b in (
+                ("text", fresh.text, cached.text),
+                ("paragraph_tokens", fresh.paragraph_tokens(), cached.paragraph_tokens()),
+                ("plain tokens", fresh.paragraph_tokens(frozenset()),
+                 cached.paragraph_tokens(frozenset())),
+                ("structured", fresh.structured, cached.structured),
+            ):
+                if a != b:
+                    ok = False
+                    print(f"{Path(path).name}: {name} differs")
+
+            # what opening a snapshot in the history / compare page needs
+            def parse():
+                loader.parse(path).paragraph_tokens(TOKEN_FEATURES)
+
+            def load():
+                _open(cache, loader, path, digest).paragraph_tokens(TOKEN_FEATURES)
+
+            slow, fast = _best(parse, repeat), _best(load, repeat)
+            size = cache.usage
+            print(f"{Path(path).name[:32]:<32} {slow * 1000:>7.1f} ms {fast * 1000:>7.2f} ms "
+                  f"{size / 1024:>6.0f} KB")
+            cache.clear()
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="documents to check (default: data/*.docx)")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="timing runs per document, the best one counts")
+    args = parser.parse_args()
+    paths = args.paths or sorted((ROOT / "data").glob("*.docx"))
+    return 0 if run(paths, args.repeat) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
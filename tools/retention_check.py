@@ -0,0 +1,92 @@
+"""
+retention_check
+===============
+
+Simulates a document snapshotted every few minutes over several weeks and
+thinned repeatedly, the way the history page's thinning button is used::
+
+    python tools/retention_check.py                # 20 days, every 10 min
+    python tools/retention_check.py -d 60 -i 5 --passes 48
+
+After every pass the surviving history is checked: a second pass at the
+same time removes nothing, and a pass at a later time removes nothing
+that is still in the same tier as before – a snapshot kept as the newest
+of its bucket stays kept.  Finally no day older than the hourly tier may
+be left without a snapshot.  Exits with status 1 on any violation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.retention import TIMESTAMP_FORMAT, RetentionPolicy  # noqa: E402
+
+
+def _history(start: datetime.datetime, end: datetime.datetime,
+             interval: datetime.timedelta):
+    versions = []
+    ts = start
+    while ts <= end:
+        versions.append({"snapshot_id": ts.strftime(TIMESTAMP_FORMAT),
+                         "timestamp": ts.strftime(TIMESTAMP_FORMAT)})
+        ts += interval
+    return versions
+
+
+def run(days: int, interval_min: int, passes: int, step_hours: float) -> bool:
+    policy = RetentionPolicy()
+    end = datetime.datetime(2025, 1, 21, 12, 0)
+    versions = _history(end - datetime.timedelta(days=days), end,
+                        datetime.timedelta(minutes=interval_min))
+    now = end
+    ok = True
+    previous_now = None
+    for n in range(passes):
+        removals = policy.select_removals(versions, now)
+        if previous_now is not None:
+            # only tier transitions may remove snapshots kept by the last pass
+            for meta in removals:
+                ts = datetime.datetime.strptime(meta["timestamp"], TIMESTAMP_FORMAT)
+                before = policy._tier_for(ts, previous_now)[0]
+                after = policy._tier_for(ts, now)[0]
+                if before == after:
+                    print(f"pass {n}: {meta['timestamp']} removed inside tier {after}")
+                    ok = False
+        removed = {m["snapshot_id"] for m in removals}
+        versions = [m for m in versions if m["snapshot_id"] not in removed]
+        if policy.select_removals(versions, now):
+            print(f"pass {n}: a second pass at the same time removes more")
+            ok = False
+        previous_now = now
+        now += datetime.timedelta(hours=step_hours)
+
+    days_kept = {m["timestamp"][:10] for m in versions}
+    day = datetime.datetime.strptime(versions[0]["timestamp"][:10], "%Y-%m-%d")
+    while day < end - datetime.timedelta(days=7):
+        if day.strftime("%Y-%m-%d") not in days_kept:
+            print(f"no snapshot left for {day:%Y-%m-%d}")
+            ok = False
+        day += datetime.timedelta(days=1)
+    print(f"{len(versions)} snapshots left after {passes} passes")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-d", "--days", type=int, default=20, help="days of history")
+    parser.add_argument("-i", "--interval", type=int, default=10,
+                        help="minutes between snapshots")
+    parser.add_argument("--passes", type=int, default=30, help="thinning passes")
+    parser.add_argument("--step", type=float, default=7.0,
+                        help="hours between thinning passes")
+    args = parser.parse_args()
+    return 0 if run(args.days, args.interval, args.passes, args.step) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
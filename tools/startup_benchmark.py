@@ -0,0 +1,110 @@
+"""
+startup_benchmark
+=================
+
+Measures cold start: the time from launching ``main.py`` in a fresh
+interpreter until the main window has been shown and the event loop is
+running, and lists which heavy modules were imported by then::
+
+    python tools/startup_benchmark.py              # 5 runs, median
+    python tools/startup_benchmark.py -r 10 --keep-home
+
+Each run uses a throw‑away home directory (no settings, no recent
+documents) unless ``--keep-home`` is given, and the ``offscreen`` Qt
+platform when no display is available.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# modules whose presence at the first window means startup paid for them
+WATCHED = (
+    "lxml", "lxml.etree", "docx", "core.snapshot_loaders.docx_loader",
+    "core.snapshot_loaders.docx_stream", "core.snapshot_loaders.txt_loader",
+    "core.diff_strategies.paragraph_strategy", "core.diff_strategies.text_strategy",
+    "app.project_page", "app.snapshot_history", "app.search_window",
+    "app.history_page", "app.snapshot_compare_page", "app.settings_page",
+)
+
+# run inside the child: start main() and report once the event loop has
+# processed the first window
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+sys.argv = ["main.py"]
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+
+def report():
+    shown = [w for w in QApplication.topLevelWidgets() if w.isVisible()]
+    print(json.dumps({{
+        "in_process": time.perf_counter() - t0,
+        "windows": len(shown),
+        "modules": [m for m in {watched!r} if m in sys.modules],
+    }}), flush=True)
+    QApplication.quit()
+
+_exec = QApplication.exec
+def exec_(*_args):            # called on the instance; QApplication.exec is static
+    QTimer.singleShot(0, report)
+    return _exec()
+QApplication.exec = exec_
+
+import main
+main.main()
+"""
+
+
+def run_once(keep_home: bool) -> dict:
+    env = dict(os.environ)
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY") and sys.platform.startswith("linux"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    with tempfile.TemporaryDirectory() as home:
+        if not keep_home:
+            env.update(HOME=home, XDG_DATA_HOME=str(Path(home) / "data"),
+                       XDG_CONFIG_HOME=str(Path(home) / "config"), APPDATA=home)
+        code = _CHILD.format(root=str(ROOT), watched=WATCHED)
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        line = proc.stdout.readline()
+        total = time.perf_counter() - start
+        proc.wait()
+    if not line:
+        raise RuntimeError("main.py exited before showing a window")
+    result = json.loads(line)
+    result["total"] = total
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="number of cold starts")
+    parser.add_argument("--keep-home", action="store_true",
+                        help="use the real settings and recent documents")
+    args = parser.parse_args()
+
+    runs = [run_once(args.keep_home) for _ in range(args.repeat)]
+    totals = [r["total"] * 1000 for r in runs]
+    inside = [r["in_process"] * 1000 for r in runs]
+    print(f"time to first window: median {statistics.median(totals):.0f} ms "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}) over {len(runs)} runs")
+    print(f"  inside the interpreter: median {statistics.median(inside):.0f} ms")
+    print("  imported by then: " + (", ".join(runs[-1]["modules"]) or "none of the watched modules"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())